@@ -1,22 +1,52 @@
-import webview
 import time
-import xml.etree.ElementTree as ET
 import os
 import json
+import threading
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.json')
+# Save/open dialog filters; the chosen extension picks the format (see project_file.py).
+PROJECT_FILE_TYPES = ('JSON Files (*.json)', 'Compact Project (*.vwz)', 'All files (*.*)')
+# JSON projects larger than this are opened section by section (see project_stream.py).
+STREAM_LOAD_THRESHOLD_MB = 20
+DEFAULT_TEMPLATE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.via_wizard', 'template_cache')
+DEFAULT_TEMPLATE_CACHE_MB = 2048
+DEFAULT_EXPORT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.via_wizard', 'export_cache')
+DEFAULT_EXPORT_CACHE_MB = 10240
 
 class ViaWizardAPI:
     def __init__(self):
         self._window = None
+        self._idle_workers = [] # Warm modeling workers not running a job
+        self._worker_lock = threading.Lock()
+        self._job_manager = None # JobManager running exports, created on first use
+        self._project_streams = {} # stream id -> pending iter_project events of a large project being opened
+        self._journal = None # ProjectJournal autosaving GUI edits of the open project
+        self._save_lock = threading.Lock() # one project file write at a time (saves and export saves)
+        from project_model import ProjectModel
+        self._model = ProjectModel() # the open project, kept in step with the GUI by sync_project
+        self._feed_paths = None # FeedPathEngine caching feed paths between saves and exports
+        from log_batcher import LogBatcher
+        self._log = LogBatcher(self._deliver_log_batch)
 
     def set_window(self, window):
         self._window = window
+        config = self.get_config()
+        if config.get('useWarmWorker', True):
+            # Start a modeling worker (and its pyedb import) while the user is still editing.
+            worker = self._acquire_worker(config.get('aedbVersion', '2024.1'))
+            worker.start()
+            self._release_worker(worker)
+
+    def _file_dialog(self, kind, **kwargs):
+        """Shows an 'open', 'save' or 'folder' dialog; webview is only imported once there is a window."""
+        import webview
+        dialog_types = {'open': webview.OPEN_DIALOG, 'save': webview.SAVE_DIALOG, 'folder': webview.FOLDER_DIALOG}
+        return self._window.create_file_dialog(dialog_types[kind], **kwargs)
 
     def open_file_dialog(self):
         print("API: open_file_dialog called")
         try:
-            file_path = self._window.create_file_dialog(webview.OPEN_DIALOG, directory='', file_types=('XML Files (*.xml)', 'All files (*.*)'))
+            file_path = self._file_dialog('open', directory='', file_types=('XML Files (*.xml)', 'All files (*.*)'))
             if file_path:
                 if isinstance(file_path, (list, tuple)):
                     return file_path[0]
@@ -33,124 +63,14 @@ class ViaWizardAPI:
             self.log_message(f"File not found: {path}")
             return self.get_stackup_data()
 
+        from stackup import parse_stackup_xml
         try:
-            tree = ET.parse(path)
-            root = tree.getroot()
-            
-            # Helper to find node with or without namespace
-            def find_node(parent, tag):
-                # Try direct find
-                node = parent.find(tag)
-                if node is not None: return node
-                
-                # Try finding with parent's namespace
-                if '}' in parent.tag:
-                    ns = parent.tag.split('}')[0] + '}'
-                    node = parent.find(f"{ns}{tag}")
-                    if node is not None: return node
-                    
-                # Try finding with recursive search (ignoring namespace for simplicity)
-                # This is expensive but robust for this specific file structure
-                for elem in parent.iter():
-                    if elem.tag.endswith(f"}} {tag}") or elem.tag == tag:
-                        return elem
-                return None
-            
-            # Find Stackup
-            stackup_node = root.find(".//Stackup")
-            if stackup_node is None:
-                # Try with namespace
-                if '}' in root.tag:
-                    ns = root.tag.split('}')[0] + '}'
-                    stackup_node = root.find(f".//{ns}Stackup")
-            
-            if stackup_node is None:
-                # Fallback: iterate and check tag name
-                for elem in root.iter():
-                    if 'Stackup' in elem.tag:
-                        stackup_node = elem
-                        break
-            
-            if stackup_node is None:
-                 self.log_message("Could not find Stackup node in XML")
-                 return []
-
-            # 1. Parse Materials
-            materials_map = {}
-            materials_node = None
-            
-            # Find Materials node (handling namespace)
-            for child in stackup_node:
-                if 'Materials' in child.tag:
-                    materials_node = child
-                    break
-            
-            if materials_node is not None:
-                for mat in materials_node:
-                    name = mat.get("Name")
-                    props = {"dk": 0, "df": 0, "conductivity": 0}
-                    
-                    def get_val(parent, tag_name):
-                        for child in parent:
-                            if tag_name in child.tag:
-                                for sub in child:
-                                    if 'Double' in sub.tag:
-                                        return float(sub.text)
-                        return 0
-
-                    props["dk"] = get_val(mat, "Permittivity")
-                    props["df"] = get_val(mat, "DielectricLossTangent")
-                    props["conductivity"] = get_val(mat, "Conductivity")
-                    
-                    materials_map[name] = props
-
-            # 2. Parse Layers
-            layers = []
-            layers_node = None
-            length_unit = "mm" # Default
-
-            for child in stackup_node:
-                if 'Layers' in child.tag:
-                    layers_node = child
-                    break
-
-            if layers_node is not None:
-                length_unit = layers_node.get("LengthUnit", "mm")
-                for layer_node in layers_node:
-                    mat_name = layer_node.get("Material", "")
-                    mat_props = materials_map.get(mat_name, {"dk": 0, "df": 0, "conductivity": 0})
-                    
-                    raw_type = layer_node.get("Type", "Dielectric").lower()
-                    if "conductor" in raw_type:
-                        final_type = "Conductor"
-                    else:
-                        final_type = "Dielectric"
-
-                    # Enforce property visibility rules
-                    dk = mat_props["dk"]
-                    df = mat_props["df"]
-                    cond = mat_props["conductivity"]
-
-                    if final_type == "Conductor":
-                        dk = ""
-                        df = ""
-                    else: # Dielectric
-                        cond = ""
-
-                    layer_data = {
-                        "name": layer_node.get("Name", "Layer"),
-                        "type": final_type,
-                        "thickness": float(layer_node.get("Thickness", "0")),
-                        "dk": dk,
-                        "df": df,
-                        "conductivity": cond,
-                        "fillMaterial": layer_node.get("FillMaterial", ""),
-                        "isReference": layer_node.get("IsReference", "false").lower() == "true"
-                    }
-                    layers.append(layer_data)
-                
-            self.log_message(f"Parsed {len(layers)} layers from XML. Unit: {length_unit}")
-            return {"layers": layers, "unit": length_unit}
+            stackup = parse_stackup_xml(path)
+            if stackup is None:
+                self.log_message("Could not find Stackup node in XML")
+                return []
+            self.log_message(f"Parsed {len(stackup['layers'])} layers from XML. Unit: {stackup['unit']}")
+            return stackup
 
         except Exception as e:
             self.log_message(f"Error parsing XML: {e}")
@@ -160,92 +80,31 @@ class ViaWizardAPI:
 
     def save_stackup_xml(self, path, data):
         print(f"API: save_stackup_xml called with {len(data)} layers")
+        from stackup import save_stackup_xml
         try:
-            # Create root structure similar to stack.xml
-            # <c:Control ...> <Stackup> ...
-            # For simplicity, we'll create a standard root, maybe just Stackup or match the input
-            
-            # Let's try to match the schema: Control -> Stackup
-            root = ET.Element("c:Control", {"xmlns:c": "http://www.ansys.com/control", "schemaVersion": "1.0"})
-            stackup = ET.SubElement(root, "Stackup", {"schemaVersion": "1.0"})
-            
-            materials_node = ET.SubElement(stackup, "Materials")
-            layers_node = ET.SubElement(stackup, "Layers", {"LengthUnit": "mil"}) # Defaulting to mil as per example, or should check current units?
-            
-            # We need to collect unique materials to write to <Materials>
-            # And assign Material names to Layers
-            
-            created_materials = set()
-            
-            for i, layer in enumerate(data):
-                # Generate a material name if not standard
-                # Or just use "Mat_LayerName" for simplicity if properties exist
-                
-                dk = float(layer.get("dk", 0) or 0)
-                df = float(layer.get("df", 0) or 0)
-                cond = float(layer.get("conductivity", 0) or 0)
-                
-                mat_name = "AIR" # Default
-                
-                # If it has specific properties, create a material
-                if dk > 0 or df > 0 or cond > 0:
-                    mat_name = f"Mat_{layer.get('name')}"
-                    
-                    # Check if we already created this material (deduplication could be done but simple is fine)
-                    if mat_name not in created_materials:
-                        mat_elem = ET.SubElement(materials_node, "Material", {"Name": mat_name})
-                        
-                        if dk > 0:
-                            perm = ET.SubElement(mat_elem, "Permittivity")
-                            ET.SubElement(perm, "Double").text = str(dk)
-                        
-                        if df > 0:
-                            loss = ET.SubElement(mat_elem, "DielectricLossTangent")
-                            ET.SubElement(loss, "Double").text = str(df)
-                            
-                        if cond > 0:
-                            c = ET.SubElement(mat_elem, "Conductivity")
-                            ET.SubElement(c, "Double").text = str(cond)
-                            
-                        created_materials.add(mat_name)
-                
-                # Create Layer node
-                layer_elem = ET.SubElement(layers_node, "Layer")
-                layer_elem.set("Name", str(layer.get("name")))
-                layer_elem.set("Type", str(layer.get("type")))
-                layer_elem.set("Thickness", str(layer.get("thickness")))
-                layer_elem.set("Material", mat_name)
-                
-                fill = layer.get("fillMaterial")
-                if fill:
-                    layer_elem.set("FillMaterial", fill)
-                    
-                if layer.get("isReference"):
-                     layer_elem.set("IsReference", "true")
-
-            tree = ET.ElementTree(root)
-            ET.indent(tree, space="  ", level=0)
-            tree.write(path, encoding="utf-8", xml_declaration=True)
-            
+            save_stackup_xml(path, data)
             self.log_message(f"Saved stackup to {path}")
-            
+
         except Exception as e:
             self.log_message(f"Error saving XML: {e}")
             import traceback
             traceback.print_exc()
 
-    def save_project(self, data):
+    def save_project(self, data=None):
+        """Saves the project; without data, the model synced from the GUI is saved."""
+        data = self._project_data(data)
         print(f"API: save_project called with data keys: {list(data.keys())}")
         try:
-            file_path = self._window.create_file_dialog(webview.SAVE_DIALOG, directory='', save_filename='project.json', file_types=('JSON Files (*.json)', 'All files (*.*)'))
+            file_path = self._file_dialog('save', directory='', save_filename='project.json', file_types=PROJECT_FILE_TYPES)
             if file_path:
                 if isinstance(file_path, (list, tuple)):
                     file_path = file_path[0]
                 
-                import json
-                with open(file_path, 'w') as f:
-                    json.dump(data, f, indent=4)
+                from project_file import save_project_file
+                with self._save_lock:
+                    save_project_file(data, file_path)
                 self.log_message(f"Project saved to {file_path}")
+                self._switch_journal(file_path, saved=True)
                 return True
         except Exception as e:
             self.log_message(f"Error saving project: {e}")
@@ -253,253 +112,413 @@ class ViaWizardAPI:
             traceback.print_exc()
         return False
 
+    def _save_project_in_background(self, data, file_path):
+        """Writes the project file next to an export without delaying it.
+
+        The journal moves to the new file once the write succeeded. The
+        thread is not a daemon, so closing the app waits for the write.
+        """
+        from project_file import save_project_file
+
+        def write():
+            try:
+                with self._save_lock:
+                    save_project_file(data, file_path)
+            except Exception as e:
+                self.log_message(f"Error saving project: {e}")
+                return
+            self.log_message(f"Project saved to {file_path}")
+            self._switch_journal(file_path, saved=True)
+
+        thread = threading.Thread(target=write, name='project-save')
+        thread.start()
+        return thread
+
+    def _project_data(self, data):
+        """The project passed by the caller or, if None, a snapshot of the synced model with its feed paths."""
+        if data is not None:
+            return data
+        if self._feed_paths is None:
+            from feed_paths import FeedPathEngine
+            self._feed_paths = FeedPathEngine()
+        return self._feed_paths.fill(self._model.snapshot())
+
     def flatten_project_data(self, data):
-        import math
-        import copy
-        
-        flattened_data = copy.deepcopy(data)
-        new_instances = []
-        
-        for inst in flattened_data['placedInstances']:
-            if inst['type'] == 'diff_gnd':
-                # Create the differential pair instance
-                diff_inst = copy.deepcopy(inst)
-                diff_inst['type'] = 'differential'
-                new_instances.append(diff_inst)
-                
-                # Generate GND vias
-                props = inst.get('properties', {})
-                pitch = float(props.get('pitch', 0))
-                orientation = props.get('orientation', 'horizontal')
-                gnd_radius = float(props.get('gndRadius', 0))
-                gnd_count = int(props.get('gndCount', 0))
-                gnd_angle_step = float(props.get('gndAngleStep', 0))
-                gnd_padstack_index = int(props.get('gndPadstackIndex', 0))
-                
-                cx = inst['x']
-                cy = inst['y']
-                
-                # Determine signal via locations relative to center
-                # Vertical: N top (+y), P bottom (-y)
-                # Horizontal: N right (+x), P left (-x)
-                
-                if orientation == 'vertical':
-                    p_center = (cx, cy - pitch/2)
-                    n_center = (cx, cy + pitch/2)
-                    p_base_angle = 270
-                    n_base_angle = 90
-                else: # horizontal
-                    p_center = (cx - pitch/2, cy)
-                    n_center = (cx + pitch/2, cy)
-                    p_base_angle = 180
-                    n_base_angle = 0
-                    
-                def generate_angles(base_deg, count, step_deg):
-                    angles = []
-                    if count % 2 == 1: # Odd
-                        angles.append(base_deg)
-                        for i in range(1, (count // 2) + 1):
-                            angles.append(base_deg + i * step_deg)
-                            angles.append(base_deg - i * step_deg)
-                    else: # Even
-                        for i in range(1, (count // 2) + 1):
-                            offset = (i - 0.5) * step_deg
-                            angles.append(base_deg + offset)
-                            angles.append(base_deg - offset)
-                    return angles
-
-                # Generate GNDs for P
-                p_angles = generate_angles(p_base_angle, gnd_count, gnd_angle_step)
-                for i, ang_deg in enumerate(p_angles):
-                    ang_rad = math.radians(ang_deg)
-                    gx = p_center[0] + gnd_radius * math.cos(ang_rad)
-                    gy = p_center[1] + gnd_radius * math.sin(ang_rad)
-                    
-                    gnd_inst = {
-                        "id": int(f"{inst['id']}1{i}"), # Fake ID
-                        "name": f"{inst['name']}_GND_P_{i+1}",
-                        "type": "gnd",
-                        "x": gx,
-                        "y": gy,
-                        "padstackIndex": gnd_padstack_index,
-                        "properties": {}
-                    }
-                    new_instances.append(gnd_inst)
-                    
-                # Generate GNDs for N
-                n_angles = generate_angles(n_base_angle, gnd_count, gnd_angle_step)
-                for i, ang_deg in enumerate(n_angles):
-                    ang_rad = math.radians(ang_deg)
-                    gx = n_center[0] + gnd_radius * math.cos(ang_rad)
-                    gy = n_center[1] + gnd_radius * math.sin(ang_rad)
-                    
-                    gnd_inst = {
-                        "id": int(f"{inst['id']}2{i}"), # Fake ID
-                        "name": f"{inst['name']}_GND_N_{i+1}",
-                        "type": "gnd",
-                        "x": gx,
-                        "y": gy,
-                        "padstackIndex": gnd_padstack_index,
-                        "properties": {}
-                    }
-                    new_instances.append(gnd_inst)
-
-            elif inst['type'] == 'surround_via_array':
-                # Find parent
-                props = inst.get('properties', {})
-                connected_id = props.get('connectedDiffPairId')
-                
-                # Find parent instance in the ORIGINAL data (not new_instances)
-                # But wait, we need to look it up. A map would be faster, but list search is fine for now.
-                parent = next((i for i in flattened_data['placedInstances'] if i['id'] == connected_id), None)
-                
-                if parent and (parent['type'] == 'differential' or parent['type'] == 'diff_gnd'):
-                    parent_props = parent.get('properties', {})
-                    pitch = float(parent_props.get('pitch', 1.0))
-                    orientation = parent_props.get('orientation', 'horizontal')
-                    is_vert = (orientation == 'vertical')
-                    
-                    dx = 0 if is_vert else pitch / 2
-                    dy = pitch / 2 if is_vert else 0
-                    
-                    s1 = {'x': parent['x'] - dx, 'y': parent['y'] - dy}
-                    s2 = {'x': parent['x'] + dx, 'y': parent['y'] + dy}
-                    
-                    gnd_radius = float(props.get('gndRadius', 15))
-                    gnd_count = int(props.get('gndCount', 3))
-                    gnd_angle_step = float(props.get('gndAngleStep', 30))
-                    gnd_padstack_index = int(props.get('gndPadstackIndex', 0))
-                    
-                    # Calculate angles
-                    angles = []
-                    if gnd_count % 2 != 0: # Odd
-                        angles.append(0)
-                        for i in range(1, (gnd_count - 1) // 2 + 1):
-                            angles.append(i * gnd_angle_step)
-                            angles.append(-i * gnd_angle_step)
-                    else: # Even
-                        for i in range(1, gnd_count // 2 + 1):
-                            angle = (2 * i - 1) * gnd_angle_step / 2
-                            angles.append(angle)
-                            angles.append(-angle)
-                            
-                    if is_vert:
-                        angle_base1 = 270
-                        angle_base2 = 90
-                    else:
-                        angle_base1 = 180
-                        angle_base2 = 0
-                        
-                    def add_gnds(center, base_angle, suffix_id):
-                        for i, ang in enumerate(angles):
-                            rad = math.radians(base_angle + ang)
-                            gx = center['x'] + gnd_radius * math.cos(rad)
-                            gy = center['y'] + gnd_radius * math.sin(rad)
-                            
-                            gnd_inst = {
-                                "id": int(f"{inst['id']}{suffix_id}{i}"),
-                                "name": f"{inst['name']}_GND_{suffix_id}_{i+1}",
-                                "type": "gnd",
-                                "x": gx,
-                                "y": gy,
-                                "padstackIndex": gnd_padstack_index,
-                                "properties": {}
-                            }
-                            new_instances.append(gnd_inst)
-
-                    add_gnds(s1, angle_base1, 1)
-                    add_gnds(s2, angle_base2, 2)
-
-                    # Keep the surround_via_array entry itself so dog_bone instances
-                    # connected to it can still find their parent in the flattened data.
-                    new_instances.append(inst)
-
-            else:
-                new_instances.append(inst)
-                
-        flattened_data['placedInstances'] = new_instances
-        return flattened_data
+        from flatten import flatten_project_data
+        return flatten_project_data(data)
+
+    def _template_cache_options(self):
+        """(cache directory, size limit in MB) of the template AEDB cache, or (None, None) if disabled in config.json."""
+        config = self.get_config()
+        if not config.get('useTemplateCache', True):
+            return None, None
+        cache_dir = config.get('templateCacheDir') or DEFAULT_TEMPLATE_CACHE_DIR
+        cache_mb = config.get('templateCacheSizeMB', DEFAULT_TEMPLATE_CACHE_MB)
+        return cache_dir, cache_mb
+
+    def _template_cache_args(self):
+        """Command-line options enabling the template AEDB cache, unless disabled in config.json."""
+        cache_dir, cache_mb = self._template_cache_options()
+        if cache_dir is None:
+            return []
+        return ['--template-cache', cache_dir, '--template-cache-size', str(cache_mb)]
+
+    def _export_cache_options(self):
+        """(cache directory, size limit in MB) of the finished AEDB cache, or (None, None) if disabled in config.json."""
+        config = self.get_config()
+        if not config.get('useExportCache', True):
+            return None, None
+        cache_dir = config.get('exportCacheDir') or DEFAULT_EXPORT_CACHE_DIR
+        cache_mb = config.get('exportCacheSizeMB', DEFAULT_EXPORT_CACHE_MB)
+        return cache_dir, cache_mb
+
+    def _acquire_worker(self, version):
+        """An idle warm modeling worker, or a new one pre-warming this AEDB version."""
+        with self._worker_lock:
+            if self._idle_workers:
+                return self._idle_workers.pop()
+        from worker import WarmWorker, DEFAULT_MAX_JOBS
+        max_jobs = int(self.get_config().get('workerMaxJobs', DEFAULT_MAX_JOBS))
+        return WarmWorker(max_jobs=max_jobs, warm_versions=[version])
+
+    def _release_worker(self, worker):
+        with self._worker_lock:
+            self._idle_workers.append(worker)
+
+    def _run_in_worker(self, job, handle_line, export_job):
+        """Runs a modeling job in a warm worker; returns 0 on success like a process exit code."""
+        worker = self._acquire_worker(job['aedb_version'])
+        try:
+            # Cancelling kills the worker process; a new one starts with the next job.
+            export_job.on_cancel(worker.shutdown)
+            result = worker.run(job, handle_line)
+        finally:
+            self._release_worker(worker)
+        export_job.check_cancelled()
+        if result['status'] != 'ok':
+            self.log_message(f"Export Error:\n{result.get('traceback') or result['error']}")
+            return 1
+        return 0
+
+    def _run_in_subprocess(self, job, handle_line, export_job):
+        """Runs a modeling job as a fresh `python modeling.py` process; returns its exit code."""
+        import sys
+
+        # Assume modeling.py is in the same directory as api.py
+        script_path = os.path.join(os.path.dirname(__file__), 'modeling.py')
+        command = [sys.executable, script_path, job['json_path'], job['aedb_version']] + self._template_cache_args()
+        if job['export_cache']:
+            command += ['--export-cache', job['export_cache'], '--export-cache-size', str(job['export_cache_mb'])]
+            if job['link_cached']:
+                command.append('--link-cached')
+        if job['incremental']:
+            command.append('--incremental')
+        if job['profile']:
+            command.append('--profile')
+        command.append('--events')
+        return self._stream_process(command, handle_line, export_job)
+
+    def _stream_process(self, command, handle_line, export_job):
+        """Runs command, passing each stdout line to handle_line; cancelling the job kills its process tree."""
+        import subprocess
+        from jobs import process_group_kwargs, terminate_process_tree
+
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            **process_group_kwargs()
+        )
+        export_job.on_cancel(lambda: terminate_process_tree(process))
+        # Stream stderr on the side so a chatty pyedb cannot block the event stream.
+        def forward_stderr():
+            for line in process.stderr:
+                if line.strip():
+                    self.log_message(line.rstrip('\n'), 'error')
+        stderr_thread = threading.Thread(target=forward_stderr, daemon=True)
+        stderr_thread.start()
+
+        for line in process.stdout:
+            handle_line(line.rstrip('\n'))
+        process.wait()
+        stderr_thread.join()
+        export_job.check_cancelled()
+        return process.returncode
+
+    def _export_jobs(self):
+        if self._job_manager is None:
+            from jobs import JobManager
+            max_concurrent = self.get_config().get('maxConcurrentExports', 1)
+            self._job_manager = JobManager(max_concurrent, on_finish=self._export_job_finished)
+        return self._job_manager
+
+    def _export_job_finished(self, job):
+        if job.status == 'failed':
+            self.log_message(f"Export {job.id} ({job.label}) failed: {job.error}")
+        else:
+            self.log_message(f"Export {job.id} ({job.label}) {job.status}.")
+
+    def list_export_jobs(self):
+        return self._export_jobs().jobs()
+
+    def cancel_export_job(self, job_id):
+        print(f"API: cancel_export_job called with {job_id}")
+        cancelled = self._export_jobs().cancel(job_id)
+        if cancelled:
+            self.log_message(f"Cancelling export {job_id}...")
+        return cancelled
+
+    def set_max_concurrent_exports(self, value):
+        value = max(1, int(value))
+        self.set_config({'maxConcurrentExports': value})
+        self._export_jobs().set_max_concurrent(value)
 
     def export_aedb(self, data, version):
         print(f"API: export_aedb called with version {version}")
+        data = self._project_data(data)
         try:
-            # Save JSON first
-            file_path = self._window.create_file_dialog(webview.SAVE_DIALOG, directory='', save_filename='project.json', file_types=('JSON Files (*.json)', 'All files (*.*)'))
+            # The project file and the exports are written next to each other
+            file_path = self._file_dialog('save', directory='', save_filename='project.json', file_types=PROJECT_FILE_TYPES)
             if file_path:
                 if isinstance(file_path, (list, tuple)):
                     file_path = file_path[0]
-                
-                import json
-                with open(file_path, 'w') as f:
-                    json.dump(data, f, indent=4)
-                self.log_message(f"Project saved to {file_path}")
+
+                # The data is a snapshot, so the readable project file is written off the critical path.
+                self._save_project_in_background(data, file_path)
                 
                 # Flatten Data
                 self.log_message("Flattening project data...")
                 flattened_data = self.flatten_project_data(data)
-                
-                # Save Flattened JSON
                 flatten_path = os.path.splitext(file_path)[0] + '_flatten.json'
-                with open(flatten_path, 'w') as f:
-                    json.dump(flattened_data, f, indent=4)
-                self.log_message(f"Flattened project saved to {flatten_path}")
-                
-                # Call modeling.py
-                import subprocess
-                import sys
-                
-                # Assume modeling.py is in the same directory as api.py
-                script_path = os.path.join(os.path.dirname(__file__), 'modeling.py')
-                
-                self.log_message(f"Calling modeling.py with {flatten_path} and version {version}")
-                
-                def run_export():
+                aedb_path = os.path.splitext(flatten_path)[0] + '.aedb'
+
+                from progress import ProgressTracker, parse_event
+                import telemetry
+
+                config = self.get_config()
+                job = {
+                    'json_path': flatten_path,
+                    'aedb_version': version,
+                    # Re-exporting to the same path only rebuilds the placements that changed.
+                    'incremental': config.get('incrementalExport', True),
+                    'profile': config.get('profileExport', False),
+                    'events': True,
+                }
+                job['template_cache'], job['template_cache_mb'] = self._template_cache_options()
+                # Exporting a project identical to an earlier export reuses that AEDB.
+                job['export_cache'], job['export_cache_mb'] = self._export_cache_options()
+                job['link_cached'] = config.get('linkCachedExports', False)
+                use_worker = config.get('useWarmWorker', True)
+                # The warm worker reads the project from shared memory; the readable
+                # flattened JSON is then written alongside modeling, or not at all.
+                use_shared_memory = use_worker and config.get('sharedMemoryHandoff', True)
+                write_flatten_json = not use_shared_memory or config.get('writeFlattenJson', True)
+                record_history = config.get('recordExportHistory', True)
+                metrics = telemetry.project_metrics(flattened_data)
+
+                def write_flattened():
+                    tmp_path = flatten_path + '.tmp'
+                    with open(tmp_path, 'w') as f:
+                        json.dump(flattened_data, f, indent=4)
+                    os.replace(tmp_path, flatten_path)
+                    self.log_message(f"Flattened project saved to {flatten_path}")
+
+                def run_export(export_job):
+                    # Written under the job's output path lock, so a queued export
+                    # cannot overwrite the JSON of a running one.
+                    shared = None
+                    writer = None
+                    run_job = job
+                    if use_shared_memory:
+                        from shared_project import SharedProject
+                        shared = SharedProject(flattened_data)
+                        run_job = dict(job, shared_project=shared.handle)
+                        if write_flatten_json:
+                            writer = threading.Thread(target=write_flattened, name='flatten-json', daemon=True)
+                            writer.start()
+                    elif write_flatten_json:
+                        write_flattened()
                     try:
-                        process = subprocess.Popen(
-                            [sys.executable, script_path, flatten_path, version],
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            text=True
-                        )
-                        stdout, stderr = process.communicate()
-                        
-                        if stdout:
-                            for line in stdout.splitlines():
-                                if line.strip():
-                                    self.log_message(line)
-                        if stderr:
-                            self.log_message(f"Export Error:\n{stderr}")
-                            
-                        # Calculate expected AEDB path
-                        aedb_path = os.path.splitext(flatten_path)[0] + '.aedb'
-                        self.log_message(f"AEDB File generated at: {aedb_path}")
-                        
-                    except Exception as e:
-                        self.log_message(f"Export process failed: {e}")
-                        
-                import threading
-                t = threading.Thread(target=run_export)
-                t.start()
-                
-                self.log_message("Export process started...")
-                return True
+                        run_modeling(export_job, run_job)
+                    finally:
+                        if shared is not None:
+                            shared.close()
+                        if writer is not None:
+                            writer.join()
+
+                def run_modeling(export_job, job):
+                    history = telemetry.load_history() if record_history else []
+                    collector = telemetry.RunCollector(os.path.abspath(flatten_path), version, metrics)
+                    tracker = ProgressTracker(telemetry.estimator(history, metrics))
+
+                    def publish(state):
+                        export_job.progress = state
+                        self.update_export_progress(dict(state, jobId=export_job.id))
+
+                    def handle_line(line):
+                        event = parse_event(line)
+                        if event is not None:
+                            collector.update(event)
+                            publish(tracker.update(event))
+                        elif line.strip():
+                            self.log_message(line)
+
+                    self.log_message(f"Modeling {flatten_path} with AEDB version {version}"
+                                     f"{' in the warm modeling worker' if use_worker else ''}")
+                    try:
+                        if use_worker:
+                            returncode = self._run_in_worker(job, handle_line, export_job)
+                        else:
+                            returncode = self._run_in_subprocess(job, handle_line, export_job)
+                    except JobCancelled:
+                        publish(dict(tracker.state, status='cancelled'))
+                        raise
+
+                    if tracker.state['status'] == 'running':
+                        # The modeling run ended before its run_end event.
+                        tracker.state['status'] = 'error' if returncode else 'ok'
+                        publish(dict(tracker.state))
+
+                    if record_history:
+                        record = collector.finish(returncode)
+                        telemetry.append_record(record)
+                        warning = telemetry.slow_run_warning(history, record)
+                        if warning:
+                            self.log_message(warning)
+
+                    if returncode:
+                        raise RuntimeError(f"modeling exited with code {returncode}")
+                    self.log_message(f"AEDB File generated at: {aedb_path}")
+
+                from jobs import JobCancelled
+                export_job = self._export_jobs().submit('aedb', os.path.basename(aedb_path), flatten_path, run_export)
+                self.log_message(f"Export {export_job.id} queued ({export_job.label}).")
+                return export_job.id
         except Exception as e:
             self.log_message(f"Error exporting AEDB: {e}")
             import traceback
             traceback.print_exc()
         return False
 
+    def export_aedb_tiled(self, data, version, tile_size, overlap=0, workers=None):
+        print(f"API: export_aedb_tiled called with version {version}, tile_size={tile_size}, overlap={overlap}, workers={workers}")
+        data = self._project_data(data)
+        try:
+            tile_size = float(tile_size or 0)
+            if tile_size <= 0:
+                self.log_message("Tiled export: tile size must be greater than 0.")
+                return False
+
+            file_path = self._file_dialog('save', directory='', save_filename='project.json', file_types=PROJECT_FILE_TYPES)
+            if file_path:
+                if isinstance(file_path, (list, tuple)):
+                    file_path = file_path[0]
+
+                self._save_project_in_background(data, file_path)
+
+                self.log_message("Flattening project data...")
+                flattened_data = self.flatten_project_data(data)
+                flatten_path = os.path.splitext(file_path)[0] + '_flatten.json'
+                out_dir = os.path.splitext(flatten_path)[0] + '_tiles'
+
+                import sys
+
+                script_path = os.path.join(os.path.dirname(__file__), 'tiles.py')
+                command = [sys.executable, script_path, flatten_path, version,
+                           '--tile-size', str(tile_size), '--overlap', str(float(overlap or 0))]
+                command += self._template_cache_args()
+                if workers:
+                    command += ['--workers', str(int(workers))]
+
+                def run_export(export_job):
+                    with open(flatten_path, 'w') as f:
+                        json.dump(flattened_data, f, indent=4)
+                    self.log_message(f"Flattened project saved to {flatten_path}")
+                    self.log_message(f"Calling tiles.py with {flatten_path} and version {version}")
+
+                    def handle_line(line):
+                        if line.strip():
+                            self.log_message(line)
+
+                    returncode = self._stream_process(command, handle_line, export_job)
+                    if returncode:
+                        raise RuntimeError(f"tiles.py exited with code {returncode}")
+
+                export_job = self._export_jobs().submit('tiles', os.path.basename(out_dir), flatten_path, run_export)
+                self.log_message(f"Tiled export {export_job.id} queued ({export_job.label}).")
+                return export_job.id
+        except Exception as e:
+            self.log_message(f"Error exporting tiled AEDB: {e}")
+            import traceback
+            traceback.print_exc()
+        return False
+
+    def export_crosstalk_projects(self, data, radius=None, k=None, dedupe=False, symmetry='none'):
+        print(f"API: export_crosstalk_projects called with radius={radius}, k={k}, dedupe={dedupe}")
+        data = self._project_data(data)
+        try:
+            radius = float(radius) if radius not in (None, '') else None
+            k = int(k) if k not in (None, '') else None
+            if radius is None and k is None:
+                self.log_message("Crosstalk: enter a neighbor radius and/or a neighbor count.")
+                return False
+
+            folder = self._file_dialog('folder', directory='')
+            if folder:
+                if isinstance(folder, (list, tuple)):
+                    folder = folder[0]
+
+                self.log_message("Flattening project data...")
+                flattened_data = self.flatten_project_data(data)
+
+                if dedupe:
+                    from canonical import write_representative_projects
+
+                    manifest_path, manifest = write_representative_projects(flattened_data, folder, radius, k, symmetry or 'none')
+                    report = manifest['report']
+                    for group in manifest['groups']:
+                        self.log_message(f"Cell {group['key']}: {group['representative']} represents {len(group['members'])} vias -> {group['json']}")
+                    self.log_message(
+                        f"{report['signalVias']} signal vias reduce to {report['uniqueCells']} unique cells. Manifest: {manifest_path}"
+                    )
+                    return True
+
+                from crosstalk import write_victim_projects
+
+                manifest_path, manifest = write_victim_projects(flattened_data, folder, radius, k)
+                for entry in manifest['victims']:
+                    self.log_message(f"Crosstalk: {entry['victim']} -> {entry['json']} ({len(entry['neighbors'])} neighbors)")
+                self.log_message(f"Wrote {len(manifest['victims'])} victim projects. Manifest: {manifest_path}")
+                return True
+        except Exception as e:
+            self.log_message(f"Error generating crosstalk projects: {e}")
+            import traceback
+            traceback.print_exc()
+        return False
+
     def load_project(self):
         print("API: load_project called")
         try:
-            file_path = self._window.create_file_dialog(webview.OPEN_DIALOG, directory='', file_types=('JSON Files (*.json)', 'All files (*.*)'))
+            file_path = self._file_dialog('open', directory='', file_types=PROJECT_FILE_TYPES)
             if file_path:
                 if isinstance(file_path, (list, tuple)):
                     file_path = file_path[0]
                 
-                import json
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
+                from project_file import is_compact_path, load_project_file
+                recovered = self._recover_journal(file_path)
+                if recovered is not None:
+                    self._model.reset(recovered)
+                    return recovered
+                self._switch_journal(file_path)
+                threshold_mb = self.get_config().get('streamLoadThresholdMB', STREAM_LOAD_THRESHOLD_MB)
+                if not is_compact_path(file_path) and os.path.getsize(file_path) > threshold_mb * 2**20:
+                    data = self._open_project_stream(file_path)
+                    self._model.reset({key: value for key, value in data.items() if key != 'streamId'})
+                    return data
+                data = load_project_file(file_path)
+                self._model.reset(data)
                 self.log_message(f"Project loaded from {file_path}")
                 return data
         except Exception as e:
@@ -508,6 +527,147 @@ class ViaWizardAPI:
             traceback.print_exc()
         return None
 
+    def _open_project_stream(self, file_path):
+        """Reads the sections before placedInstances and returns them with a streamId for the instances."""
+        from project_stream import iter_project
+
+        events = iter_project(file_path)
+        data = {}
+        first = None
+        for event in events:
+            if event[0] != 'section':
+                first = event
+                break
+            data[event[1]] = event[2]
+        data['placedInstances'] = []
+        if first is not None:
+            import itertools
+            stream_id = f"stream-{len(self._project_streams) + 1}"
+            self._project_streams[stream_id] = (file_path, itertools.chain([first], events))
+            data['streamId'] = stream_id
+            self.log_message(f"Project sections loaded from {file_path}; loading instances...")
+        else:
+            self.log_message(f"Project loaded from {file_path}")
+        return data
+
+    def stream_project_instances(self, stream_id):
+        """Sends the instances of an opened project stream to the GUI in chunks (appendProjectInstances).
+
+        Returns the sections stored after placedInstances, or None on error.
+        """
+        file_path, events = self._project_streams.pop(stream_id, (None, None))
+        if events is None:
+            return None
+        trailing = {}
+        try:
+            for event in events:
+                if event[0] == 'section':
+                    trailing[event[1]] = event[2]
+                elif event[0] == 'instances':
+                    self._model.extend_instances(event[1])
+                    if self._window:
+                        self._window.evaluate_js(f"appendProjectInstances({json.dumps(event[1])})")
+                elif event[0] == 'instances_end':
+                    self.log_message(f"Loaded {event[1]} instances.")
+        except Exception as e:
+            self.log_message(f"Error loading project instances: {e}")
+            return None
+        self._model.apply([{'op': 'section', 'key': key, 'value': value} for key, value in trailing.items()])
+        self.log_message(f"Project loaded from {file_path}")
+        return trailing
+
+    def _switch_journal(self, file_path, saved=False):
+        """Starts autosaving edits against a project file that was just opened or saved."""
+        from journal import ProjectJournal
+
+        previous = self._journal
+        self._journal = ProjectJournal(file_path)
+        self._journal.begin()
+        if saved and previous is not None and previous.journal_path != self._journal.journal_path:
+            previous.discard() # its edits are in the saved file now
+
+    def _recover_journal(self, file_path):
+        """The project with the edits journaled since it was last saved, or None if there are none."""
+        from journal import ProjectJournal
+
+        journal = ProjectJournal(file_path)
+        if not journal.has_edits():
+            return None
+        if journal.is_stale():
+            self.log_message(f"WARNING: Discarding autosaved edits of {file_path}: the file was changed after them.")
+            journal.discard()
+            return None
+        data = journal.recover()
+        self._journal = journal
+        self.log_message(f"Project loaded from {file_path} with unsaved edits restored from the autosave journal.")
+        return data
+
+    def sync_project(self, ops):
+        """Applies GUI edit operations (see journal.apply_ops) to the model and journals them.
+
+        Returns the model revision after the operations.
+        """
+        revision = self._model.apply(ops)
+        self._append_journal(ops)
+        return revision
+
+    def _append_journal(self, ops):
+        try:
+            if self._journal is None:
+                from journal import ProjectJournal
+                self._journal = ProjectJournal()
+            self._journal.append(ops)
+        except Exception as e:
+            print(f"Autosave failed: {e}")
+
+    def _push_ops(self, ops):
+        """Applies operations made on the Python side and sends them to the GUI as a patch."""
+        self._model.apply(ops)
+        self._append_journal(ops)
+        if self._window:
+            self._window.evaluate_js(f"applyProjectPatch({json.dumps(ops)})")
+
+    def import_instances(self):
+        """Adds the instances (and any padstacks they need) of another project file to the open project."""
+        print("API: import_instances called")
+        try:
+            file_path = self._file_dialog('open', directory='', file_types=PROJECT_FILE_TYPES)
+            if file_path:
+                if isinstance(file_path, (list, tuple)):
+                    file_path = file_path[0]
+
+                from project_file import load_project_file
+                ops = self._model.import_ops(load_project_file(file_path))
+                self._push_ops(ops)
+                count = sum(1 for op in ops if op['op'] == 'add')
+                self.log_message(f"Imported {count} instances from {file_path}")
+                return count
+        except Exception as e:
+            self.log_message(f"Error importing instances: {e}")
+            import traceback
+            traceback.print_exc()
+        return False
+
+    def recover_autosave(self):
+        """The untitled project left unsaved by the last session, or None."""
+        from journal import ProjectJournal
+
+        self._journal = ProjectJournal()
+        if not self._journal.has_edits():
+            return None
+        try:
+            data = self._journal.recover()
+            self._model.reset(data)
+            return data
+        except Exception as e:
+            self.log_message(f"WARNING: Could not restore the autosaved project: {e}")
+            return None
+
+    def discard_autosave(self):
+        if self._journal is not None:
+            self._journal.discard()
+        self._model.reset({})
+
     def get_config(self):
         print("API: get_config called")
         try:
@@ -533,14 +693,29 @@ class ViaWizardAPI:
 
     def exit_app(self):
         print("API: exit_app called")
+        if self._job_manager is not None:
+            self._job_manager.cancel_all()
+        with self._worker_lock:
+            workers, self._idle_workers = self._idle_workers, []
+        for worker in workers:
+            worker.shutdown()
+        self._log.flush()
         if self._window:
             self._window.destroy()
 
-    def log_message(self, message):
+    def update_export_progress(self, state):
+        if self._window:
+            self._window.evaluate_js(f"updateExportProgress({json.dumps(state)})")
+
+    def log_message(self, message, level=None):
+        """Queues a message for the GUI message window; lines are delivered in batches by self._log."""
         print(f"API: log_message -> {message}")
         if self._window:
-            safe_message = str(message).replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n")
-            self._window.evaluate_js(f"addMessage('{safe_message}')")
+            self._log.add(str(message), level)
+
+    def _deliver_log_batch(self, entries):
+        if self._window:
+            self._window.evaluate_js(f"addMessages({json.dumps(entries)})")
 
     def get_stackup_data(self):
         print("API: get_stackup_data called")
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+ENTRY_FILE = 'entry.json'
+PAYLOAD_DIR = 'payload'
+
+
+def content_key(*parts):
+    """Returns a stable SHA-256 hex digest of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _tree_size(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _payload_files(path):
+    """(relative path, absolute path) of every file of a payload, in a stable order."""
+    if not os.path.isdir(path):
+        return [(os.path.basename(path), path)]
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        for name in sorted(names):
+            full = os.path.join(root, name)
+            files.append((os.path.relpath(full, path).replace(os.sep, '/'), full))
+    return files
+
+
+def payload_digest(path):
+    """SHA-256 over the relative paths and contents of every file of a payload (file or directory)."""
+    digest = hashlib.sha256()
+    for rel_path, full in _payload_files(path):
+        digest.update(rel_path.encode('utf-8') + b'\0')
+        with open(full, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _link_or_copy(src, dest):
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def _copy_payload(src, dest, link=False):
+    copy_function = _link_or_copy if link else shutil.copy2
+    if os.path.isdir(src):
+        shutil.copytree(src, dest, copy_function=copy_function)
+    else:
+        copy_function(src, dest)
+
+
+def _remove_path(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+class ArtifactStore:
+    """Size-bounded on-disk store of files or directories keyed by content hash.
+
+    Each entry lives in <root>/<key>/ with the copied payload and an
+    entry.json holding its size, content digest and last access time.
+    Entries are published with an atomic rename, so concurrent writers of the
+    same key are safe, and the least recently used entries are evicted once
+    the store exceeds max_bytes. A fetch with verify=True re-hashes the
+    payload and drops the entry if it was modified or truncated.
+    """
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _read_entry(self, key):
+        try:
+            with open(os.path.join(self._entry_dir(key), ENTRY_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, entry_dir, entry):
+        tmp_path = os.path.join(entry_dir, f".{ENTRY_FILE}.{os.urandom(16).hex()}")
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, indent=4)
+        os.replace(tmp_path, os.path.join(entry_dir, ENTRY_FILE))
+
+    def has(self, key):
+        return self._read_entry(key) is not None
+
+    def metadata(self, key):
+        entry = self._read_entry(key)
+        return entry.get('metadata', {}) if entry else None
+
+    def verify(self, key):
+        """True if the entry payload still matches the digest recorded when it was stored."""
+        entry = self._read_entry(key)
+        payload = os.path.join(self._entry_dir(key), PAYLOAD_DIR)
+        if entry is None or not os.path.exists(payload):
+            return False
+        if 'digest' not in entry:
+            return True # stored before digests were recorded
+        try:
+            return payload_digest(payload) == entry['digest']
+        except OSError:
+            return False
+
+    def remove(self, key):
+        _remove_path(self._entry_dir(key))
+
+    def fetch(self, key, dest_path, verify=False, link=False):
+        """Copies the entry payload to dest_path (replacing it). Returns False on a miss.
+
+        verify checks the payload digest first; a corrupt entry is removed and
+        reported as a miss. link hard-links the payload files instead of
+        copying them where the file system allows it. Linked files are shared
+        with the store, so an in-place edit of them shows up as corruption on
+        the next verified fetch.
+        """
+        entry = self._read_entry(key)
+        if entry is None:
+            return False
+
+        payload = os.path.join(self._entry_dir(key), PAYLOAD_DIR)
+        if not os.path.exists(payload):
+            return False
+        if verify and not self.verify(key):
+            print(f"WARNING: Cache entry {key[:12]} failed its integrity check and was removed.")
+            self.remove(key)
+            return False
+
+        _remove_path(dest_path)
+        _copy_payload(payload, dest_path, link)
+
+        entry['lastAccess'] = time.time()
+        entry['hits'] = entry.get('hits', 0) + 1
+        try:
+            self._write_entry(self._entry_dir(key), entry)
+        except OSError:
+            pass
+        return True
+
+    def store(self, key, src_path, metadata=None):
+        """Copies src_path into the store under key and evicts old entries. Returns the entry size."""
+        staging = os.path.join(self.root, f".tmp-{os.urandom(16).hex()}")
+        os.makedirs(staging)
+        try:
+            payload = os.path.join(staging, PAYLOAD_DIR)
+            _copy_payload(src_path, payload)
+            now = time.time()
+            entry = {
+                'key': key,
+                'created': now,
+                'lastAccess': now,
+                'hits': 0,
+                'size': _tree_size(staging),
+                'digest': payload_digest(payload),
+                'metadata': metadata or {},
+            }
+            self._write_entry(staging, entry)
+
+            target = self._entry_dir(key)
+            if os.path.exists(target):
+                # Another writer published the same content first.
+                return entry['size']
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # Lost the race between the check and the rename.
+                if not os.path.exists(target):
+                    raise
+                return entry['size']
+        finally:
+            _remove_path(staging)
+
+        self.evict(keep=key)
+        return entry['size']
+
+    def entries(self):
+        """Returns entry dicts for every complete entry, oldest access first."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.startswith('.'):
+                continue
+            entry = self._read_entry(name)
+            if entry is not None:
+                entries.append(entry)
+        return sorted(entries, key=lambda item: item.get('lastAccess', 0))
+
+    def total_size(self):
+        return sum(entry.get('size', 0) for entry in self.entries())
+
+    def evict(self, keep=None):
+        """Deletes least recently used entries until the store fits in max_bytes."""
+        entries = self.entries()
+        total = sum(entry.get('size', 0) for entry in entries)
+        removed = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry['key'] == keep:
+                continue
+            _remove_path(self._entry_dir(entry['key']))
+            total -= entry.get('size', 0)
+            removed.append(entry['key'])
+        return removed
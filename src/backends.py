@@ -0,0 +1,358 @@
+import os
+import json
+from types import SimpleNamespace
+
+RECORDING_FILE = 'recording.json'
+
+
+class PyedbBackend:
+    """Default backend: real EDB sessions through pyedb (requires an AEDT install)."""
+    name = 'pyedb'
+
+    def new(self, aedb_version):
+        from pyedb import Edb
+        return Edb(version=aedb_version)
+
+    def open(self, edbpath, aedb_version):
+        from pyedb import Edb
+        return Edb(edbpath=edbpath, version=aedb_version)
+
+    def warm(self, aedb_version):
+        """Imports pyedb and opens/closes a blank EDB so later sessions of this version skip runtime start-up."""
+        self.new(aedb_version).close_edb()
+
+
+class RecordingBackend:
+    """Offline backend: records every created object in memory and saves it as <aedb>/recording.json."""
+    name = 'recording'
+
+    def new(self, aedb_version):
+        return RecordingEdb(aedb_version)
+
+    def open(self, edbpath, aedb_version):
+        with open(os.path.join(edbpath, RECORDING_FILE), 'r') as f:
+            state = json.load(f)
+        return RecordingEdb(aedb_version, state, edbpath)
+
+    def warm(self, aedb_version):
+        pass
+
+
+BACKENDS = {backend.name: backend for backend in (PyedbBackend, RecordingBackend)}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown modeling backend '{name}'. Choose from: {', '.join(BACKENDS)}.") from None
+
+
+def _jsonable(value):
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, 'id'):
+        return value.id
+    return str(value)
+
+
+class _Record:
+    """Attribute view of a JSON dict: attribute writes are stored in the dict."""
+    def __init__(self, data):
+        object.__setattr__(self, '_data', data)
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self._data[name] = _jsonable(value)
+
+
+class RecordingEdb:
+    """In-memory stand-in for the pyedb Edb calls made by EdbProject."""
+    def __init__(self, aedb_version, state=None, edbpath=None):
+        self.edbpath = edbpath
+        self.state = state or {
+            'version': aedb_version,
+            'nextId': 1,
+            'extent': {},
+            'setups': {},
+            'materials': {},
+            'layers': [],
+            'padstackDefinitions': {},
+            'primitives': {},
+            'padstackInstances': {},
+            'nets': [],
+            'ports': {},
+            'components': {},
+        }
+        self.core_hfss = SimpleNamespace(hfss_extent_info=_Record(self.state['extent']))
+        self.materials = _RecordingMaterials(self)
+        self.stackup = _RecordingStackup(self)
+        self.modeler = _RecordingModeler(self)
+        self.padstacks = _RecordingPadstacks(self)
+        self.hfss = _RecordingHfss(self)
+        self.nets = _RecordingNets(self)
+        self.components = _RecordingComponents(self)
+
+    def next_id(self):
+        object_id = self.state['nextId']
+        self.state['nextId'] += 1
+        return object_id
+
+    def create_hfss_setup(self, name):
+        setup = self.state['setups'].setdefault(name, {'name': name, 'viaSettings': {}, 'solution': {}, 'sweeps': {}})
+        return _RecordingSetup(setup)
+
+    @property
+    def ports(self):
+        return {name: _RecordingPort(self, name) for name in self.state['ports']}
+
+    def save_edb_as(self, path):
+        self.edbpath = path
+        self.save_edb()
+
+    def save_edb(self):
+        os.makedirs(self.edbpath, exist_ok=True)
+        tmp_path = os.path.join(self.edbpath, RECORDING_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.edbpath, RECORDING_FILE))
+        return True
+
+    def close_edb(self):
+        return True
+
+
+class _RecordingSetup:
+    def __init__(self, data):
+        self._data = data
+        self.via_settings = _Record(data['viaSettings'])
+
+    def set_solution_single_frequency(self, frequency, max_num_passes, max_delta_s):
+        self._data['solution'] = {'frequency': frequency, 'maxNumPasses': max_num_passes, 'maxDeltaS': max_delta_s}
+        return True
+
+    def add_sweep(self, name, frequency_set=None):
+        self._data['sweeps'][name] = _jsonable(frequency_set)
+        return True
+
+
+class _RecordingMaterials:
+    def __init__(self, edb):
+        self._edb = edb
+
+    def add_conductor_material(self, name, conductivity):
+        self._edb.state['materials'][name] = {'type': 'conductor', 'conductivity': _jsonable(conductivity)}
+        return name
+
+    def add_dielectric_material(self, name, permittivity, dielectric_loss_tangent):
+        self._edb.state['materials'][name] = {
+            'type': 'dielectric', 'permittivity': _jsonable(permittivity),
+            'lossTangent': _jsonable(dielectric_loss_tangent),
+        }
+        return name
+
+
+class _RecordingStackup:
+    def __init__(self, edb):
+        self._edb = edb
+
+    def add_layer_bottom(self, name, layer_type='signal', material='copper', thickness='0'):
+        self._edb.state['layers'].append({'name': name, 'type': layer_type, 'material': material, 'thickness': thickness})
+        return name
+
+    def signal_layers_between(self, start_layer, stop_layer):
+        names = [layer['name'] for layer in self._edb.state['layers'] if layer['type'] == 'signal']
+        if start_layer not in names or stop_layer not in names:
+            return [name for name in (start_layer, stop_layer) if name]
+        start, stop = names.index(start_layer), names.index(stop_layer)
+        return names[min(start, stop):max(start, stop) + 1]
+
+
+class _RecordingPrimitive(_Record):
+    def __init__(self, edb, data):
+        super().__init__(data)
+        object.__setattr__(self, '_edb', edb)
+
+    def delete(self):
+        primitives = self._edb.state['primitives']
+        primitives.pop(str(self.id), None)
+        for primitive in primitives.values():
+            if self.id in primitive.get('voids', []):
+                primitive['voids'].remove(self.id)
+        return True
+
+
+class _RecordingModeler:
+    def __init__(self, edb):
+        self._edb = edb
+
+    def _add(self, kind, layer_name, net_name, **geometry):
+        primitive = {'id': self._edb.next_id(), 'kind': kind, 'layer': layer_name, 'net': net_name or '', 'voids': []}
+        primitive.update({key: _jsonable(value) for key, value in geometry.items()})
+        if net_name:
+            self._edb.nets.find_or_create_net(net_name)
+        self._edb.state['primitives'][str(primitive['id'])] = primitive
+        return _RecordingPrimitive(self._edb, primitive)
+
+    def create_trace(self, path_list, layer_name, width=1, net_name="", start_cap_style="Round",
+                     end_cap_style="Round", corner_style="Round"):
+        return self._add('trace', layer_name, net_name, points=path_list, width=width,
+                         startCap=start_cap_style, endCap=end_cap_style, cornerStyle=corner_style)
+
+    def create_rectangle(self, layer_name, net_name="", lower_left_point="", upper_right_point="", center_point="",
+                         width="", height="", representation_type="LowerLeftUpperRight", corner_radius="0mm",
+                         rotation="0deg"):
+        return self._add('rectangle', layer_name, net_name, lowerLeft=lower_left_point, upperRight=upper_right_point,
+                         center=center_point, width=width, height=height, representation=representation_type,
+                         cornerRadius=corner_radius, rotation=rotation)
+
+    def create_circle(self, layer_name, x, y, radius, net_name=""):
+        return self._add('circle', layer_name, net_name, center=[x, y], radius=radius)
+
+    def add_void(self, shape, void_shape):
+        self._edb.state['primitives'][str(shape.id)]['voids'].append(void_shape.id)
+        return True
+
+    @property
+    def primitives(self):
+        return [_RecordingPrimitive(self._edb, data) for data in self._edb.state['primitives'].values()]
+
+    @property
+    def primitives_by_layer(self):
+        by_layer = {}
+        for primitive in self.primitives:
+            by_layer.setdefault(primitive.layer, []).append(primitive)
+        return by_layer
+
+
+class _RecordingPadstackDefinition(_Record):
+    @property
+    def pad_by_layer(self):
+        return {layer: _Record(pad) for layer, pad in self._data['pads'].items()}
+
+    @property
+    def antipad_by_layer(self):
+        return {layer: _Record(pad) for layer, pad in self._data['antipads'].items()}
+
+
+class _RecordingPadstackInstance(_Record):
+    def __init__(self, edb, data):
+        super().__init__(data)
+        object.__setattr__(self, '_edb', edb)
+
+    def set_backdrill_bottom(self, drill_depth, drill_diameter, offset=0.0):
+        self._data['backdrillBottom'] = {'depth': drill_depth, 'diameter': drill_diameter, 'offset': offset}
+        return True
+
+    def delete(self):
+        self._edb.state['padstackInstances'].pop(str(self.id), None)
+        return True
+
+
+class _RecordingPadstacks:
+    def __init__(self, edb):
+        self._edb = edb
+
+    def create(self, padstackname=None, holediam="300um", paddiam="400um", antipaddiam="600um",
+               start_layer=None, stop_layer=None, **options):
+        layers = self._edb.stackup.signal_layers_between(start_layer, stop_layer)
+        self._edb.state['padstackDefinitions'][padstackname] = {
+            'name': padstackname,
+            'holeDiameter': holediam,
+            'padDiameter': paddiam,
+            'antipadDiameter': antipaddiam,
+            'startLayer': start_layer,
+            'stopLayer': stop_layer,
+            'options': _jsonable(options),
+            'pads': {layer: {'shape': 'Circle', 'parameters': {'Diameter': paddiam}} for layer in layers},
+            'antipads': {layer: {'shape': 'Circle', 'parameters': {'Diameter': antipaddiam}} for layer in layers},
+        }
+        return padstackname
+
+    @property
+    def definitions(self):
+        return {name: _RecordingPadstackDefinition(data)
+                for name, data in self._edb.state['padstackDefinitions'].items()}
+
+    def place(self, position, definition_name, net_name="", via_name="", rotation=0.0, fromlayer=None,
+              tolayer=None, solderlayer=None, is_pin=False):
+        if definition_name not in self._edb.state['padstackDefinitions']:
+            raise ValueError(f"Padstack definition '{definition_name}' does not exist.")
+        instance = {
+            'id': self._edb.next_id(), 'definition': definition_name, 'position': _jsonable(position),
+            'net': net_name or '', 'isPin': bool(is_pin), 'rotation': rotation,
+        }
+        if net_name:
+            self._edb.nets.find_or_create_net(net_name)
+        self._edb.state['padstackInstances'][str(instance['id'])] = instance
+        return _RecordingPadstackInstance(self._edb, instance)
+
+    @property
+    def instances(self):
+        return {int(key): _RecordingPadstackInstance(self._edb, data)
+                for key, data in self._edb.state['padstackInstances'].items()}
+
+
+class _RecordingPort:
+    def __init__(self, edb, name):
+        self._edb = edb
+        self.name = name
+
+    def delete(self):
+        self._edb.state['ports'].pop(self.name, None)
+        return True
+
+
+class _RecordingHfss:
+    def __init__(self, edb):
+        self._edb = edb
+
+    def create_wave_port(self, prim_id, point_on_edge, port_name=None, **options):
+        self._edb.state['ports'][port_name] = {
+            'kind': 'wave', 'primitive': _jsonable(prim_id), 'point': _jsonable(point_on_edge),
+            'options': _jsonable(options),
+        }
+        return port_name
+
+    def create_differential_wave_port(self, positive_primitive_id, positive_points_on_edge, negative_primitive_id,
+                                      negative_points_on_edge, port_name=None, **options):
+        self._edb.state['ports'][port_name] = {
+            'kind': 'differential',
+            'positive': {'primitive': _jsonable(positive_primitive_id), 'point': _jsonable(positive_points_on_edge)},
+            'negative': {'primitive': _jsonable(negative_primitive_id), 'point': _jsonable(negative_points_on_edge)},
+            'options': _jsonable(options),
+        }
+        return port_name, None, None
+
+
+class _RecordingNets:
+    def __init__(self, edb):
+        self._edb = edb
+        self._names = set(edb.state['nets'])
+
+    def find_or_create_net(self, net_name='', **options):
+        if net_name and net_name not in self._names:
+            self._names.add(net_name)
+            self._edb.state['nets'].append(net_name)
+        return net_name
+
+
+class _RecordingComponents:
+    def __init__(self, edb):
+        self._edb = edb
+
+    def create_component_from_pins(self, pins, component_name, placement_layer=None, component_part_name=None):
+        self._edb.state['components'][component_name] = {
+            'pins': sorted(pin.id for pin in pins),
+            'placementLayer': placement_layer,
+        }
+        return True
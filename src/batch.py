@@ -0,0 +1,239 @@
+"""Headless batch export: flatten and model many projects without the GUI.
+
+Every project runs in its own `python batch.py --one ...` process, at most
+--jobs at a time, so a job that exceeds --timeout can be killed without
+affecting the others. Outputs are named like the GUI's export
+(<project>_flatten.json and <project>_flatten.aedb next to the project, or
+in --output-dir), and a JSON summary report is written at the end.
+
+Run from src/:
+    python batch.py "library/**/*.json" --version 2024.1 --jobs 4 --timeout 1800 --report nightly.json
+    python batch.py ../examples --version 2024.1 --backend recording
+
+Nothing here imports the GUI (api.py, webview).
+"""
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from jobs import process_group_kwargs, terminate_process_tree
+from progress import parse_event
+
+DEFAULT_TIMEOUT = 3600
+DEFAULT_TEMPLATE_CACHE_MB = 2048
+DEFAULT_EXPORT_CACHE_MB = 10240
+DEFAULT_REPORT = 'batch_report.json'
+FAILURE_PREFIX = 'Export failed: '
+REPORT_SCHEMA_VERSION = 1
+PROJECT_PATTERNS = ('*.json', '*.vwz')
+# Files next to projects that are not projects themselves.
+EXCLUDED_SUFFIXES = ('_flatten.json', '.plan.json', '.profile.json', '.autosave.json', '.journal.jsonl',
+                     'manifest.json', DEFAULT_REPORT)
+
+
+def collect_projects(inputs):
+    """Project files named by paths, directories (searched recursively) or glob patterns, without duplicates."""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [path for pattern in PROJECT_PATTERNS
+                          for path in glob.glob(os.path.join(item, '**', pattern), recursive=True)]
+        elif glob.has_magic(item):
+            candidates = glob.glob(item, recursive=True)
+        else:
+            candidates = [item]
+        found.extend(sorted(path for path in candidates if not path.endswith(EXCLUDED_SUFFIXES)))
+    unique = {}
+    for path in found:
+        unique.setdefault(os.path.normcase(os.path.abspath(path)), path)
+    return list(unique.values())
+
+
+def output_paths(project_path, output_dir=None):
+    """(flattened JSON, AEDB) paths of a project, named like the GUI's export."""
+    stem = os.path.splitext(os.path.basename(project_path))[0]
+    directory = output_dir or os.path.dirname(os.path.abspath(project_path))
+    flatten_path = os.path.join(directory, stem + '_flatten.json')
+    return flatten_path, os.path.splitext(flatten_path)[0] + '.aedb'
+
+
+def export_project(project_path, flatten_path, aedb_version, backend='pyedb', template_cache=None,
+                   template_cache_mb=DEFAULT_TEMPLATE_CACHE_MB, export_cache=None,
+                   export_cache_mb=DEFAULT_EXPORT_CACHE_MB, incremental=False):
+    """Flattens one project and models it (in this process)."""
+    from artifact_store import ArtifactStore
+    from backends import get_backend
+    from feed_paths import FeedPathEngine
+    from flatten import flatten_project_data
+    from modeling import EdbProject
+    from progress import EventEmitter
+    from project_file import load_project_file
+
+    data = FeedPathEngine().fill(load_project_file(project_path), missing_only=True)
+    flattened = flatten_project_data(data)
+    os.makedirs(os.path.dirname(os.path.abspath(flatten_path)), exist_ok=True)
+    with open(flatten_path, 'w') as f:
+        json.dump(flattened, f, indent=4)
+    template_store = ArtifactStore(template_cache, template_cache_mb * 1024 * 1024) if template_cache else None
+    export_store = ArtifactStore(export_cache, export_cache_mb * 1024 * 1024) if export_cache else None
+    project = EdbProject(flatten_path, aedb_version, template_store, get_backend(backend), events=EventEmitter(),
+                         export_store=export_store, data=flattened)
+    project.run_modeling(incremental=incremental)
+
+
+def _job_command(project_path, flatten_path, args):
+    command = [sys.executable, os.path.abspath(__file__), '--one', project_path, '--flatten', flatten_path,
+               '--version', args.version, '--backend', args.backend]
+    if args.template_cache:
+        command += ['--template-cache', args.template_cache, '--template-cache-size', str(args.template_cache_size)]
+    if args.export_cache:
+        command += ['--export-cache', args.export_cache, '--export-cache-size', str(args.export_cache_size)]
+    if args.incremental:
+        command.append('--incremental')
+    return command
+
+
+def run_job(project_path, args, stop):
+    """Runs one project in a child process with a timeout; returns its report entry."""
+    flatten_path, aedb_path = output_paths(project_path, args.output_dir)
+    log_path = os.path.splitext(flatten_path)[0] + '.batch.log'
+    entry = {'project': project_path, 'flatten': flatten_path, 'aedb': aedb_path, 'log': log_path}
+    if stop.is_set():
+        return dict(entry, status='skipped', seconds=0.0)
+
+    os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(_job_command(project_path, flatten_path, args), stdout=log,
+                                   stderr=subprocess.STDOUT, text=True, **process_group_kwargs())
+        try:
+            process.wait(timeout=args.timeout)
+            status = 'succeeded' if process.returncode == 0 else 'failed'
+        except subprocess.TimeoutExpired:
+            terminate_process_tree(process)
+            status = 'timeout'
+    entry.update(status=status, returncode=process.returncode, seconds=round(time.perf_counter() - start, 3))
+
+    # The child's run_start/run_end events tell how it finished (full build, cache hit, ...) and why it failed.
+    with open(log_path, 'r') as log:
+        for line in log:
+            line = line.rstrip('\n')
+            if line.startswith(FAILURE_PREFIX):
+                entry['error'] = line[len(FAILURE_PREFIX):]
+            event = parse_event(line)
+            if event is None:
+                continue
+            if event.get('event') == 'run_start':
+                entry['mode'] = event.get('mode')
+            elif event.get('event') == 'run_end' and event.get('error'):
+                entry['error'] = event['error']
+    if status == 'timeout':
+        entry['error'] = f"Timed out after {args.timeout} s."
+    elif status == 'failed' and 'error' not in entry:
+        entry['error'] = f"Exited with code {process.returncode}; see {log_path}."
+    return entry
+
+
+def run_batch(projects, args):
+    stop = threading.Event() # set by --fail-fast after the first failure
+    entries = [None] * len(projects)
+
+    def run(index):
+        entry = run_job(projects[index], args, stop)
+        entries[index] = entry
+        label = f"[{sum(e is not None for e in entries)}/{len(projects)}]"
+        print(f"{label} {entry['status']:<9} {entry['seconds']:8.1f}s  {entry['project']}"
+              + (f"  ({entry['error']})" if entry.get('error') else ''), flush=True)
+        if args.fail_fast and entry['status'] in ('failed', 'timeout'):
+            stop.set()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        list(pool.map(run, range(len(projects))))
+    counts = {}
+    for entry in entries:
+        counts[entry['status']] = counts.get(entry['status'], 0) + 1
+    return {
+        'schema': REPORT_SCHEMA_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'aedbVersion': args.version,
+        'backend': args.backend,
+        'jobs': args.jobs,
+        'timeout': args.timeout,
+        'seconds': round(time.perf_counter() - start, 3),
+        'counts': counts,
+        'projects': entries,
+    }
+
+
+def add_export_arguments(parser):
+    """Options shared by every command that exports through run_batch (batch.py, sweep.py)."""
+    parser.add_argument('--version', default='2024.1', help="AEDB version (default: 2024.1).")
+    parser.add_argument('--jobs', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Projects modeled at the same time (default: half the CPU cores).")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds one project may take before it is killed (default: {DEFAULT_TIMEOUT}).")
+    parser.add_argument('--backend', default='pyedb', choices=['pyedb', 'recording'],
+                        help="Modeling backend; recording writes <project>.aedb/recording.json without Ansys.")
+    parser.add_argument('--template-cache', default=None, help="Directory of cached template AEDBs.")
+    parser.add_argument('--template-cache-size', type=float, default=DEFAULT_TEMPLATE_CACHE_MB,
+                        help=f"Template cache size limit in MB (default: {DEFAULT_TEMPLATE_CACHE_MB}).")
+    parser.add_argument('--export-cache', default=None, help="Directory of cached finished AEDBs.")
+    parser.add_argument('--export-cache-size', type=float, default=DEFAULT_EXPORT_CACHE_MB,
+                        help=f"Export cache size limit in MB (default: {DEFAULT_EXPORT_CACHE_MB}).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Update previous exports in place when only placements changed.")
+    parser.add_argument('--fail-fast', action='store_true', help="Skip the remaining projects after a failure.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flatten and model Via Wizard projects without the GUI.")
+    parser.add_argument('inputs', nargs='*', help="Project files, directories or glob patterns (quote them).")
+    parser.add_argument('--output-dir', default=None,
+                        help="Write the flattened JSON and AEDB here instead of next to each project.")
+    parser.add_argument('--report', default=None,
+                        help=f"Summary report path (default: {DEFAULT_REPORT} in --output-dir or the current directory).")
+    add_export_arguments(parser)
+    parser.add_argument('--one', default=None, help=argparse.SUPPRESS) # child process: export this project
+    parser.add_argument('--flatten', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        try:
+            export_project(args.one, args.flatten, args.version, args.backend, args.template_cache,
+                           args.template_cache_size, args.export_cache, args.export_cache_size, args.incremental)
+        except Exception as e:
+            print(f"{FAILURE_PREFIX}{e}")
+            sys.exit(1)
+        return
+
+    projects = collect_projects(args.inputs)
+    if not projects:
+        parser.error("no project files found.")
+    outputs = {}
+    for path in projects:
+        outputs.setdefault(output_paths(path, args.output_dir)[0], []).append(path)
+    clashes = [paths for paths in outputs.values() if len(paths) > 1]
+    if clashes:
+        parser.error("projects would overwrite each other's output: "
+                     + '; '.join(' and '.join(paths) for paths in clashes))
+    args.jobs = max(1, args.jobs)
+    print(f"Exporting {len(projects)} projects to AEDB {args.version} with {args.jobs} jobs...")
+    report = run_batch(projects, args)
+    report_path = args.report or os.path.join(args.output_dir or '.', DEFAULT_REPORT)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=4)
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(report['counts'].items()))
+    print(f"Done in {report['seconds']:.1f}s: {summary}. Report: {report_path}")
+    if any(entry['status'] != 'succeeded' for entry in report['projects']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
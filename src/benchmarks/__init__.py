@@ -0,0 +1 @@
+"""Offline benchmarks for the export pipeline. Run from src/, e.g. `python -m benchmarks.suite run`."""
@@ -0,0 +1,103 @@
+"""Import-time budget: cold import of each core module in a fresh interpreter.
+
+Run from src/:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --modules stackup flatten --repeats 9 --scale 2
+
+Each module is imported --repeats times, each time in a new process (after one
+warm-up run that writes the .pyc files), and its fastest time is compared
+with its budget; slower runs only add noise from the machine. The check exits
+non-zero when a module is over budget or imports a module it must leave
+alone: pyedb and webview belong to the code that opens an EDB session or a
+window, and numpy to the modules that compute with it.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pyedb', 'webview', 'numpy')
+SESSION_ONLY = ('pyedb', 'webview')
+
+# module -> (budget in ms, heavy modules it must not import)
+CORE_MODULES = {
+    'geometry': (10, HEAVY_MODULES),
+    'spatial': (10, HEAVY_MODULES),
+    'hdi': (10, HEAVY_MODULES),
+    'stackup': (10, HEAVY_MODULES),
+    'flatten': (10, HEAVY_MODULES),
+    'plan': (50, HEAVY_MODULES),
+    'crosstalk': (40, HEAVY_MODULES),
+    'canonical': (50, HEAVY_MODULES),
+    'tiles': (40, HEAVY_MODULES),
+    'journal': (35, HEAVY_MODULES),
+    'project_model': (35, HEAVY_MODULES),
+    'project_file': (45, HEAVY_MODULES),
+    'progress': (30, HEAVY_MODULES),
+    'batch': (80, HEAVY_MODULES),
+    'api': (35, HEAVY_MODULES),
+    'feed_paths': (250, SESSION_ONLY),
+    'sweep': (300, SESSION_ONLY),
+    'modeling': (300, SESSION_ONLY),
+}
+
+_CHILD = """
+import sys, time, importlib
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(repr((elapsed, sorted(name for name in {heavy!r} if name in sys.modules))))
+""".format(heavy=HEAVY_MODULES)
+
+
+def import_once(module):
+    """(seconds, heavy modules loaded) of importing one module in a new interpreter."""
+    result = subprocess.run([sys.executable, '-c', _CHILD, module], cwd=SRC_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+    elapsed, heavy = eval(result.stdout.strip().splitlines()[-1], {})
+    return elapsed, heavy
+
+
+def check(modules, repeats, scale):
+    """One result per module: best time/budget in ms, loaded heavy modules and the problems found."""
+    results = []
+    for module in modules:
+        budget_ms, forbidden = CORE_MODULES[module]
+        budget_ms *= scale
+        import_once(module)
+        runs = [import_once(module) for _ in range(repeats)]
+        best_ms = min(elapsed for elapsed, _heavy in runs) * 1000
+        heavy = sorted({name for _elapsed, names in runs for name in names})
+        problems = [f"imports {name}" for name in heavy if name in forbidden]
+        if best_ms > budget_ms:
+            problems.append(f"{best_ms:.1f} ms is over its {budget_ms:.0f} ms budget")
+        results.append({'module': module, 'bestMs': round(best_ms, 2), 'budgetMs': budget_ms,
+                        'heavyImports': heavy, 'problems': problems})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when cold imports of the core modules exceed their time budget.")
+    parser.add_argument('--modules', nargs='+', choices=list(CORE_MODULES), help="Subset of modules to check.")
+    parser.add_argument('--repeats', type=int, default=5, help="Fresh-interpreter imports per module (default: 5).")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Multiply every budget, e.g. 2 on a slow CI machine (default: 1).")
+    parser.add_argument('--output', default=None, help="Also write the results as JSON.")
+    args = parser.parse_args()
+
+    results = check(args.modules or list(CORE_MODULES), max(1, args.repeats), args.scale)
+    for result in results:
+        status = 'FAIL' if result['problems'] else 'ok'
+        print(f"{status:<4} {result['module']:<14} {result['bestMs']:8.1f} ms / {result['budgetMs']:.0f} ms"
+              + (f"  ({'; '.join(result['problems'])})" if result['problems'] else ''))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    failed = [result['module'] for result in results if result['problems']]
+    if failed:
+        print(f"Import budget exceeded by: {', '.join(failed)}.")
+        sys.exit(1)
+    print(f"All {len(results)} modules within their import budget.")
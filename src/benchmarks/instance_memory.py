@@ -0,0 +1,108 @@
+"""Memory benchmark: per-object ViaInstance layout vs. the columnar InstanceStore.
+
+Run from src/:  python -m benchmarks.instance_memory --rows 300 --cols 300
+"""
+import gc
+import json
+import argparse
+import tracemalloc
+from types import SimpleNamespace
+
+from benchmarks.synthetic import synthetic_bga
+from instance_store import InstanceStore
+from plan import VIA_TYPES, group_id
+
+
+class LegacyViaInstance:
+    """State kept per placement by the previous ViaInstance class (EDB methods omitted)."""
+    def __init__(self, data_dict, padstack_config, units, to_mil_func, instance_map=None):
+        self._data = data_dict
+        self._instance_map = instance_map or {}
+        self.id = data_dict.get("id")
+        self.name = data_dict["name"]
+        self.type = data_dict['type']
+        self.group_id = group_id(data_dict)
+        self.x = data_dict["x"]
+        self.y = data_dict["y"]
+        self.properties = data_dict.get('properties', {})
+        self.feed_paths = data_dict.get('feedPaths', {})
+        self.padstack_name = padstack_config.name
+        self.antipad_value = padstack_config.antipad_value
+        self._units = units
+        self._to_mil = to_mil_func
+        self.padstack = padstack_config
+        self.placed_pins = []
+
+    def get_effective_name(self):
+        connected_id = self.properties.get('connectedDiffPairId')
+        if connected_id and self._instance_map and connected_id in self._instance_map:
+            parent_data = self._instance_map[connected_id]
+            parent_via = LegacyViaInstance(parent_data, self.padstack, self._units, self._to_mil, self._instance_map)
+            return parent_via.get_effective_name()
+        return self.name
+
+
+def _pin_count(inst):
+    return 2 if inst['type'] == 'differential' else 1
+
+
+def build_legacy(data):
+    instance_map = {inst['id']: inst for inst in data['placedInstances']}
+    config = SimpleNamespace(name=data['padstacks'][0]['name'], antipad_value=data['padstacks'][0]['antipadSize'])
+    vias = []
+    for inst in data['placedInstances']:
+        if inst['type'] not in VIA_TYPES:
+            continue
+        via = LegacyViaInstance(inst, config, data['units'], None, instance_map)
+        via.get_effective_name()
+        # Stand-ins for the EDB pin objects every via kept in placed_pins.
+        via.placed_pins.extend(object() for _ in range(_pin_count(inst)))
+        vias.append(via)
+    return vias
+
+
+def build_store(data):
+    instance_map = {inst['id']: inst for inst in data['placedInstances']}
+    store = InstanceStore(data['placedInstances'], instance_map)
+    for row in range(len(store)):
+        for _ in range(_pin_count(store.record(row))):
+            store.add_pin(row, object())
+    return store
+
+
+def measure(build, data):
+    """Returns (retained bytes, peak bytes) allocated by build(data) while its result is alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(data)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def run(rows, cols, component):
+    data = synthetic_bga(rows, cols, component=component)
+    count = sum(1 for inst in data['placedInstances'] if inst['type'] in VIA_TYPES)
+    legacy_current, legacy_peak = measure(build_legacy, data)
+    store_current, store_peak = measure(build_store, data)
+    return {
+        'vias': count,
+        'componentPins': bool(component),
+        'legacy': {'retainedBytes': legacy_current, 'peakBytes': legacy_peak,
+                   'bytesPerVia': round(legacy_current / max(count, 1), 1)},
+        'store': {'retainedBytes': store_current, 'peakBytes': store_peak,
+                  'bytesPerVia': round(store_current / max(count, 1), 1)},
+        'ratio': round(legacy_current / max(store_current, 1), 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare modeling instance memory: ViaInstance objects vs InstanceStore.")
+    parser.add_argument('--rows', type=int, default=300)
+    parser.add_argument('--cols', type=int, default=300)
+    parser.add_argument('--no-component', action='store_true',
+                        help="Name pairs without a component prefix, so the store keeps no pins.")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows, args.cols, None if args.no_component else 'U1'), indent=4))
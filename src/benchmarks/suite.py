@@ -0,0 +1,298 @@
+"""Export pipeline benchmarks on synthetic projects, with baseline comparison.
+
+Run from src/:
+    python -m benchmarks.suite run --pairs 400 --output bench.json
+    python -m benchmarks.suite compare bench.json baseline.json --threshold 0.15
+
+Every case is timed over --repeats runs (after one warm-up run) and then run
+once more under tracemalloc for its peak memory. Modeling uses the offline
+recording backend, so no pyedb or Ansys install is needed.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+
+from backends import RecordingBackend
+from benchmarks.synthetic import synthetic_project, write_stackup_xml
+from flatten import flatten_project_data
+from modeling import EdbProject
+
+RESULTS_SCHEMA_VERSION = 1
+DEFAULT_THRESHOLD = 0.10
+# Slowdowns smaller than this are timer noise, whatever their ratio.
+MIN_TIME_DELTA = 0.001
+AEDB_VERSION = '2024.1'
+
+
+class Skip(Exception):
+    """Raised by a case setup when the case cannot run in this environment."""
+
+
+def _parse_stackup_xml(work_dir, project):
+    from stackup import parse_stackup_xml
+    path = os.path.join(work_dir, 'stackup.xml')
+    write_stackup_xml(project['stackup'], path)
+    return lambda: parse_stackup_xml(path)
+
+
+def _flatten(work_dir, project):
+    return lambda: flatten_project_data(project)
+
+
+def _json_save(work_dir, project):
+    flattened = flatten_project_data(project)
+    path = os.path.join(work_dir, 'save_flatten.json')
+
+    def run():
+        with open(path, 'w') as f:
+            json.dump(flattened, f, indent=4)
+    return run
+
+
+def _json_load(work_dir, project):
+    path = os.path.join(work_dir, 'load_flatten.json')
+    with open(path, 'w') as f:
+        json.dump(flatten_project_data(project), f, indent=4)
+
+    def run():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return run
+
+
+def _compact_save(work_dir, project):
+    from project_file import save_compact
+    path = os.path.join(work_dir, 'save_project.vwz')
+    return lambda: save_compact(project, path)
+
+
+def _compact_load(work_dir, project):
+    from project_file import load_project_file, save_compact
+    path = os.path.join(work_dir, 'load_project.vwz')
+    save_compact(project, path)
+    return lambda: load_project_file(path)
+
+
+def _shared_handoff(work_dir, project):
+    from shared_project import SharedProject, load_shared_project
+    flattened = flatten_project_data(project)
+
+    def run():
+        shared = SharedProject(flattened)
+        try:
+            return load_shared_project(shared.handle)
+        finally:
+            shared.close()
+    return run
+
+
+def _feed_paths(work_dir, project):
+    from feed_paths import compute_feed_paths
+    instances = project['placedInstances']
+    return lambda: compute_feed_paths(instances, project.get('boardWidth', 400), project.get('boardHeight', 200))
+
+
+def _stackup_augmentation(work_dir, project):
+    path = os.path.join(work_dir, 'augment_flatten.json')
+    with open(path, 'w') as f:
+        json.dump(flatten_project_data(project), f)
+    edb_project = EdbProject(path, AEDB_VERSION, backend=RecordingBackend())
+    return edb_project._build_augmented_stackup
+
+
+def _modeling(work_dir, project):
+    path = os.path.join(work_dir, 'model_flatten.json')
+    with open(path, 'w') as f:
+        json.dump(flatten_project_data(project), f)
+
+    def run():
+        edb_project = EdbProject(path, AEDB_VERSION, backend=RecordingBackend())
+        shutil.rmtree(edb_project.aedb_path, ignore_errors=True)
+        edb_project.run_modeling()
+    return run
+
+
+# name -> setup(work_dir, project) returning the callable to time
+CASES = {
+    'parse_stackup_xml': _parse_stackup_xml,
+    'flatten_project_data': _flatten,
+    'json_save': _json_save,
+    'json_load': _json_load,
+    'compact_save': _compact_save,
+    'compact_load': _compact_load,
+    'shared_handoff': _shared_handoff,
+    'feed_paths': _feed_paths,
+    'stackup_augmentation': _stackup_augmentation,
+    'modeling': _modeling,
+}
+
+
+def _quiet(func):
+    with redirect_stdout(io.StringIO()):
+        return func()
+
+
+def time_case(func, repeats):
+    """Returns timing statistics of func over repeats runs and its tracemalloc peak."""
+    _quiet(func) # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _quiet(func)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        _quiet(func)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': 'ok',
+        'repeats': repeats,
+        'median': round(statistics.median(samples), 6),
+        'min': round(min(samples), 6),
+        'max': round(max(samples), 6),
+        'peakBytes': peak,
+    }
+
+
+def run_suite(params, repeats=5, cases=None):
+    project = synthetic_project(**params)
+    flattened_count = len(flatten_project_data(project)['placedInstances'])
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='via_wizard_bench_')
+    try:
+        for name in cases or CASES:
+            try:
+                func = CASES[name](work_dir, project)
+            except Skip as e:
+                results[name] = {'status': 'skipped', 'reason': str(e)}
+                continue
+            results[name] = time_case(func, repeats)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'schema': RESULTS_SCHEMA_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'instances': {'project': len(project['placedInstances']), 'flattened': flattened_count},
+        'cases': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns (rows, regressions) comparing median time and peak memory per case.
+
+    A case regresses when its median time or peak memory grew by more than
+    threshold (0.10 = 10%) over the baseline; time growth below
+    MIN_TIME_DELTA seconds is ignored. Cases missing or skipped on
+    either side are reported but never count as regressions.
+    """
+    if current.get('params') != baseline.get('params'):
+        print("WARNING: benchmark parameters differ from the baseline; ratios are not comparable.")
+    rows = []
+    regressions = []
+    for name, result in current['cases'].items():
+        base = baseline['cases'].get(name)
+        if result.get('status') != 'ok' or not base or base.get('status') != 'ok':
+            rows.append({'case': name, 'status': 'n/a'})
+            continue
+        time_ratio = result['median'] / base['median'] if base['median'] else 1.0
+        memory_ratio = result['peakBytes'] / base['peakBytes'] if base['peakBytes'] else 1.0
+        slower = time_ratio > 1 + threshold and result['median'] - base['median'] > MIN_TIME_DELTA
+        regressed = slower or memory_ratio > 1 + threshold
+        row = {'case': name, 'status': 'REGRESSION' if regressed else 'ok',
+               'median': result['median'], 'baselineMedian': base['median'], 'timeRatio': round(time_ratio, 3),
+               'peakBytes': result['peakBytes'], 'baselinePeakBytes': base['peakBytes'],
+               'memoryRatio': round(memory_ratio, 3)}
+        rows.append(row)
+        if regressed:
+            regressions.append(row)
+    return rows, regressions
+
+
+def format_comparison(rows):
+    lines = [f"{'case':<24} {'median':>10} {'baseline':>10} {'time':>7} {'peak MB':>9} {'mem':>7}  status"]
+    for row in rows:
+        if row['status'] == 'n/a':
+            lines.append(f"{row['case']:<24} {'-':>10} {'-':>10} {'-':>7} {'-':>9} {'-':>7}  n/a")
+            continue
+        lines.append(f"{row['case']:<24} {row['median']:>9.4f}s {row['baselineMedian']:>9.4f}s "
+                     f"{row['timeRatio']:>6.2f}x {row['peakBytes'] / 2**20:>9.2f} {row['memoryRatio']:>6.2f}x  {row['status']}")
+    return '\n'.join(lines)
+
+
+def _load(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the export pipeline on a synthetic BGA project.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run the benchmark cases and write a results JSON.")
+    run_parser.add_argument('--pairs', type=int, default=200, help="Number of differential pairs.")
+    run_parser.add_argument('--layers', type=int, default=8, help="Number of conductor layers.")
+    run_parser.add_argument('--backdrill-variants', type=int, default=2,
+                            help="Number of distinct backdrilled padstacks (0 = none).")
+    run_parser.add_argument('--gnd-ring', type=int, default=4, help="GND vias around each leg of a pair.")
+    run_parser.add_argument('--no-dogbones', action='store_true')
+    run_parser.add_argument('--no-pour', action='store_true', help="Feed-ins without a poured void.")
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--cases', nargs='+', choices=list(CASES), help="Subset of cases to run.")
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.add_argument('--baseline', help="Results JSON to compare against after the run.")
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="Allowed slowdown / memory growth ratio before a case counts as a regression.")
+
+    compare_parser = commands.add_parser('compare', help="Compare a results JSON against a baseline.")
+    compare_parser.add_argument('results')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        params = {
+            'pairs': args.pairs,
+            'signal_layers': args.layers,
+            'backdrill_variants': args.backdrill_variants,
+            'gnd_ring': args.gnd_ring,
+            'dogbones': not args.no_dogbones,
+            'pour_feeds': not args.no_pour,
+        }
+        current = run_suite(params, args.repeats, args.cases)
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=4)
+        print(f"Benchmark results written to {args.output}")
+        for name, result in current['cases'].items():
+            if result['status'] == 'ok':
+                print(f"  {name:<24} median {result['median']:.4f}s  peak {result['peakBytes'] / 2**20:.2f} MB")
+            else:
+                print(f"  {name:<24} skipped: {result['reason']}")
+        baseline_path = args.baseline
+    else:
+        current = _load(args.results)
+        baseline_path = args.baseline
+
+    if baseline_path:
+        rows, regressions = compare(current, _load(baseline_path), args.threshold)
+        print(format_comparison(rows))
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold * 100:.0f}%.")
+            sys.exit(1)
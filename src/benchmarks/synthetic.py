@@ -0,0 +1,212 @@
+"""Synthetic projects for benchmarks: BGA fields of differential pairs and GND vias."""
+import math
+import xml.etree.ElementTree as ET
+
+CONDUCTIVITY = 59590000
+
+
+def synthetic_stackup(signal_layers=8, copper=1.2, dielectric=4.0):
+    """Alternating conductor/dielectric stackup; every second inner layer is a GND reference."""
+    stackup = []
+    for i in range(signal_layers):
+        if i == 0:
+            name = 'TOP'
+        elif i == signal_layers - 1:
+            name = 'BOTTOM'
+        else:
+            name = f'LAYER_{i + 1}'
+        stackup.append({
+            'name': name, 'type': 'Conductor', 'thickness': copper,
+            'dk': '', 'df': '', 'conductivity': CONDUCTIVITY, 'fillMaterial': 'AIR',
+            'isReference': 0 < i < signal_layers - 1 and i % 2 == 1,
+        })
+        if i < signal_layers - 1:
+            stackup.append({
+                'name': f'DIEL_{i + 1}', 'type': 'Dielectric', 'thickness': dielectric,
+                'dk': 3.8, 'df': 0.008, 'conductivity': '', 'fillMaterial': '', 'isReference': False,
+            })
+    return stackup
+
+
+def synthetic_padstack(name='Padstack_1', start='TOP', stop='BOTTOM'):
+    return {
+        'name': name, 'holeDiameter': 8, 'padSize': 16, 'antipadSize': 26,
+        'material': 'Copper', 'plating': 100, 'startLayer': start, 'stopLayer': stop,
+        'backdrill': {'enabled': False, 'diameter': 12, 'mode': 'layer', 'toLayer': '', 'stub': 0, 'depth': 0},
+        'layers': {},
+        'fill': {'enabled': False, 'dk': 4, 'df': 0.02},
+    }
+
+
+def _pair_name(component, row, col):
+    if not component:
+        return f'DP_{row}_{col}'
+    return f'{component}.{chr(65 + row % 26)}{row // 26 or ""}{col + 1}'
+
+
+def _feed(x, y, x_end):
+    return [{'x': x, 'y': y}, {'x': x_end, 'y': y}]
+
+
+def synthetic_bga(rows=10, cols=10, pitch=40.0, signal_layers=8, component='U1', feed_layer='LAYER_3'):
+    """Flattened project of a rows x cols BGA field.
+
+    Even columns hold vertical differential pairs (P/N at +-pitch/4) with a
+    feed-in trace to the left board edge; odd columns hold GND vias. Pair
+    names are '<component>.<row><col>' so the pairs also form a component
+    (plain 'DP_<row>_<col>' names when component is None).
+    """
+    stackup = synthetic_stackup(signal_layers)
+    width = (cols + 4) * pitch
+    height = (rows + 4) * pitch
+    left_edge = -width / 2
+
+    instances = []
+    next_id = 1
+    for r in range(rows):
+        for c in range(cols):
+            x = (c - (cols - 1) / 2) * pitch
+            y = (r - (rows - 1) / 2) * pitch
+            if c % 2 == 0:
+                half = pitch / 4
+                instances.append({
+                    'id': next_id, 'name': _pair_name(component, r, c),
+                    'type': 'differential', 'x': x, 'y': y, 'padstackIndex': 0,
+                    'properties': {
+                        'pitch': pitch / 2, 'orientation': 'vertical', 'arrowDirection': 0,
+                        'feedIn': feed_layer, 'feedInWidth': 4, 'feedInSpacing': 4,
+                        'feedOut': '', 'feedOutWidth': 4, 'feedOutSpacing': 4,
+                    },
+                    'feedPaths': {
+                        'feedIn': [_feed(x, y - half, left_edge), _feed(x, y + half, left_edge)],
+                        'feedOut': [],
+                    },
+                })
+            else:
+                instances.append({
+                    'id': next_id, 'name': f'GND_{r}_{c}', 'type': 'gnd', 'x': x, 'y': y,
+                    'padstackIndex': 0, 'properties': {}, 'feedPaths': {},
+                })
+            next_id += 1
+
+    return {
+        'stackup': stackup,
+        'units': 'mil',
+        'padstacks': [synthetic_padstack()],
+        'placedInstances': instances,
+        'canvasGridSpacing': pitch / 2,
+        'boardWidth': width,
+        'boardHeight': height,
+    }
+
+
+def conductor_names(stackup):
+    return [layer['name'] for layer in stackup if layer['type'] == 'Conductor']
+
+
+def synthetic_project(pairs=100, signal_layers=8, backdrill_variants=2, gnd_ring=4, dogbones=True,
+                      pour_feeds=True, pitch=40.0):
+    """Unflattened project of diff_gnd pairs on a square grid, as saved by the GUI.
+
+    Padstack 0 is a plain through via; padstacks 1..backdrill_variants are
+    backdrilled to successively deeper layers below the feed layer, and the
+    pairs cycle through all of them. Every pair carries a ring of gnd_ring GND
+    vias around each leg, optionally a dog bone on TOP and a poured (voided)
+    feed-in on the first inner reference layer.
+    """
+    stackup = synthetic_stackup(signal_layers)
+    conductors = conductor_names(stackup)
+    references = [layer['name'] for layer in stackup if layer['isReference']]
+    feed_layer = references[1] if len(references) > 1 else conductors[1]
+    # Backdrills stop between the feed layer and BOTTOM.
+    stop_layers = conductors[conductors.index(feed_layer) + 1:-1]
+    if backdrill_variants and not stop_layers:
+        raise ValueError(f"A {signal_layers}-layer stackup leaves no room for backdrills below {feed_layer}.")
+
+    padstacks = [synthetic_padstack()]
+    for variant in range(backdrill_variants):
+        padstack = synthetic_padstack(f'Padstack_BD{variant + 1}')
+        padstack['backdrill'].update({
+            'enabled': True, 'toLayer': stop_layers[variant % len(stop_layers)],
+            'stub': 2 + variant // len(stop_layers),
+        })
+        padstacks.append(padstack)
+
+    cols = max(1, math.ceil(math.sqrt(pairs)))
+    rows = max(1, math.ceil(pairs / cols))
+    spacing = 2 * pitch
+    width = (cols + 2) * spacing
+    height = (rows + 2) * spacing
+    left_edge = -width / 2
+    half = pitch / 4
+
+    instances = []
+    next_id = 1
+    for index in range(pairs):
+        r, c = divmod(index, cols)
+        x = (c - (cols - 1) / 2) * spacing
+        y = (r - (rows - 1) / 2) * spacing
+        pair_id = next_id
+        name = f'DP_{r}_{c}'
+        instances.append({
+            'id': pair_id, 'name': name, 'type': 'diff_gnd', 'x': x, 'y': y,
+            'padstackIndex': index % len(padstacks),
+            'properties': {
+                'pitch': pitch / 2, 'orientation': 'vertical', 'arrowDirection': 0,
+                'feedIn': feed_layer, 'feedInWidth': 4, 'feedInSpacing': 4,
+                'feedInPour': pour_feeds, 'feedInGap': 4,
+                'feedOut': '', 'feedOutWidth': 4, 'feedOutSpacing': 4,
+                'gndRadius': pitch / 2, 'gndCount': gnd_ring, 'gndAngleStep': 360 / max(gnd_ring, 1) / 2,
+                'gndPadstackIndex': 0,
+            },
+            'feedPaths': {
+                'feedIn': [_feed(x, y - half, left_edge), _feed(x, y + half, left_edge)],
+                'feedOut': [],
+            },
+        })
+        next_id += 1
+        if dogbones:
+            instances.append({
+                'id': next_id, 'name': f'DogBone_{r}_{c}', 'type': 'dog_bone', 'x': x, 'y': y,
+                'padstackIndex': 0,
+                'properties': {
+                    'connectedDiffPairId': pair_id, 'lineWidth': 4, 'length': pitch / 4,
+                    'posAngle': 45, 'negAngle': 135, 'diameter': 8, 'void': 12,
+                },
+                'feedPaths': {'feedIn': [], 'feedOut': []},
+            })
+            next_id += 1
+
+    return {
+        'stackup': stackup,
+        'units': 'mil',
+        'padstacks': padstacks,
+        'placedInstances': instances,
+        'canvasGridSpacing': pitch / 2,
+        'boardWidth': width,
+        'boardHeight': height,
+    }
+
+
+def write_stackup_xml(stackup, path, length_unit='mil'):
+    """Writes a stackup in the Control/Stackup XML layout read by parse_stackup_xml."""
+    root = ET.Element("c:Control", {"xmlns:c": "http://www.ansys.com/control", "schemaVersion": "1.0"})
+    stackup_node = ET.SubElement(root, "Stackup", {"schemaVersion": "1.0"})
+    materials_node = ET.SubElement(stackup_node, "Materials")
+    layers_node = ET.SubElement(stackup_node, "Layers", {"LengthUnit": length_unit})
+    for layer in stackup:
+        material = f"Mat_{layer['name']}"
+        material_node = ET.SubElement(materials_node, "Material", {"Name": material})
+        if layer['type'] == 'Conductor':
+            ET.SubElement(ET.SubElement(material_node, "Conductivity"), "Double").text = str(layer['conductivity'])
+        else:
+            ET.SubElement(ET.SubElement(material_node, "Permittivity"), "Double").text = str(layer['dk'])
+            ET.SubElement(ET.SubElement(material_node, "DielectricLossTangent"), "Double").text = str(layer['df'])
+        attributes = {"Name": layer['name'], "Type": layer['type'], "Thickness": str(layer['thickness']),
+                      "Material": material}
+        if layer.get('fillMaterial'):
+            attributes["FillMaterial"] = layer['fillMaterial']
+        if layer.get('isReference'):
+            attributes["IsReference"] = "true"
+        ET.SubElement(layers_node, "Layer", attributes)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
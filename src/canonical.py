@@ -0,0 +1,256 @@
+import os
+import json
+import hashlib
+import argparse
+
+from crosstalk import collect_neighborhoods, build_victim_projects, unique_file_token
+from geometry import dog_bone_segments
+from spatial import instance_via_points
+
+# 2x2 integer matrices (a, b, c, d): x' = a*x + b*y, y' = c*x + d*y
+TRANSFORMS = {
+    'identity': (1, 0, 0, 1),
+    'rot90': (0, -1, 1, 0),
+    'rot180': (-1, 0, 0, -1),
+    'rot270': (0, 1, -1, 0),
+    'mirror_x': (-1, 0, 0, 1),
+    'mirror_y': (1, 0, 0, -1),
+    'transpose': (0, 1, 1, 0),
+    'anti_transpose': (0, -1, -1, 0),
+}
+
+SYMMETRIES = {
+    'none': ('identity',),
+    'mirror': ('identity', 'mirror_x', 'mirror_y', 'rot180'),
+    'rotation': ('identity', 'rot90', 'rot180', 'rot270'),
+    'all': tuple(TRANSFORMS),
+}
+
+# arrowDirection 0..3 = up / right / down / left (see calculateFeedPaths in utils.js)
+_ARROW_VECTORS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+_FEED_PARAM_KEYS = ('Width', 'Spacing', 'D1', 'R', 'D2', 'Pour', 'Gap')
+
+
+def _padstack_name(inst, padstacks):
+    index = inst.get('padstackIndex')
+    if isinstance(index, int) and 0 <= index < len(padstacks):
+        return padstacks[index]['name']
+    return None
+
+
+def cell_primitives(victim, members, instance_map, padstacks):
+    """Describes a victim's neighborhood as geometric primitives relative to the victim center.
+
+    Vias, feed launches and dog bone legs are kept; feed lengths to the board
+    edge are not, so equivalent cells at different board positions match.
+    Returns (fields, points, alpha) tuples: fields are transform-independent,
+    points are (dx, dy) offsets or directions, alpha is a feed turn angle.
+    """
+    ox, oy = float(victim['x']), float(victim['y'])
+    primitives = []
+
+    for inst in members:
+        inst_type = inst['type']
+
+        if inst_type == 'dog_bone':
+            props = inst.get('properties', {})
+            fields = ('dogbone', props.get('lineWidth', 5), props.get('diameter', 10), props.get('void', 0))
+            for start, end, _side in dog_bone_segments(inst, instance_map):
+                points = ((start[0] - ox, start[1] - oy), (end[0] - ox, end[1] - oy))
+                primitives.append((fields, points, None))
+            continue
+
+        if inst_type == 'surround_via_array':
+            # Its GND vias are already separate 'gnd' instances in flattened data.
+            continue
+
+        if inst is victim:
+            role = 'victim'
+        elif inst_type == 'gnd':
+            role = 'gnd'
+        else:
+            role = 'signal'
+
+        padstack_name = _padstack_name(inst, padstacks)
+        for x, y in instance_via_points(inst):
+            primitives.append((('via', role, padstack_name), ((x - ox, y - oy),), None))
+
+        if inst_type not in ('single', 'differential'):
+            continue
+
+        props = inst.get('properties', {})
+        arrow = int(props.get('arrowDirection', 0) or 0) % 4
+        for kind, direction in (('In', (arrow + 2) % 4), ('Out', arrow)):
+            layer = props.get(f'feed{kind}')
+            if not layer:
+                continue
+            fields = ('feed', role, kind, layer) + tuple(props.get(f'feed{kind}{key}') for key in _FEED_PARAM_KEYS)
+            origin = (float(inst['x']) - ox, float(inst['y']) - oy)
+            # The turn angle changes sign under a mirror, so it travels with the transform.
+            alpha = float(props.get(f'feed{kind}Alpha', 0) or 0)
+            primitives.append((fields, (origin, _ARROW_VECTORS[direction]), alpha))
+
+    return primitives
+
+
+def _apply(matrix, point):
+    a, b, c, d = matrix
+    return (a * point[0] + b * point[1], c * point[0] + d * point[1])
+
+
+def _quantize(value, tolerance):
+    return int(round(value / tolerance))
+
+
+def _normalize_field(value, tolerance):
+    # 5 and 5.0 must hash alike; booleans and strings pass through.
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _quantize(float(value), tolerance)
+    return value
+
+
+def canonical_key(primitives, symmetry='none', tolerance=1e-3):
+    """Returns (digest, transform_name) of the lexicographically smallest transformed signature."""
+    best = None
+    for name in SYMMETRIES[symmetry]:
+        matrix = TRANSFORMS[name]
+        det = matrix[0] * matrix[3] - matrix[1] * matrix[2]
+        entries = []
+        for fields, points, alpha in primitives:
+            moved = [_apply(matrix, pt) for pt in points]
+            entry = [[_normalize_field(v, tolerance) for v in fields], [[_quantize(x, tolerance), _quantize(y, tolerance)] for x, y in moved]]
+            if alpha is not None:
+                entry.append(_quantize(alpha * det, tolerance))
+            entries.append(json.dumps(entry, separators=(',', ':')))
+        signature = '\n'.join(sorted(entries))
+        if best is None or signature < best[0]:
+            best = (signature, name)
+
+    digest = hashlib.sha1(best[0].encode('utf-8')).hexdigest()[:16]
+    return digest, best[1]
+
+
+def group_cells(flattened_data, radius=None, k=None, symmetry='none', tolerance=1e-3, victim_ids=None):
+    """Groups signal vias whose neighborhoods are geometrically equivalent.
+
+    Returns a list of groups in board order, each as
+    {'key', 'representative', 'representativeId', 'members': [{'id', 'name', 'transform'}]}.
+    A member's transform maps its cell onto the canonical orientation; with a
+    mirror or rotation the P/N labels of a differential member may be swapped
+    relative to its representative.
+    """
+    if symmetry not in SYMMETRIES:
+        raise ValueError(f"Unknown symmetry '{symmetry}'. Expected one of {', '.join(SYMMETRIES)}.")
+
+    padstacks = flattened_data.get('padstacks', [])
+    instance_map = {inst['id']: inst for inst in flattened_data['placedInstances']}
+
+    groups = {}
+    for victim, _neighbors, members in collect_neighborhoods(flattened_data, radius, k, victim_ids):
+        primitives = cell_primitives(victim, members, instance_map, padstacks)
+        key, transform = canonical_key(primitives, symmetry, tolerance)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'key': key,
+                'representative': victim['name'],
+                'representativeId': victim['id'],
+                'members': [],
+            }
+        group['members'].append({'id': victim['id'], 'name': victim['name'], 'transform': transform})
+
+    return list(groups.values())
+
+
+def cell_report(groups):
+    """Summarizes how many unique cells the grouped signal vias reduce to."""
+    signal_count = sum(len(group['members']) for group in groups)
+    unique_count = len(groups)
+    return {
+        'signalVias': signal_count,
+        'uniqueCells': unique_count,
+        'reduction': round(1 - unique_count / signal_count, 4) if signal_count else 0.0,
+        'largestGroup': max((len(group['members']) for group in groups), default=0),
+    }
+
+
+def write_representative_projects(flattened_data, out_dir, radius=None, k=None, symmetry='none', tolerance=1e-3):
+    """Writes one sub-project per unique cell plus a cells_manifest.json mapping members to it."""
+    os.makedirs(out_dir, exist_ok=True)
+    groups = group_cells(flattened_data, radius, k, symmetry, tolerance)
+    representative_ids = [group['representativeId'] for group in groups]
+
+    json_by_id = {}
+    tokens = set()
+    for victim, _neighbors, project in build_victim_projects(flattened_data, radius, k, representative_ids):
+        json_path = os.path.join(out_dir, f"{unique_file_token(victim, tokens)}_flatten.json")
+        with open(json_path, 'w') as f:
+            json.dump(project, f, indent=4)
+        json_by_id[victim['id']] = os.path.basename(json_path)
+
+    for group in groups:
+        group['json'] = json_by_id[group['representativeId']]
+        group['aedb'] = os.path.splitext(group['json'])[0] + '.aedb'
+
+    manifest = {
+        'radius': radius,
+        'k': k,
+        'symmetry': symmetry,
+        'tolerance': tolerance,
+        'report': cell_report(groups),
+        'groups': groups,
+    }
+    manifest_path = os.path.join(out_dir, 'cells_manifest.json')
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest_path, manifest
+
+
+def expand_results(manifest, results_by_representative):
+    """Maps per-representative results back onto every member of its group.
+
+    results_by_representative is keyed by representative name; members whose
+    representative has no result are left out.
+    """
+    expanded = {}
+    for group in manifest['groups']:
+        result = results_by_representative.get(group['representative'])
+        if result is None:
+            continue
+        for member in group['members']:
+            expanded[member['name']] = {
+                'representative': group['representative'],
+                'transform': member['transform'],
+                'result': result,
+            }
+    return expanded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Group signal vias with equivalent neighborhoods.")
+    parser.add_argument('flatten_json', help="Flattened project JSON (*_flatten.json).")
+    parser.add_argument('--radius', type=float, default=None, help="Neighbor search radius in project units.")
+    parser.add_argument('--k', type=int, default=None, help="Number of nearest neighbors per victim.")
+    parser.add_argument('--symmetry', choices=sorted(SYMMETRIES), default='none',
+                        help="Extra invariance on top of translation.")
+    parser.add_argument('--tolerance', type=float, default=1e-3, help="Coordinate matching tolerance in project units.")
+    parser.add_argument('--out', default=None, help="Write one representative project per cell to this directory.")
+    args = parser.parse_args()
+
+    if args.radius is None and args.k is None:
+        parser.error("at least one of --radius or --k is required")
+
+    with open(args.flatten_json, 'r') as f:
+        data = json.load(f)
+
+    if args.out:
+        manifest_path, manifest = write_representative_projects(
+            data, args.out, args.radius, args.k, args.symmetry, args.tolerance
+        )
+        report = manifest['report']
+        print(f"Manifest: {manifest_path}")
+    else:
+        report = cell_report(group_cells(data, args.radius, args.k, args.symmetry, args.tolerance))
+
+    print(f"{report['signalVias']} signal vias -> {report['uniqueCells']} unique cells "
+          f"({report['reduction'] * 100:.1f}% fewer solves, largest group {report['largestGroup']}).")
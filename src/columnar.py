@@ -0,0 +1,319 @@
+import json
+from operator import itemgetter
+
+import numpy as np
+
+COLUMNAR_SCHEMA_VERSION = 1
+
+# Instance keys stored in their own column groups rather than as plain columns.
+PROPERTIES_KEY = 'properties'
+FEED_PATHS_KEY = 'feedPaths'
+
+_MISSING = object()
+
+
+def _encode_column(name, values, arrays):
+    """Stores one column (values may contain _MISSING) into arrays; returns its JSON spec.
+
+    Kinds: 'int' (int64), 'float' (float64, with an isInt mask when ints are
+    mixed in so 5 and 5.0 survive the round trip), 'str' (indices into a
+    string table) and 'json' (indices into a table of JSON texts, for
+    anything else: bools, None, lists, dicts, mixed types).
+    """
+    kept = [value for value in values if value is not _MISSING]
+    spec = {}
+    if len(kept) != len(values):
+        arrays[f"{name}.present"] = np.fromiter((value is not _MISSING for value in values), dtype=bool,
+                                                count=len(values))
+
+    types = set(map(type, kept))
+    if types <= {int}:
+        try:
+            arrays[f"{name}.data"] = np.array(kept, dtype=np.int64)
+            spec['kind'] = 'int'
+            return spec
+        except OverflowError:
+            types = {object} # beyond int64: stored as JSON text
+    if types <= {int, float} and float in types and not (
+            int in types and any(type(value) is int and abs(value) > 2**53 for value in kept)):
+        spec['kind'] = 'float'
+        arrays[f"{name}.data"] = np.array(kept, dtype=np.float64)
+        if int in types:
+            arrays[f"{name}.isInt"] = np.fromiter((type(value) is int for value in kept), dtype=bool, count=len(kept))
+    else:
+        spec['kind'] = 'str' if types <= {str} else 'json'
+        texts = kept if spec['kind'] == 'str' else [json.dumps(value) for value in kept]
+        table = {}
+        arrays[f"{name}.data"] = np.array([table.setdefault(text, len(table)) for text in texts], dtype=np.int32)
+        spec['strings'] = list(table)
+    return spec
+
+
+def _decode_column(name, spec, arrays, count):
+    """Returns the column as a list of count Python values (_MISSING where absent)."""
+    data = arrays[f"{name}.data"]
+    kind = spec['kind']
+    if kind == 'int':
+        kept = data.tolist()
+    elif kind == 'float':
+        kept = data.tolist()
+        is_int = arrays.get(f"{name}.isInt")
+        if is_int is not None:
+            for index in np.flatnonzero(is_int).tolist():
+                kept[index] = int(kept[index])
+    else:
+        strings = spec['strings']
+        if kind == 'json':
+            strings = [json.loads(text) for text in strings]
+            # Each row gets its own copy of mutable values.
+            kept = [_copy_json(strings[index]) for index in data.tolist()]
+        else:
+            kept = [strings[index] for index in data.tolist()]
+
+    present = arrays.get(f"{name}.present")
+    if present is None:
+        return kept
+    values = [_MISSING] * count
+    for row, value in zip(np.flatnonzero(present).tolist(), kept):
+        values[row] = value
+    return values
+
+
+def _copy_json(value):
+    if isinstance(value, (list, dict)):
+        return json.loads(json.dumps(value))
+    return value
+
+
+def _encode_dict_group(prefix, dicts, arrays):
+    """Columns for every key of a list of dicts, plus the key order of each dict."""
+    orders = [tuple(item) for item in dicts]
+    rows_by_order = {}
+    for row, order in enumerate(orders):
+        rows_by_order.setdefault(order, []).append(row)
+
+    columns = {}
+    for order, rows in rows_by_order.items():
+        if not order:
+            continue
+        # Dicts sharing a key order are transposed in one pass.
+        values = map(itemgetter(*order), [dicts[row] for row in rows] if len(rows_by_order) > 1 else dicts)
+        transposed = zip(*values) if len(order) > 1 else [values]
+        for key, column in zip(order, transposed):
+            if len(rows_by_order) == 1:
+                columns[key] = list(column)
+                continue
+            target = columns.setdefault(key, [_MISSING] * len(dicts))
+            for row, value in zip(rows, column):
+                target[row] = value
+
+    specs = {key: _encode_column(f"{prefix}.{key}", values, arrays) for key, values in columns.items()}
+    return {'columns': specs, 'keyOrder': _encode_interned(f"{prefix}.#keys", orders, arrays)}
+
+
+def _encode_interned(name, values, arrays):
+    """Tuples as indices into a table of their distinct values (stored as JSON lists)."""
+    table = {}
+    arrays[f"{name}.data"] = np.array([table.setdefault(value, len(table)) for value in values], dtype=np.int32)
+    return {'kind': 'str', 'strings': [json.dumps(value) for value in table]}
+
+
+def _encode_key_orders(name, dicts, arrays):
+    """The key order of every dict as indices into a table of distinct orders."""
+    return _encode_interned(name, [tuple(item) for item in dicts], arrays)
+
+
+def _decode_dict_group(prefix, spec, arrays, count):
+    columns = {key: _decode_column(f"{prefix}.{key}", column, arrays, count)
+               for key, column in spec['columns'].items()}
+    orders = [json.loads(text) for text in spec['keyOrder']['strings']]
+    order_ids = arrays[f"{prefix}.#keys.data"].tolist()
+    return [{key: columns[key][row] for key in orders[order_ids[row]]} for row in range(count)]
+
+
+def _encode_feed_paths(prefix, feed_paths_list, arrays):
+    """Feed paths as point coordinate columns with path lengths and per-instance path counts.
+
+    Returns None (storing nothing) unless every value has the shape
+    calculateFeedPaths produces: {kind: [[{'x': number, 'y': number}, ...], ...]}.
+    """
+    path_counts = []
+    path_lengths = []
+    xs = []
+    ys = []
+    try:
+        for feed_paths in feed_paths_list:
+            if type(feed_paths) is not dict:
+                return None
+            for paths in feed_paths.values():
+                if type(paths) is not list:
+                    return None
+                path_counts.append(len(paths))
+                for path in paths:
+                    if type(path) is not list:
+                        return None
+                    path_lengths.append(len(path))
+                    for point in path:
+                        if len(point) != 2 or next(iter(point)) != 'x':
+                            return None
+                        xs.append(point['x'])
+                        ys.append(point['y'])
+    except (TypeError, KeyError, AttributeError):
+        return None
+    if not set(map(type, xs)) | set(map(type, ys)) <= {int, float}:
+        return None
+
+    columns = {}
+    spec = {
+        'x': _encode_column(f"{prefix}.x", xs, columns),
+        'y': _encode_column(f"{prefix}.y", ys, columns),
+    }
+    if 'json' in (spec['x']['kind'], spec['y']['kind']):
+        return None # ints beyond int64
+    arrays.update(columns)
+    spec['kinds'] = _encode_key_orders(f"{prefix}.#kinds", feed_paths_list, arrays)
+    arrays[f"{prefix}.pathCounts"] = np.asarray(path_counts, dtype=np.int32)
+    arrays[f"{prefix}.pathLengths"] = np.asarray(path_lengths, dtype=np.int32)
+    return spec
+
+
+def _decode_feed_paths(prefix, spec, arrays, count):
+    kind_names = [json.loads(text) for text in spec['kinds']['strings']]
+    kind_ids = arrays[f"{prefix}.#kinds.data"].tolist()
+    path_counts = iter(arrays[f"{prefix}.pathCounts"].tolist())
+    path_lengths = iter(arrays[f"{prefix}.pathLengths"].tolist())
+    xs = _decode_column(f"{prefix}.x", spec['x'], arrays, 0)
+    ys = _decode_column(f"{prefix}.y", spec['y'], arrays, 0)
+    position = 0
+    result = []
+    for row in range(count):
+        feed_paths = {}
+        for kind in kind_names[kind_ids[row]]:
+            paths = []
+            for _ in range(next(path_counts)):
+                end = position + next(path_lengths)
+                paths.append([{'x': x, 'y': y} for x, y in zip(xs[position:end], ys[position:end])])
+                position = end
+            feed_paths[kind] = paths
+        result.append(feed_paths)
+    return result
+
+
+def encode_instances(instances):
+    """Encodes placedInstances into (spec, arrays): a JSON-serializable spec and name -> NumPy array.
+
+    Plain keys become one column each; properties get a column per property
+    key and point-list feed paths become coordinate columns. The encoding is
+    lossless: decode_instances returns equal dicts with the same key order.
+    """
+    arrays = {}
+    count = len(instances)
+    plain = [{key: value for key, value in inst.items() if key not in (PROPERTIES_KEY, FEED_PATHS_KEY)}
+             for inst in instances]
+    spec = {'count': count, 'plain': _encode_dict_group('inst', plain, arrays)}
+
+    properties = [inst.get(PROPERTIES_KEY, _MISSING) for inst in instances]
+    if all(value is _MISSING or type(value) is dict for value in properties):
+        present = [value for value in properties if value is not _MISSING]
+        spec['properties'] = _encode_dict_group('props', present, arrays)
+        spec['propertiesMode'] = 'columns'
+    else:
+        spec['properties'] = _encode_column('props', properties, arrays)
+        spec['propertiesMode'] = 'value'
+    arrays['props.#present'] = np.fromiter((value is not _MISSING for value in properties), dtype=bool, count=count)
+
+    feed_paths = [inst.get(FEED_PATHS_KEY, _MISSING) for inst in instances]
+    present = [value for value in feed_paths if value is not _MISSING]
+    spec['feedPaths'] = _encode_feed_paths('feed', present, arrays)
+    if spec['feedPaths'] is not None:
+        spec['feedPathsMode'] = 'points'
+    else:
+        spec['feedPaths'] = _encode_column('feed', feed_paths, arrays)
+        spec['feedPathsMode'] = 'value'
+    arrays['feed.#present'] = np.fromiter((value is not _MISSING for value in feed_paths), dtype=bool, count=count)
+
+    # Key order of properties and feedPaths within each instance.
+    spec['slots'] = _encode_interned('inst.#slots', [_slot_positions(inst) for inst in instances], arrays)
+    return spec, arrays
+
+
+def _slot_positions(inst):
+    """Positions of properties / feedPaths among an instance's keys, to restore the key order."""
+    keys = list(inst)
+    return tuple(sorted(((key, keys.index(key)) for key in (PROPERTIES_KEY, FEED_PATHS_KEY) if key in inst),
+                        key=lambda slot: slot[1]))
+
+
+def _spread(values, present):
+    """Expands values of the present rows to one entry per row (_MISSING elsewhere)."""
+    result = [_MISSING] * len(present)
+    for row, value in zip(np.flatnonzero(present).tolist(), values):
+        result[row] = value
+    return result
+
+
+def decode_instances(spec, arrays):
+    """Inverse of encode_instances: returns the list of instance dicts."""
+    count = spec['count']
+    plain = _decode_dict_group('inst', spec['plain'], arrays, count)
+
+    props_present = arrays['props.#present']
+    if spec['propertiesMode'] == 'columns':
+        properties = _spread(_decode_dict_group('props', spec['properties'], arrays, int(props_present.sum())),
+                             props_present)
+    else:
+        properties = _decode_column('props', spec['properties'], arrays, count)
+
+    feed_present = arrays['feed.#present']
+    if spec['feedPathsMode'] == 'points':
+        feed_paths = _spread(_decode_feed_paths('feed', spec['feedPaths'], arrays, int(feed_present.sum())),
+                             feed_present)
+    else:
+        feed_paths = _decode_column('feed', spec['feedPaths'], arrays, count)
+
+    slot_tables = [json.loads(text) for text in spec['slots']['strings']]
+    # Where a table's slots directly follow the plain keys, they can simply be appended.
+    append_at = [slots[0][1] if slots and all(position == slots[0][1] + i for i, (_key, position) in enumerate(slots))
+                 else None for slots in slot_tables]
+    slot_ids = arrays['inst.#slots.data'].tolist()
+    instances = []
+    for row in range(count):
+        item = plain[row]
+        table = slot_ids[row]
+        slots = slot_tables[table]
+        if not slots:
+            pass
+        elif append_at[table] == len(item):
+            for key, _position in slots:
+                item[key] = properties[row] if key == PROPERTIES_KEY else feed_paths[row]
+        else:
+            items = list(item.items())
+            for key, position in slots:
+                items.insert(position, (key, properties[row] if key == PROPERTIES_KEY else feed_paths[row]))
+            item = dict(items)
+        instances.append(item)
+    return instances
+
+
+def encode_project(data):
+    """Splits a project into (header, arrays): everything but placedInstances stays JSON in the header."""
+    header = {key: value for key, value in data.items() if key != 'placedInstances'}
+    header['#columnar'] = {'schema': COLUMNAR_SCHEMA_VERSION, 'keys': list(data)}
+    arrays = {}
+    if 'placedInstances' in data:
+        header['#columnar']['instances'], arrays = encode_instances(data['placedInstances'])
+    return header, arrays
+
+
+def decode_project(header, arrays):
+    """Inverse of encode_project."""
+    info = header['#columnar']
+    if info['schema'] != COLUMNAR_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported columnar project schema {info['schema']}.")
+    data = {}
+    for key in info['keys']:
+        if key == 'placedInstances':
+            data[key] = decode_instances(info['instances'], arrays)
+        else:
+            data[key] = header[key]
+    return data
@@ -0,0 +1,168 @@
+import os
+import json
+import argparse
+
+from geometry import attachments_by_parent
+from spatial import build_instance_index, instance_via_points
+
+SIGNAL_TYPES = ('differential', 'single')
+PROJECT_HEADER_KEYS = ('stackup', 'units', 'padstacks', 'canvasGridSpacing', 'boardWidth', 'boardHeight')
+
+
+def find_neighbors(victim, index, radius=None, k=None):
+    """Returns {instance_id: distance} of the neighbors picked for one victim.
+
+    With only a radius every via owner within that distance of any victim via
+    is returned; with only k the k nearest owners are returned; with both the
+    k nearest owners inside the radius are kept.
+    """
+    if radius is None and k is None:
+        raise ValueError("Either a neighbor radius or a neighbor count k is required.")
+
+    victim_id = victim['id']
+    neighbors = {}
+    for x, y in instance_via_points(victim):
+        if k is not None:
+            hits = dict(index.nearest(x, y, k, exclude={victim_id}))
+            if radius is not None:
+                hits = {key: dist for key, dist in hits.items() if dist <= radius}
+        else:
+            hits = index.query_radius(x, y, radius)
+            hits.pop(victim_id, None)
+
+        for key, dist in hits.items():
+            if dist < neighbors.get(key, float('inf')):
+                neighbors[key] = dist
+
+    if k is not None and len(neighbors) > k:
+        neighbors = dict(sorted(neighbors.items(), key=lambda item: item[1])[:k])
+    return neighbors
+
+
+def collect_neighborhoods(flattened_data, radius=None, k=None, victim_ids=None, cell_size=None):
+    """Yields (victim, neighbor_distances, members) for every signal victim.
+
+    members holds the victim, its selected neighbors (closest first) and every
+    dog bone / surround array attached to one of those vias.
+    """
+    instances = flattened_data['placedInstances']
+    index = build_instance_index(instances, cell_size)
+    by_id = {inst['id']: inst for inst in instances}
+
+    attachments = attachments_by_parent(instances)
+
+    selected = set(victim_ids) if victim_ids is not None else None
+
+    for victim in instances:
+        if victim['type'] not in SIGNAL_TYPES:
+            continue
+        if selected is not None and victim['id'] not in selected:
+            continue
+
+        neighbors = find_neighbors(victim, index, radius, k)
+        members = [victim] + [by_id[key] for key in sorted(neighbors, key=neighbors.get)]
+        member_ids = {inst['id'] for inst in members}
+
+        # Attachments may chain (dog bone -> surround array -> pair), so walk until stable.
+        pending = list(member_ids)
+        while pending:
+            for child in attachments.get(pending.pop(), ()):
+                if child['id'] not in member_ids:
+                    member_ids.add(child['id'])
+                    members.append(child)
+                    pending.append(child['id'])
+
+        yield victim, neighbors, members
+
+
+def build_victim_projects(flattened_data, radius=None, k=None, victim_ids=None, cell_size=None):
+    """Splits a flattened project into one small project per signal victim.
+
+    Each sub-project keeps the stackup, padstacks and board outline of the
+    source project and contains the neighborhood from collect_neighborhoods.
+    Signal aggressors keep their feeds so their ports are still created.
+
+    Returns a list of (victim_instance, neighbor_distances, project_dict).
+    """
+    header = {key: flattened_data[key] for key in PROJECT_HEADER_KEYS if key in flattened_data}
+
+    results = []
+    for victim, neighbors, members in collect_neighborhoods(flattened_data, radius, k, victim_ids, cell_size):
+        project = dict(header)
+        project['placedInstances'] = [json.loads(json.dumps(inst)) for inst in members]
+        results.append((victim, neighbors, project))
+
+    return results
+
+
+def safe_file_token(name):
+    return ''.join(ch if ch.isalnum() or ch in '-_.' else '_' for ch in str(name))
+
+
+def unique_file_token(inst, taken):
+    """safe_file_token of an instance name, suffixed with its id when another name already maps to it.
+
+    taken holds the lower-cased tokens used so far (file names are case
+    insensitive on Windows) and is updated.
+    """
+    token = safe_file_token(inst['name'])
+    if token.lower() in taken:
+        base = f"{token}_{safe_file_token(inst['id'])}"
+        token, n = base, 1
+        while token.lower() in taken:
+            n += 1
+            token = f"{base}_{n}"
+    taken.add(token.lower())
+    return token
+
+
+def write_victim_projects(flattened_data, out_dir, radius=None, k=None, victim_ids=None):
+    """Writes one <victim>_flatten.json per victim plus a crosstalk_manifest.json.
+
+    Each written file is a regular flattened project that modeling.py accepts
+    as-is, so the batch can be exported in parallel.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    names_by_id = {inst['id']: inst['name'] for inst in flattened_data['placedInstances']}
+
+    manifest = {'radius': radius, 'k': k, 'victims': []}
+    tokens = set()
+    for victim, neighbors, project in build_victim_projects(flattened_data, radius, k, victim_ids):
+        json_path = os.path.join(out_dir, f"{unique_file_token(victim, tokens)}_flatten.json")
+        with open(json_path, 'w') as f:
+            json.dump(project, f, indent=4)
+
+        manifest['victims'].append({
+            'victim': victim['name'],
+            'type': victim['type'],
+            'json': os.path.basename(json_path),
+            'aedb': os.path.splitext(os.path.basename(json_path))[0] + '.aedb',
+            'neighbors': [
+                {'name': names_by_id[key], 'distance': round(dist, 6)}
+                for key, dist in sorted(neighbors.items(), key=lambda item: item[1])
+            ],
+            'instanceCount': len(project['placedInstances']),
+        })
+
+    manifest_path = os.path.join(out_dir, 'crosstalk_manifest.json')
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest_path, manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate per-victim crosstalk sub-projects from a flattened project.")
+    parser.add_argument('flatten_json', help="Flattened project JSON (*_flatten.json).")
+    parser.add_argument('out_dir', help="Directory receiving one sub-project per victim.")
+    parser.add_argument('--radius', type=float, default=None, help="Neighbor search radius in project units.")
+    parser.add_argument('--k', type=int, default=None, help="Number of nearest neighbors per victim.")
+    args = parser.parse_args()
+
+    if args.radius is None and args.k is None:
+        parser.error("at least one of --radius or --k is required")
+
+    with open(args.flatten_json, 'r') as f:
+        data = json.load(f)
+
+    manifest_path, manifest = write_victim_projects(data, args.out_dir, args.radius, args.k)
+    print(f"Wrote {len(manifest['victims'])} victim projects. Manifest: {manifest_path}")
@@ -0,0 +1,192 @@
+import json
+import time
+from contextlib import contextmanager
+
+PROFILED_APIS = ('modeler', 'padstacks', 'hfss', 'nets', 'materials', 'stackup')
+
+# An offender needs at least this share of the profiled EDB time...
+OFFENDER_MIN_SHARE = 0.05
+# ...or this many property lookups / calls repeating the same arguments.
+REPEATED_LOOKUP_MIN = 100
+_SIMPLE_TYPES = (str, int, float, bool, type(None))
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class CallProfiler:
+    """Times every call and property lookup made through the EDB API objects, per modeling stage.
+
+    wrap_edb returns a proxy of an Edb session whose modeler, padstacks,
+    hfss, nets, materials and stackup are timing proxies. Durations are
+    grouped by (stage, api.member) so the report can tell EDB time apart
+    from the rest of each stage ('other': our Python plus unprofiled calls
+    such as save_edb).
+    """
+    def __init__(self):
+        self.samples = {}
+        self.arguments = {} # member -> set of distinct simple argument tuples
+        self.stage_wall = {}
+        self.current_stage = 'other'
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        previous = self.current_stage
+        self.current_stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_wall[name] = self.stage_wall.get(name, 0.0) + time.perf_counter() - start
+            self.current_stage = previous
+
+    def record(self, member, kind, seconds):
+        key = (self.current_stage, member, kind)
+        samples = self.samples.get(key)
+        if samples is None:
+            samples = self.samples[key] = []
+        samples.append(seconds)
+
+    def record_arguments(self, member, args, kwargs):
+        """Tracks distinct arguments of calls made with plain values only (net names, definition names)."""
+        if all(isinstance(arg, _SIMPLE_TYPES) for arg in args) and \
+                all(isinstance(value, _SIMPLE_TYPES) for value in kwargs.values()):
+            self.arguments.setdefault(member, set()).add((args, tuple(sorted(kwargs.items()))))
+
+    def wrap_edb(self, edb):
+        return _ProfiledEdb(self, edb)
+
+    def report(self):
+        """Aggregated statistics per member and per stage, plus flagged offenders."""
+        members = {}
+        for (stage, member, kind), samples in self.samples.items():
+            entry = members.setdefault(member, {'member': member, 'kind': kind, 'calls': 0, 'total': 0.0,
+                                                'samples': [], 'stages': {}})
+            entry['calls'] += len(samples)
+            entry['total'] += sum(samples)
+            entry['samples'].extend(samples)
+            stage_entry = entry['stages'].setdefault(stage, {'calls': 0, 'total': 0.0})
+            stage_entry['calls'] += len(samples)
+            stage_entry['total'] += sum(samples)
+
+        edb_total = sum(entry['total'] for entry in members.values())
+        rows = []
+        for entry in members.values():
+            samples = sorted(entry.pop('samples'))
+            entry.update({
+                'total': round(entry['total'], 6),
+                'mean': round(entry['total'] / entry['calls'], 9),
+                'p50': round(_percentile(samples, 0.50), 9),
+                'p90': round(_percentile(samples, 0.90), 9),
+                'p99': round(_percentile(samples, 0.99), 9),
+                'max': round(samples[-1], 9),
+                'share': round(entry['total'] / edb_total, 4) if edb_total else 0.0,
+                'stages': {stage: {'calls': s['calls'], 'total': round(s['total'], 6)}
+                           for stage, s in sorted(entry['stages'].items(), key=lambda item: -item[1]['total'])},
+            })
+            rows.append(entry)
+        rows.sort(key=lambda entry: -entry['total'])
+
+        edb_by_stage = {}
+        for (stage, _member, _kind), samples in self.samples.items():
+            edb_by_stage[stage] = edb_by_stage.get(stage, 0.0) + sum(samples)
+        stages = {
+            stage: {
+                'wall': round(wall, 6),
+                'edb': round(edb_by_stage.get(stage, 0.0), 6),
+                'other': round(max(wall - edb_by_stage.get(stage, 0.0), 0.0), 6),
+            }
+            for stage, wall in self.stage_wall.items()
+        }
+
+        wall = time.perf_counter() - self.started
+        return {
+            'wall': round(wall, 6),
+            'edbTotal': round(edb_total, 6),
+            'otherTotal': round(max(wall - edb_total, 0.0), 6),
+            'stages': stages,
+            'members': rows,
+            'offenders': self._offenders(rows),
+        }
+
+    def _offenders(self, rows):
+        """Members worth a look: repeated lookups, calls repeating their arguments and the biggest EDB time shares."""
+        offenders = []
+        for entry in rows:
+            busiest_stage = next(iter(entry['stages']), 'other')
+            distinct = len(self.arguments.get(entry['member'], ())) or entry['calls']
+            if entry['kind'] == 'get' and entry['calls'] >= REPEATED_LOOKUP_MIN:
+                hint = f"property evaluated {entry['calls']} times; look it up once and reuse it"
+            elif entry['calls'] >= REPEATED_LOOKUP_MIN and distinct * 2 <= entry['calls']:
+                hint = (f"{entry['calls']} calls with only {distinct} distinct arguments, mostly in "
+                        f"'{busiest_stage}'; call once per unique value")
+            elif entry['share'] >= OFFENDER_MIN_SHARE:
+                hint = f"{entry['share'] * 100:.0f}% of EDB time, mostly in '{busiest_stage}'"
+            else:
+                continue
+            offenders.append({'member': entry['member'], 'total': entry['total'], 'calls': entry['calls'],
+                              'share': entry['share'], 'hint': hint})
+        return offenders[:10]
+
+    def write_report(self, path):
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=4)
+        return report
+
+
+def format_summary(report, top=5):
+    """Short text summary of a profile report for the modeling log."""
+    lines = [f"EDB API time {report['edbTotal']:.3f}s, other time {report['otherTotal']:.3f}s "
+             f"(wall {report['wall']:.3f}s)."]
+    for entry in report['members'][:top]:
+        lines.append(f"  {entry['member']:<40} {entry['calls']:>8} x  total {entry['total']:.3f}s  "
+                     f"p50 {entry['p50'] * 1e3:.3f}ms  p99 {entry['p99'] * 1e3:.3f}ms")
+    for offender in report['offenders']:
+        lines.append(f"  OFFENDER {offender['member']}: {offender['hint']}")
+    return '\n'.join(lines)
+
+
+class _ProfiledEdb:
+    def __init__(self, profiler, edb):
+        self._profiler = profiler
+        self._edb = edb
+        self._proxies = {}
+
+    def __getattr__(self, name):
+        if name not in PROFILED_APIS:
+            return getattr(self._edb, name)
+        proxy = self._proxies.get(name)
+        if proxy is None:
+            proxy = self._proxies[name] = _TimingProxy(self._profiler, getattr(self._edb, name), name)
+        return proxy
+
+
+class _TimingProxy:
+    def __init__(self, profiler, target, prefix):
+        self._profiler = profiler
+        self._target = target
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        profiler = self._profiler
+        member = f"{self._prefix}.{name}"
+        start = time.perf_counter()
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            profiler.record(member, 'get', time.perf_counter() - start)
+            return attr
+
+        def timed(*args, **kwargs):
+            profiler.record_arguments(member, args, kwargs)
+            call_start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                profiler.record(member, 'call', time.perf_counter() - call_start)
+        return timed
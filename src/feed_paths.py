@@ -0,0 +1,374 @@
+"""Feed-path geometry computed in Python, matching calculateFeedPaths in gui/js/utils.js.
+
+Single vias run a straight trace from the via to the board edge. A
+differential pair's feed is a centerline (d1 straight, an arc of alpha
+degrees with radius R, then d2 straight or up to the board edge) offset by
+half the trace pitch to either side, with a 45-degree jog from the via
+pitch to the trace pitch. All instances of a project are computed together
+in NumPy arrays; FeedPathEngine caches the result per instance parameters.
+
+Check the engine against the feed paths the GUI saved in a project (from src/):
+    python feed_paths.py check ../examples/project.json
+"""
+import re
+import math
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# arrowDirection 0..3 = up / right / down / left
+ARROW_VECTORS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+DIFF_TYPES = ('differential', 'diff_gnd')
+ARC_STEPS = 10
+# Board size the GUI falls back to when its inputs are empty.
+DEFAULT_BOARD_WIDTH = 400
+DEFAULT_BOARD_HEIGHT = 200
+CACHE_SIZE = 200000
+
+# Every property the geometry reads; the cache key is built from these.
+_PARAM_KEYS = ('arrowDirection', 'pitch', 'orientation') + tuple(
+    f'feed{side}{name}' for side in ('In', 'Out') for name in ('Width', 'Spacing', 'D1', 'Alpha', 'R', 'D2'))
+_JS_NUMBER = re.compile(r'[+-]?(?:Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+# Candidate centerline points per feed: start, after d1, the arc, after d2 (or at the board edge).
+_POINTS = 3 + ARC_STEPS
+
+
+def _parse_float(value):
+    """JavaScript parseFloat: strings are read up to the first invalid character; NaN if nothing parses."""
+    if isinstance(value, bool) or value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _JS_NUMBER.match(value.lstrip())
+        if match:
+            return float(match.group(0))
+    return math.nan
+
+
+def _truthy(value):
+    """JavaScript truthiness of a JSON value."""
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return bool(value) or value == [] or value == {}
+
+
+def _number(value, default=0.0):
+    """`value || default` for a numeric property."""
+    return float(value) if _truthy(value) and isinstance(value, (int, float)) else default
+
+
+def _direction(arrow, feed_in):
+    """Unit vector of a feed for arrowDirection (feed-ins point the opposite way); (0, 0) if invalid."""
+    if feed_in:
+        arrow = math.fmod(arrow + 2, 4)
+    return ARROW_VECTORS[int(arrow)] if arrow in (0, 1, 2, 3) else (0, 0)
+
+
+def _js_numbers(values):
+    """Whole numbers as ints, so they serialize ("90", not "90.0") and format into EDB units like the GUI's."""
+    return [int(v) if v.is_integer() else v for v in values]
+
+
+def _points(xs, ys):
+    return [{'x': x, 'y': y} for x, y in zip(xs, ys)]
+
+
+def _single_paths(instances, board_w, board_h):
+    arrows = [_number(inst.get('properties', {}).get('arrowDirection')) for inst in instances]
+    x = np.array([inst['x'] for inst in instances], dtype=float)
+    y = np.array([inst['y'] for inst in instances], dtype=float)
+    results = []
+    sides = []
+    for feed_in in (True, False):
+        vectors = np.array([_direction(arrow, feed_in) for arrow in arrows], dtype=float).reshape(-1, 2)
+        edge_x = np.where(vectors[:, 0] != 0, vectors[:, 0] * board_w / 2, x)
+        edge_y = np.where(vectors[:, 1] != 0, vectors[:, 1] * board_h / 2, y)
+        sides.append((_js_numbers(edge_x.tolist()), _js_numbers(edge_y.tolist())))
+    for i, inst in enumerate(instances):
+        start = {'x': inst['x'], 'y': inst['y']}
+        (in_x, in_y), (out_x, out_y) = sides
+        results.append({'feedIn': [[dict(start), {'x': in_x[i], 'y': in_y[i]}]],
+                        'feedOut': [[dict(start), {'x': out_x[i], 'y': out_y[i]}]]})
+    return results
+
+
+def _edge_distance(cur_x, cur_y, cos_dir, sin_dir, half_w, half_h):
+    """Distance along the direction to the first board edge crossed, in the order the GUI checks them."""
+    def check(value, origin, direction):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (value - origin) / direction
+        return np.where((np.abs(direction) < 1e-9) | (t < -1e-9), np.inf, t)
+
+    t_min = np.full(cur_x.shape, np.inf)
+    with np.errstate(invalid='ignore'):
+        for value, origin, along, other, limit in ((half_w, cur_x, cos_dir, (cur_y, sin_dir), half_h),
+                                                   (-half_w, cur_x, cos_dir, (cur_y, sin_dir), half_h),
+                                                   (half_h, cur_y, sin_dir, (cur_x, cos_dir), half_w),
+                                                   (-half_h, cur_y, sin_dir, (cur_x, cos_dir), half_w)):
+            t = check(value, origin, along)
+            at = other[0] + t * other[1]
+            t_min = np.where((t < t_min) & (at >= -limit) & (at <= limit), t, t_min)
+    return t_min
+
+
+def _diff_feeds(feeds, board_w, board_h):
+    """Both traces of each differential feed; feeds are (x, y, pitch, vertical, feed_in, arrow, props, side) rows."""
+    count = len(feeds)
+    rows = np.arange(count)
+    x = np.array([f[0] for f in feeds], dtype=float)
+    y = np.array([f[1] for f in feeds], dtype=float)
+    pitch = np.array([f[2] for f in feeds], dtype=float)
+    vertical = np.array([f[3] for f in feeds], dtype=bool)
+    vectors = np.array([_direction(f[5], f[4]) for f in feeds], dtype=float).reshape(-1, 2)
+    props = [f[6] for f in feeds]
+    sides = [f[7] for f in feeds]
+    width = np.array([float(p[f'feed{s}Width']) for p, s in zip(props, sides)])
+    spacing = np.array([_parse_float(p.get(f'feed{s}Spacing')) if p.get(f'feed{s}Spacing') is not None else math.nan
+                        for p, s in zip(props, sides)])
+    d1 = np.array([_parse_float(p.get(f'feed{s}D1') or 0) for p, s in zip(props, sides)])
+    alpha = np.array([_parse_float(p.get(f'feed{s}Alpha') or 0) for p, s in zip(props, sides)])
+    radius = np.array([_parse_float(p.get(f'feed{s}R') or 0) for p, s in zip(props, sides)])
+    d2_raw = [p.get(f'feed{s}D2') for p, s in zip(props, sides)]
+    to_edge = np.array([value is None or value == "" for value in d2_raw])
+    d2 = np.array([math.nan if value is None or value == "" else _parse_float(value) for value in d2_raw])
+    # `parseFloat(value) || 0`
+    d1, alpha, radius = (np.where(np.isnan(values), 0.0, values) for values in (d1, alpha, radius))
+
+    trace_pitch = width + spacing
+    jog = np.abs(pitch - trace_pitch) / 2
+    d1 = np.maximum(d1, jog)
+    direction = np.arctan2(vectors[:, 1], vectors[:, 0])
+
+    pts = np.zeros((count, _POINTS, 2))
+    valid = np.zeros((count, _POINTS), dtype=bool)
+    pts[:, 0, 0], pts[:, 0, 1] = x, y
+    valid[:, 0] = True
+    cur_x, cur_y = x.copy(), y.copy()
+
+    # Step 1: straight d1
+    step = d1 > 0
+    cur_x = np.where(step, cur_x + d1 * np.cos(direction), cur_x)
+    cur_y = np.where(step, cur_y + d1 * np.sin(direction), cur_y)
+    pts[:, 1, 0], pts[:, 1, 1], valid[:, 1] = cur_x, cur_y, step
+
+    # Step 2: arc of alpha degrees with radius R, in ARC_STEPS segments
+    arc = (alpha != 0) & (radius > 0)
+    alpha_rad = alpha * math.pi / 180
+    turn = np.sign(alpha)
+    center_x = cur_x + radius * np.cos(direction + turn * math.pi / 2)
+    center_y = cur_y + radius * np.sin(direction + turn * math.pi / 2)
+    start_angle = direction - turn * math.pi / 2
+    step_angle = alpha_rad / ARC_STEPS
+    theta = start_angle[:, None] + np.arange(1, ARC_STEPS + 1)[None, :] * step_angle[:, None]
+    pts[:, 2:2 + ARC_STEPS, 0] = center_x[:, None] + radius[:, None] * np.cos(theta)
+    pts[:, 2:2 + ARC_STEPS, 1] = center_y[:, None] + radius[:, None] * np.sin(theta)
+    valid[:, 2:2 + ARC_STEPS] = arc[:, None]
+    cur_x = np.where(arc, pts[:, 1 + ARC_STEPS, 0], cur_x)
+    cur_y = np.where(arc, pts[:, 1 + ARC_STEPS, 1], cur_y)
+    direction = np.where(arc, direction + alpha_rad, direction)
+
+    # Step 3: straight d2, or up to the board edge when d2 is not set
+    cos_dir, sin_dir = np.cos(direction), np.sin(direction)
+    t_edge = _edge_distance(cur_x, cur_y, cos_dir, sin_dir, board_w / 2, board_h / 2)
+    with np.errstate(invalid='ignore'):
+        last = np.where(to_edge, t_edge, d2)
+        step = np.where(to_edge, np.isfinite(t_edge), d2 > 0)
+    last = np.where(step, last, 0.0)
+    pts[:, -1, 0] = cur_x + last * cos_dir
+    pts[:, -1, 1] = cur_y + last * sin_dir
+    valid[:, -1] = step
+
+    # Drop the skipped candidates, keeping the order of the rest.
+    order = np.argsort(~valid, axis=1, kind='stable')
+    pts = np.take_along_axis(pts, order[:, :, None], axis=1)
+    counts = valid.sum(axis=1)
+
+    # Direction at each point: towards the next point, from the previous one at the end.
+    deltas = np.zeros_like(pts)
+    deltas[:, :-1] = pts[:, 1:] - pts[:, :-1]
+    last_index = counts - 1
+    previous = deltas[rows, np.maximum(last_index - 1, 0)]
+    deltas[rows, last_index] = np.where((counts > 1)[:, None], previous, np.stack([cos_dir, sin_dir], axis=1))
+    length = np.sqrt(deltas[:, :, 0] * deltas[:, :, 0] + deltas[:, :, 1] * deltas[:, :, 1])
+    offset = (trace_pitch / 2)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nx = np.where(length > 0, -deltas[:, :, 1] / length, 0.0)
+        ny = np.where(length > 0, deltas[:, :, 0] / length, 0.0)
+    path1 = np.stack([pts[:, :, 0] + nx * offset, pts[:, :, 1] + ny * offset], axis=2)
+    path2 = np.stack([pts[:, :, 0] - nx * offset, pts[:, :, 1] - ny * offset], axis=2)
+    flat = ~(length > 0)
+    path1[flat], path2[flat] = pts[flat], pts[flat]
+
+    # 45-degree fan-out from the via pitch to the trace pitch.
+    half = np.where(vertical, 0.0, pitch / 2), np.where(vertical, pitch / 2, 0.0)
+    v1 = np.stack([x - half[0], y - half[1]], axis=1)
+    v2 = np.stack([x + half[0], y + half[1]], axis=1)
+    d11 = (v1[:, 0] - path1[:, 0, 0]) ** 2 + (v1[:, 1] - path1[:, 0, 1]) ** 2
+    d12 = (v1[:, 0] - path2[:, 0, 0]) ** 2 + (v1[:, 1] - path2[:, 0, 1]) ** 2
+    jogged = jog > 1e-6
+    with np.errstate(invalid='ignore'):
+        replace_start = jogged & (np.abs(d1 - jog) > 1e-6)
+    swap = ~(d11 < d12)[:, None, None]
+
+    # Each trace is: its via, the jog end (if any), then the offset path (without its start when jogged).
+    index = np.arange(_POINTS)[None, :]
+    keep = (index < counts[:, None]) & ((index >= 1) | ~jogged[:, None])
+    traces = []
+    for via, path in ((v1, np.where(swap, path2, path1)), (v2, np.where(swap, path1, path2))):
+        points = np.concatenate([via[:, None], (path[:, 0] + vectors * jog[:, None])[:, None], path], axis=1)
+        mask = np.concatenate([np.ones((count, 1), dtype=bool), replace_start[:, None], keep], axis=1)
+        traces.append((points[mask].T.tolist(), mask.sum(axis=1).tolist()))
+
+    results = [[] for _ in range(count)]
+    for (xs, ys), lengths in traces:
+        xs, ys = _js_numbers(xs), _js_numbers(ys)
+        start = 0
+        for i, n in enumerate(lengths):
+            results[i].append(_points(xs[start:start + n], ys[start:start + n]))
+            start += n
+    return results
+
+
+def compute_feed_paths(instances, board_w=DEFAULT_BOARD_WIDTH, board_h=DEFAULT_BOARD_HEIGHT):
+    """{'feedIn': [...], 'feedOut': [...]} for each instance, as calculateFeedPaths returns it."""
+    board_w, board_h = float(board_w), float(board_h)
+    results = [None] * len(instances)
+    singles = []
+    feeds = []
+    for i, inst in enumerate(instances):
+        kind = inst.get('type')
+        results[i] = {'feedIn': [], 'feedOut': []}
+        if kind == 'single':
+            singles.append(i)
+        elif kind in DIFF_TYPES:
+            props = inst.get('properties', {})
+            pitch = _number(props.get('pitch'), 1.0)
+            vertical = props.get('orientation') == 'vertical'
+            arrow = _number(props.get('arrowDirection'))
+            for side, key in (('In', 'feedIn'), ('Out', 'feedOut')):
+                width = props.get(f'feed{side}Width')
+                if _truthy(width) and isinstance(width, (int, float)) and width > 0:
+                    feeds.append((inst['x'], inst['y'], pitch, vertical, side == 'In', arrow, props, side, i, key))
+
+    if singles:
+        for i, paths in zip(singles, _single_paths([instances[i] for i in singles], board_w, board_h)):
+            results[i] = paths
+    if feeds:
+        for feed, traces in zip(feeds, _diff_feeds(feeds, board_w, board_h)):
+            results[feed[8]][feed[9]] = traces
+    return results
+
+
+def _param_key(inst, board_w, board_h):
+    props = inst.get('properties', {})
+    return (inst.get('type'), inst.get('x'), inst.get('y'), board_w, board_h) + tuple(props.get(k) for k in _PARAM_KEYS)
+
+
+class FeedPathEngine:
+    """compute_feed_paths with an LRU cache keyed by each instance's geometry parameters.
+
+    Moving one via of a large project recomputes only that via. Cached
+    results are shared between calls, so callers must not modify them.
+    """
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compute(self, instances, board_w=DEFAULT_BOARD_WIDTH, board_h=DEFAULT_BOARD_HEIGHT):
+        with self._lock:
+            return self._compute(instances, float(board_w), float(board_h))
+
+    def _compute(self, instances, board_w, board_h):
+        results = [None] * len(instances)
+        keys = {}
+        for i, inst in enumerate(instances):
+            try:
+                key = _param_key(inst, board_w, board_h)
+                cached = self._cache.get(key)
+            except TypeError:
+                continue # unhashable property value: computed, never cached
+            if cached is not None:
+                self._cache.move_to_end(key)
+                results[i] = cached
+            else:
+                keys[i] = key
+        missing = [i for i, result in enumerate(results) if result is None]
+        self.hits += len(instances) - len(missing)
+        self.misses += len(missing)
+        for i, paths in zip(missing, compute_feed_paths([instances[i] for i in missing], board_w, board_h)):
+            results[i] = paths
+            if i in keys:
+                self._cache[keys[i]] = paths
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+    def fill(self, data, missing_only=False):
+        """Copy of a project whose instances carry feedPaths computed here (the project itself is unchanged).
+
+        With missing_only, feed paths already in the project are kept and the
+        project is returned as is if every instance has them.
+        """
+        instances = data.get('placedInstances', [])
+        todo = [i for i, inst in enumerate(instances) if not missing_only or 'feedPaths' not in inst]
+        if not todo:
+            return data
+        board_w = _parse_float(data.get('boardWidth'))
+        board_h = _parse_float(data.get('boardHeight'))
+        board_w = board_w if _truthy(board_w) else DEFAULT_BOARD_WIDTH
+        board_h = board_h if _truthy(board_h) else DEFAULT_BOARD_HEIGHT
+        filled = list(instances)
+        for i, paths in zip(todo, self.compute([instances[i] for i in todo], board_w, board_h)):
+            filled[i] = dict(instances[i], feedPaths=paths)
+        return dict(data, placedInstances=filled)
+
+
+def compare_feed_paths(expected, actual, tolerance=1e-6):
+    """Describes the first difference between two feedPaths values, or returns None if they match."""
+    for key in ('feedIn', 'feedOut'):
+        a, b = expected.get(key, []), actual.get(key, [])
+        if len(a) != len(b):
+            return f"{key}: {len(a)} traces expected, {len(b)} computed"
+        for t, (trace_a, trace_b) in enumerate(zip(a, b)):
+            if len(trace_a) != len(trace_b):
+                return f"{key}[{t}]: {len(trace_a)} points expected, {len(trace_b)} computed"
+            for p, (pa, pb) in enumerate(zip(trace_a, trace_b)):
+                for axis in ('x', 'y'):
+                    va, vb = pa[axis], pb[axis]
+                    if va is None or vb is None or abs(va - vb) > tolerance * max(1.0, abs(va)):
+                        return f"{key}[{t}][{p}].{axis}: {va} expected, {vb} computed"
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Python feed-path engine (mirrors calculateFeedPaths in gui/js/utils.js).")
+    commands = parser.add_subparsers(dest='command', required=True)
+    check_parser = commands.add_parser('check', help="Compare against the feedPaths the GUI saved in a project.")
+    check_parser.add_argument('project')
+    check_parser.add_argument('--tolerance', type=float, default=1e-6, help="Relative tolerance per coordinate.")
+    args = parser.parse_args()
+
+    from project_file import load_project_file
+
+    data = load_project_file(args.project)
+    instances = [inst for inst in data.get('placedInstances', []) if 'feedPaths' in inst]
+    start = time.perf_counter()
+    computed = FeedPathEngine().fill(dict(data, placedInstances=instances))['placedInstances']
+    elapsed = time.perf_counter() - start
+    failures = 0
+    for inst, result in zip(instances, computed):
+        difference = compare_feed_paths(inst['feedPaths'], result['feedPaths'], args.tolerance)
+        if difference:
+            failures += 1
+            print(f"MISMATCH {inst.get('name')} ({inst.get('type')}): {difference}")
+    print(f"{len(instances) - failures}/{len(instances)} instances match ({elapsed * 1000:.1f} ms).")
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,167 @@
+import copy
+import math
+
+
+def flatten_project_data(data):
+    """Expands diff_gnd and surround_via_array instances into plain differential and GND vias."""
+    flattened_data = copy.deepcopy(data)
+    new_instances = []
+
+    for inst in flattened_data['placedInstances']:
+        if inst['type'] == 'diff_gnd':
+            # Create the differential pair instance
+            diff_inst = copy.deepcopy(inst)
+            diff_inst['type'] = 'differential'
+            new_instances.append(diff_inst)
+
+            # Generate GND vias
+            props = inst.get('properties', {})
+            pitch = float(props.get('pitch', 0))
+            orientation = props.get('orientation', 'horizontal')
+            gnd_radius = float(props.get('gndRadius', 0))
+            gnd_count = int(props.get('gndCount', 0))
+            gnd_angle_step = float(props.get('gndAngleStep', 0))
+            gnd_padstack_index = int(props.get('gndPadstackIndex', 0))
+
+            cx = inst['x']
+            cy = inst['y']
+
+            # Determine signal via locations relative to center
+            # Vertical: N top (+y), P bottom (-y)
+            # Horizontal: N right (+x), P left (-x)
+
+            if orientation == 'vertical':
+                p_center = (cx, cy - pitch/2)
+                n_center = (cx, cy + pitch/2)
+                p_base_angle = 270
+                n_base_angle = 90
+            else: # horizontal
+                p_center = (cx - pitch/2, cy)
+                n_center = (cx + pitch/2, cy)
+                p_base_angle = 180
+                n_base_angle = 0
+
+            def generate_angles(base_deg, count, step_deg):
+                angles = []
+                if count % 2 == 1: # Odd
+                    angles.append(base_deg)
+                    for i in range(1, (count // 2) + 1):
+                        angles.append(base_deg + i * step_deg)
+                        angles.append(base_deg - i * step_deg)
+                else: # Even
+                    for i in range(1, (count // 2) + 1):
+                        offset = (i - 0.5) * step_deg
+                        angles.append(base_deg + offset)
+                        angles.append(base_deg - offset)
+                return angles
+
+            # Generate GNDs for P
+            p_angles = generate_angles(p_base_angle, gnd_count, gnd_angle_step)
+            for i, ang_deg in enumerate(p_angles):
+                ang_rad = math.radians(ang_deg)
+                gx = p_center[0] + gnd_radius * math.cos(ang_rad)
+                gy = p_center[1] + gnd_radius * math.sin(ang_rad)
+
+                gnd_inst = {
+                    "id": int(f"{inst['id']}1{i}"), # Fake ID
+                    "name": f"{inst['name']}_GND_P_{i+1}",
+                    "type": "gnd",
+                    "x": gx,
+                    "y": gy,
+                    "padstackIndex": gnd_padstack_index,
+                    "properties": {}
+                }
+                new_instances.append(gnd_inst)
+
+            # Generate GNDs for N
+            n_angles = generate_angles(n_base_angle, gnd_count, gnd_angle_step)
+            for i, ang_deg in enumerate(n_angles):
+                ang_rad = math.radians(ang_deg)
+                gx = n_center[0] + gnd_radius * math.cos(ang_rad)
+                gy = n_center[1] + gnd_radius * math.sin(ang_rad)
+
+                gnd_inst = {
+                    "id": int(f"{inst['id']}2{i}"), # Fake ID
+                    "name": f"{inst['name']}_GND_N_{i+1}",
+                    "type": "gnd",
+                    "x": gx,
+                    "y": gy,
+                    "padstackIndex": gnd_padstack_index,
+                    "properties": {}
+                }
+                new_instances.append(gnd_inst)
+
+        elif inst['type'] == 'surround_via_array':
+            # Find parent
+            props = inst.get('properties', {})
+            connected_id = props.get('connectedDiffPairId')
+
+            # Find parent instance in the ORIGINAL data (not new_instances)
+            parent = next((i for i in flattened_data['placedInstances'] if i['id'] == connected_id), None)
+
+            if parent and (parent['type'] == 'differential' or parent['type'] == 'diff_gnd'):
+                parent_props = parent.get('properties', {})
+                pitch = float(parent_props.get('pitch', 1.0))
+                orientation = parent_props.get('orientation', 'horizontal')
+                is_vert = (orientation == 'vertical')
+
+                dx = 0 if is_vert else pitch / 2
+                dy = pitch / 2 if is_vert else 0
+
+                s1 = {'x': parent['x'] - dx, 'y': parent['y'] - dy}
+                s2 = {'x': parent['x'] + dx, 'y': parent['y'] + dy}
+
+                gnd_radius = float(props.get('gndRadius', 15))
+                gnd_count = int(props.get('gndCount', 3))
+                gnd_angle_step = float(props.get('gndAngleStep', 30))
+                gnd_padstack_index = int(props.get('gndPadstackIndex', 0))
+
+                # Calculate angles
+                angles = []
+                if gnd_count % 2 != 0: # Odd
+                    angles.append(0)
+                    for i in range(1, (gnd_count - 1) // 2 + 1):
+                        angles.append(i * gnd_angle_step)
+                        angles.append(-i * gnd_angle_step)
+                else: # Even
+                    for i in range(1, gnd_count // 2 + 1):
+                        angle = (2 * i - 1) * gnd_angle_step / 2
+                        angles.append(angle)
+                        angles.append(-angle)
+
+                if is_vert:
+                    angle_base1 = 270
+                    angle_base2 = 90
+                else:
+                    angle_base1 = 180
+                    angle_base2 = 0
+
+                def add_gnds(center, base_angle, suffix_id):
+                    for i, ang in enumerate(angles):
+                        rad = math.radians(base_angle + ang)
+                        gx = center['x'] + gnd_radius * math.cos(rad)
+                        gy = center['y'] + gnd_radius * math.sin(rad)
+
+                        gnd_inst = {
+                            "id": int(f"{inst['id']}{suffix_id}{i}"),
+                            "name": f"{inst['name']}_GND_{suffix_id}_{i+1}",
+                            "type": "gnd",
+                            "x": gx,
+                            "y": gy,
+                            "padstackIndex": gnd_padstack_index,
+                            "properties": {}
+                        }
+                        new_instances.append(gnd_inst)
+
+                add_gnds(s1, angle_base1, 1)
+                add_gnds(s2, angle_base2, 2)
+
+                # Keep the surround_via_array entry itself so dog_bone instances
+                # connected to it can still find their parent in the flattened data.
+                new_instances.append(inst)
+
+        else:
+            new_instances.append(inst)
+
+    flattened_data['placedInstances'] = new_instances
+    return flattened_data
@@ -0,0 +1,129 @@
+import math
+
+
+def connected_parent_id(inst: dict):
+    """Returns the id of the instance a dog bone / surround array / GND is attached to."""
+    props = inst.get('properties', {})
+    return props.get('connectedInstanceId') or props.get('connectedDiffPairId')
+
+
+def attachments_by_parent(instances):
+    """Maps parent id -> dog bone and surround array entries attached to it."""
+    attachments = {}
+    for inst in instances:
+        if inst['type'] in ('dog_bone', 'surround_via_array'):
+            parent = connected_parent_id(inst)
+            if parent is not None:
+                attachments.setdefault(parent, []).append(inst)
+    return attachments
+
+
+def surround_centers_and_outward_angles(surround_data: dict, instance_map: dict):
+    """Compute GND via centers and outward angles for a surround_via_array instance.
+    Mirrors the logic in canvas.js getSurroundViaArrayGeometry."""
+    props = surround_data.get('properties', {})
+    r = props.get('gndRadius', 15)
+    n = props.get('gndCount', 3)
+    step = props.get('gndAngleStep', 30)
+
+    diff_pair_id = props.get('connectedDiffPairId')
+    diff_pair = instance_map.get(diff_pair_id) if diff_pair_id else None
+
+    center_x = surround_data['x']
+    center_y = surround_data['y']
+    is_vert = False
+    pitch = 40
+
+    if diff_pair:
+        diff_props = diff_pair.get('properties', {})
+        is_vert = diff_props.get('orientation') == 'vertical'
+        pitch = diff_props.get('pitch', 40)
+        center_x = diff_pair['x']
+        center_y = diff_pair['y']
+
+    dx = 0.0 if is_vert else pitch / 2.0
+    dy = pitch / 2.0 if is_vert else 0.0
+
+    # Build relative-angle list (same algorithm as canvas.js)
+    angles = []
+    if n % 2 != 0:
+        angles.append(0)
+        for i in range(1, (n - 1) // 2 + 1):
+            angles.append(i * step)
+            angles.append(-i * step)
+    else:
+        for i in range(1, n // 2 + 1):
+            a = (2 * i - 1) * step / 2.0
+            angles.append(a)
+            angles.append(-a)
+
+    base1 = 270 if is_vert else 180  # around P1 (negative-side signal via)
+    base2 = 90  if is_vert else 0   # around P2 (positive-side signal via)
+
+    centers = []
+    outward_angles = []
+    for a in angles:
+        rad1 = math.radians(base1 + a)
+        centers.append(((center_x - dx) + r * math.cos(rad1),
+                        (center_y - dy) + r * math.sin(rad1)))
+        outward_angles.append(base1 + a)
+
+        rad2 = math.radians(base2 + a)
+        centers.append(((center_x + dx) + r * math.cos(rad2),
+                        (center_y + dy) + r * math.sin(rad2)))
+        outward_angles.append(base2 + a)
+
+    return centers, outward_angles
+
+
+def dog_bone_segments(dog_bone: dict, instance_map: dict):
+    """Returns the dog bone traces as [((x0, y0), (x1, y1), side), ...].
+
+    side is 'n' / 'p' for the two legs of a differential pair, 'gnd' for GND
+    parents (plain or surround array) and 'single' for single vias. Mirrors the
+    geometry built by DogBoneFeed.process.
+    """
+    props = dog_bone.get('properties', {})
+    parent = instance_map.get(connected_parent_id(dog_bone))
+    if not parent:
+        return []
+
+    length = float(props.get('length', 20))
+    parent_type = parent['type']
+
+    if parent_type in ('differential', 'diff_gnd'):
+        parent_props = parent.get('properties', {})
+        pitch = parent_props.get('pitch', 40)
+        is_vert = parent_props.get('orientation') == 'vertical'
+        dx = 0 if is_vert else pitch / 2
+        dy = pitch / 2 if is_vert else 0
+
+        segments = []
+        for side, sign, angle_key, default in (('n', 1, 'posAngle', 45), ('p', -1, 'negAngle', 135)):
+            sx = parent['x'] + sign * dx
+            sy = parent['y'] + sign * dy
+            rad = math.radians(float(props.get(angle_key, default)))
+            segments.append(((sx, sy), (sx + length * math.cos(rad), sy + length * math.sin(rad)), side))
+        return segments
+
+    if parent_type == 'surround_via_array':
+        centers, outward_angles = surround_centers_and_outward_angles(parent, instance_map)
+        gnd_angles = props.get('gndAngles', [])
+        if not isinstance(gnd_angles, list):
+            gnd_angles = []
+
+        segments = []
+        for i, (cx, cy) in enumerate(centers):
+            if i < len(gnd_angles) and gnd_angles[i] is not None:
+                angle_deg = float(gnd_angles[i])
+            else:
+                angle_deg = float(outward_angles[i])
+            rad = math.radians(angle_deg)
+            segments.append(((cx, cy), (cx + length * math.cos(rad), cy + length * math.sin(rad)), 'gnd'))
+        return segments
+
+    angle_deg = props.get('angle', props.get('posAngle', 45))
+    rad = math.radians(float(angle_deg))
+    sx, sy = parent['x'], parent['y']
+    side = 'gnd' if parent_type == 'gnd' else 'single'
+    return [((sx, sy), (sx + length * math.cos(rad), sy + length * math.sin(rad)), side)]
@@ -29,9 +29,10 @@ export const api = {
         }
     },
 
-    async saveProject(projectData) {
+    // Python saves its synced project model (flush the sync first).
+    async saveProject() {
         if (window.pywebview) {
-            await window.pywebview.api.save_project(projectData);
+            await window.pywebview.api.save_project(null);
         }
     },
 
@@ -42,9 +43,77 @@ export const api = {
         return null;
     },
 
-    async exportAEDB(projectData, version) {
+    async streamProjectInstances(streamId) {
         if (window.pywebview) {
-            await window.pywebview.api.export_aedb(projectData, version);
+            return await window.pywebview.api.stream_project_instances(streamId);
+        }
+        return null;
+    },
+
+    async syncProject(ops) {
+        if (window.pywebview) {
+            return await window.pywebview.api.sync_project(ops);
+        }
+        return null;
+    },
+
+    async importInstances() {
+        if (window.pywebview) {
+            return await window.pywebview.api.import_instances();
+        }
+        return false;
+    },
+
+    async recoverAutosave() {
+        if (window.pywebview) {
+            return await window.pywebview.api.recover_autosave();
+        }
+        return null;
+    },
+
+    async discardAutosave() {
+        if (window.pywebview) {
+            await window.pywebview.api.discard_autosave();
+        }
+    },
+
+    async exportAEDB(version) {
+        if (window.pywebview) {
+            return await window.pywebview.api.export_aedb(null, version);
+        }
+        return false;
+    },
+
+    async exportAEDBTiled(version, tileSize, overlap, workers) {
+        if (window.pywebview) {
+            return await window.pywebview.api.export_aedb_tiled(null, version, tileSize, overlap, workers);
+        }
+        return false;
+    },
+
+    async listExportJobs() {
+        if (window.pywebview) {
+            return await window.pywebview.api.list_export_jobs();
+        }
+        return [];
+    },
+
+    async cancelExportJob(jobId) {
+        if (window.pywebview) {
+            return await window.pywebview.api.cancel_export_job(jobId);
+        }
+        return false;
+    },
+
+    async setMaxConcurrentExports(value) {
+        if (window.pywebview) {
+            await window.pywebview.api.set_max_concurrent_exports(value);
+        }
+    },
+
+    async exportCrosstalkProjects(radius, k, dedupe, symmetry) {
+        if (window.pywebview) {
+            await window.pywebview.api.export_crosstalk_projects(null, radius, k, dedupe, symmetry);
         }
     },
 
@@ -1,17 +1,20 @@
 
 import { state, resetProjectData } from './state.js';
 import { api } from './api.js';
-import { addMessage, clearMessages, toggleMessageWindow, copyMessages, calculateFeedPaths } from './utils.js';
+import { addMessage, addMessages, setMessageLevel, clearMessages, toggleMessageWindow, copyMessages } from './utils.js';
 import * as stackup from './tabs/stackup.js';
 import * as padstack from './tabs/padstack.js';
 import * as placement from './tabs/placement.js';
 import * as simulation from './tabs/simulation.js';
+import { startSync, suspendSync, resetBaseline, flushSync, applyPatch } from './sync.js';
 
 // Expose functions to window for HTML onclick handlers
 window.toggleMessageWindow = toggleMessageWindow;
 window.clearMessages = clearMessages;
 window.copyMessages = copyMessages;
 window.addMessage = addMessage;
+window.addMessages = addMessages;
+window.setMessageLevel = setMessageLevel;
 
 // Stackup
 window.createNewStackup = stackup.createNewStackup;
@@ -29,6 +32,8 @@ window.updateBackdrillProperty = padstack.updateBackdrillProperty;
 window.toggleFill = padstack.toggleFill;
 window.updateFillProperty = padstack.updateFillProperty;
 window.validateStubInput = padstack.validateStubInput;
+window.toggleHdi = padstack.toggleHdi;
+window.updateHdiProperty = padstack.updateHdiProperty;
 
 // Placement
 window.renderPlacementTab = placement.renderPlacementTab;
@@ -40,40 +45,82 @@ window.deleteInstance = placement.deleteInstance;
 
 // Simulation
 window.exportAEDB = simulation.exportAEDB;
+window.updateExportProgress = simulation.updateExportProgress;
+window.cancelExportJob = simulation.cancelExportJob;
+window.saveMaxConcurrentExports = simulation.saveMaxConcurrentExports;
+window.exportAEDBTiled = simulation.exportAEDBTiled;
+window.exportCrosstalkProjects = simulation.exportCrosstalkProjects;
 window.saveAedbVersion = (value) => api.setConfig({ aedbVersion: value });
 
 // API
+function applyProjectSections(data) {
+    if (data.stackup) state.currentStackup = data.stackup;
+    if (data.units) state.currentUnits = data.units;
+    if (data.padstacks) state.padstacks = data.padstacks;
+    if (data.placedInstances) state.placedInstances = data.placedInstances;
+    if (data.canvasGridSpacing) state.canvasState.gridSpacing = data.canvasGridSpacing;
+
+    // Restore units UI
+    const radio = document.querySelector(`input[name="units"][value="${state.currentUnits}"]`);
+    if (radio) radio.checked = true;
+
+    // Restore board size
+    if (data.boardWidth) {
+        const wInput = document.getElementById('canvas-width');
+        if (wInput) wInput.value = data.boardWidth;
+    }
+    if (data.boardHeight) {
+        const hInput = document.getElementById('canvas-height');
+        if (hInput) hInput.value = data.boardHeight;
+    }
+}
+
+function renderProject() {
+    stackup.renderStackupTable();
+    stackup.render2DView();
+    padstack.renderPadstackList();
+    placement.renderPlacementTab();
+}
+
+// Redraw the placement tab at most this often while a large project streams in.
+const STREAM_RENDER_INTERVAL = 1000;
+let lastStreamRender = 0;
+
+// Called from Python with each chunk of placedInstances of a large project.
+window.appendProjectInstances = (chunk) => {
+    for (const inst of chunk) state.placedInstances.push(inst);
+    const now = Date.now();
+    if (now - lastStreamRender >= STREAM_RENDER_INTERVAL) {
+        lastStreamRender = now;
+        placement.renderPlacementTab();
+    }
+};
+
 window.loadProject = async () => {
     addMessage("Load Project clicked...");
     try {
         const data = await api.loadProject();
         addMessage(`API returned data: ${data ? 'yes' : 'no'}`);
         if (data) {
-            if (data.stackup) state.currentStackup = data.stackup;
-            if (data.units) state.currentUnits = data.units;
-            if (data.padstacks) state.padstacks = data.padstacks;
-            if (data.placedInstances) state.placedInstances = data.placedInstances;
-            if (data.canvasGridSpacing) state.canvasState.gridSpacing = data.canvasGridSpacing;
-
-            // Update UI
-            stackup.renderStackupTable();
-            stackup.render2DView();
-            padstack.renderPadstackList();
-            placement.renderPlacementTab();
-
-            // Restore units UI
-            const radio = document.querySelector(`input[name="units"][value="${state.currentUnits}"]`);
-            if (radio) radio.checked = true;
-
-            // Restore board size
-            if (data.boardWidth) {
-                const wInput = document.getElementById('canvas-width');
-                if (wInput) wInput.value = data.boardWidth;
-            }
-            if (data.boardHeight) {
-                const hInput = document.getElementById('canvas-height');
-                if (hInput) hInput.value = data.boardHeight;
+            suspendSync();
+            applyProjectSections(data);
+            renderProject();
+
+            if (data.streamId) {
+                // Large project: the stackup is shown already, instances arrive in chunks.
+                lastStreamRender = Date.now();
+                const trailing = await api.streamProjectInstances(data.streamId);
+                if (!trailing) {
+                    placement.renderPlacementTab();
+                    resetBaseline();
+                    return;
+                }
+                // Sections stored after placedInstances (older files keep the board size there).
+                applyProjectSections(trailing);
+                renderProject();
             }
+            // Python journals further edits against the loaded (or recovered) project.
+            resetBaseline();
 
             addMessage("Project loaded successfully.");
         }
@@ -84,26 +131,20 @@ window.loadProject = async () => {
 };
 
 window.saveProject = async () => {
-    const wInput = document.getElementById('canvas-width');
-    const hInput = document.getElementById('canvas-height');
-    const boardW = wInput ? (parseFloat(wInput.value) || 400) : 400;
-    const boardH = hInput ? (parseFloat(hInput.value) || 200) : 200;
-
-    const instancesWithPaths = state.placedInstances.map(inst => {
-        const feedPaths = calculateFeedPaths(inst, boardW, boardH);
-        return { ...inst, feedPaths };
-    });
+    // Python saves its synced copy of the project; only pending edits cross the bridge.
+    await flushSync();
+    await api.saveProject();
+};
 
-    const projectData = {
-        stackup: state.currentStackup,
-        units: state.currentUnits,
-        padstacks: state.padstacks,
-        placedInstances: instancesWithPaths,
-        canvasGridSpacing: state.canvasState.gridSpacing,
-        boardWidth: boardW,
-        boardHeight: boardH
-    };
-    await api.saveProject(projectData);
+window.importInstances = async () => {
+    await flushSync();
+    await api.importInstances();
+};
+
+// Called from Python with operations made on its side (e.g. importInstances).
+window.applyProjectPatch = (ops) => {
+    applyProjectSections(applyPatch(ops));
+    renderProject();
 };
 
 window.openFile = async () => {
@@ -172,6 +213,10 @@ window.addEventListener('pywebviewready', function () {
             const vInput = document.getElementById('aedb-version');
             if (vInput) vInput.value = cfg.aedbVersion;
         }
+        if (cfg && cfg.maxConcurrentExports) {
+            const cInput = document.getElementById('max-concurrent-exports');
+            if (cInput) cInput.value = cfg.maxConcurrentExports;
+        }
     });
     api.parseStackupXml('stack.xml').then(layers => {
         if (layers && layers.length > 0) {
@@ -182,7 +227,10 @@ window.addEventListener('pywebviewready', function () {
         }
     }).catch(err => {
         // addMessage("Error loading stackup: " + err);
-    });
+    }).then(() => startSync(data => {
+        applyProjectSections(data);
+        renderProject();
+    }));
 });
 
 // Global Error Handler
@@ -0,0 +1,166 @@
+import { state } from './state.js';
+import { api } from './api.js';
+import { addMessage } from './utils.js';
+
+// Pending edits are sent to the Python project model at most this often.
+const SYNC_INTERVAL = 2000;
+
+// JSON of every instance and section as Python last saw it; edits are diffed against it.
+let syncedInstances = new Map();
+let syncedSections = {};
+let instancesDirty = false;
+let suspended = false; // while a project is being loaded
+let timer = null;
+let sending = Promise.resolve(); // the last patch sent to Python
+
+function currentSections() {
+    const wInput = document.getElementById('canvas-width');
+    const hInput = document.getElementById('canvas-height');
+    return {
+        stackup: state.currentStackup,
+        units: state.currentUnits,
+        padstacks: state.padstacks,
+        canvasGridSpacing: state.canvasState.gridSpacing,
+        boardWidth: wInput ? (parseFloat(wInput.value) || 400) : 400,
+        boardHeight: hInput ? (parseFloat(hInput.value) || 200) : 200
+    };
+}
+
+// Called after every change to the placed instances (the placed list is re-rendered for each).
+export function markInstancesDirty() {
+    instancesDirty = true;
+}
+
+// Stops syncing until resetBaseline, e.g. while a project streams in.
+export function suspendSync() {
+    suspended = true;
+}
+
+// The current state is what Python already has (just loaded, recovered or saved).
+export function resetBaseline() {
+    suspended = false;
+    syncedInstances = new Map(state.placedInstances.map(inst => [inst.id, JSON.stringify(inst)]));
+    syncedSections = {};
+    for (const [key, value] of Object.entries(currentSections())) {
+        syncedSections[key] = JSON.stringify(value);
+    }
+    instancesDirty = false;
+}
+
+function diffInstance(previous, inst) {
+    const op = { op: 'update', id: inst.id, set: {}, unset: [], props: {}, unsetProps: [] };
+    for (const [key, value] of Object.entries(inst)) {
+        if (key !== 'properties' && JSON.stringify(value) !== JSON.stringify(previous[key])) op.set[key] = value;
+    }
+    for (const key of Object.keys(previous)) {
+        if (key !== 'properties' && inst[key] === undefined) op.unset.push(key);
+    }
+    const props = inst.properties || {};
+    const previousProps = previous.properties || {};
+    for (const [key, value] of Object.entries(props)) {
+        if (value !== undefined && JSON.stringify(value) !== JSON.stringify(previousProps[key])) op.props[key] = value;
+    }
+    for (const key of Object.keys(previousProps)) {
+        if (props[key] === undefined) op.unsetProps.push(key);
+    }
+    return op;
+}
+
+function collectOps() {
+    const ops = [];
+    for (const [key, value] of Object.entries(currentSections())) {
+        const text = JSON.stringify(value);
+        if (text !== syncedSections[key]) {
+            ops.push({ op: 'section', key, value });
+            syncedSections[key] = text;
+        }
+    }
+    if (!instancesDirty) return ops;
+    instancesDirty = false;
+
+    // Feed paths are not sent: Python computes them when it saves or exports (feed_paths.py).
+    const seen = new Set();
+    for (const inst of state.placedInstances) {
+        seen.add(inst.id);
+        const text = JSON.stringify(inst);
+        const previous = syncedInstances.get(inst.id);
+        if (previous === text) continue;
+        ops.push(previous === undefined ? { op: 'add', instance: inst } : diffInstance(JSON.parse(previous), JSON.parse(text)));
+        syncedInstances.set(inst.id, text);
+    }
+    for (const id of [...syncedInstances.keys()]) {
+        if (!seen.has(id)) {
+            ops.push({ op: 'delete', id });
+            syncedInstances.delete(id);
+        }
+    }
+    return ops;
+}
+
+// Sends pending edits; awaited before Python saves or exports the model.
+// Patches are sent one after another so Python applies them in order.
+export async function flushSync() {
+    if (suspended) return sending;
+    const ops = collectOps();
+    if (ops.length > 0) {
+        sending = sending.then(() => api.syncProject(ops)).catch(err => console.error(err));
+    }
+    return sending;
+}
+
+// Applies a patch made on the Python side (same operations as collectOps sends).
+// Returns the changed sections for the caller to apply to the UI.
+export function applyPatch(ops) {
+    const sections = {};
+    for (const op of ops) {
+        if (op.op === 'section') {
+            sections[op.key] = op.value;
+            syncedSections[op.key] = JSON.stringify(op.value);
+        } else if (op.op === 'add') {
+            const index = state.placedInstances.findIndex(inst => inst.id === op.instance.id);
+            if (index >= 0) state.placedInstances[index] = op.instance;
+            else state.placedInstances.push(op.instance);
+            syncedInstances.set(op.instance.id, JSON.stringify(op.instance));
+        } else if (op.op === 'update') {
+            const inst = state.placedInstances.find(i => i.id === op.id);
+            if (!inst) continue;
+            Object.assign(inst, op.set || {});
+            (op.unset || []).forEach(key => delete inst[key]);
+            if (op.props || op.unsetProps) {
+                inst.properties = { ...(inst.properties || {}), ...(op.props || {}) };
+                (op.unsetProps || []).forEach(key => delete inst.properties[key]);
+            }
+            syncedInstances.set(inst.id, JSON.stringify(inst));
+        } else if (op.op === 'delete') {
+            state.placedInstances = state.placedInstances.filter(inst => inst.id !== op.id);
+            syncedInstances.delete(op.id);
+        }
+    }
+    return sections;
+}
+
+// Offers to restore an untitled session that ended without saving, then starts syncing edits.
+export async function startSync(applyProject) {
+    const recovered = await api.recoverAutosave();
+    let restored = false;
+    if (recovered) {
+        if (confirm('Restore the unsaved project from your last session?')) {
+            applyProject(recovered);
+            addMessage("Restored the unsaved project from the last session.");
+            restored = true;
+        } else {
+            await api.discardAutosave();
+        }
+    }
+    if (restored) {
+        resetBaseline();
+    } else {
+        // An untitled session starts empty on the Python side: its first flush sends everything.
+        syncedInstances = new Map();
+        syncedSections = {};
+        instancesDirty = true;
+    }
+    if (timer === null) {
+        timer = setInterval(flushSync, SYNC_INTERVAL);
+    }
+}
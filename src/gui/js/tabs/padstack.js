@@ -48,6 +48,7 @@ export function addPadstack() {
             dk: 4,
             df: 0.02
         },
+        hdi: defaultHdi(),
         layers: {}
     };
 
@@ -56,6 +57,18 @@ export function addPadstack() {
     renderPadstackTab();
 }
 
+function defaultHdi() {
+    return {
+        enabled: false,
+        topLayers: 1,
+        bottomLayers: 1,
+        laserEntryDiameter: 5,
+        laserTargetDiameter: 4,
+        laserPadSize: 10,
+        laserAntipadSize: 16
+    };
+}
+
 export function deletePadstack() {
     if (state.currentPadstackIndex >= 0 && state.currentPadstackIndex < state.padstacks.length) {
         state.padstacks.splice(state.currentPadstackIndex, 1);
@@ -181,6 +194,63 @@ export function renderPadstackForm() {
         setVal('fill-dk', 4);
         setVal('fill-df', 0.02);
     }
+
+    // HDI Build-up
+    const hdi = p.hdi || defaultHdi();
+    const hdiCheck = document.getElementById('pad-hdi-en');
+    if (hdiCheck) hdiCheck.checked = hdi.enabled;
+    setVal('hdi-top-layers', hdi.topLayers);
+    setVal('hdi-bottom-layers', hdi.bottomLayers);
+    setVal('hdi-entry-diam', hdi.laserEntryDiameter);
+    setVal('hdi-target-diam', hdi.laserTargetDiameter);
+    setVal('hdi-pad-size', hdi.laserPadSize);
+    setVal('hdi-antipad-size', hdi.laserAntipadSize);
+    renderHdiStructure();
+}
+
+function renderHdiStructure() {
+    const p = state.padstacks[state.currentPadstackIndex];
+    const configDiv = document.getElementById('hdi-config');
+    const label = document.getElementById('hdi-structure');
+    const enabled = !!(p && p.hdi && p.hdi.enabled);
+    if (configDiv) {
+        if (enabled) {
+            configDiv.classList.remove('disabled');
+        } else {
+            configDiv.classList.add('disabled');
+        }
+    }
+    if (!label) return;
+    if (!enabled) { label.textContent = ''; return; }
+
+    // Layer pairs between start and stop, counting conductors that are modeled (thickness > 0)
+    const conductors = state.currentStackup
+        .filter(l => l.type === 'Conductor' && (parseFloat(l.thickness) || 0) > 0)
+        .map(l => l.name);
+    const pairs = conductors.indexOf(p.stopLayer) - conductors.indexOf(p.startLayer);
+    const core = pairs - p.hdi.topLayers - p.hdi.bottomLayers;
+    if (core < 0) {
+        label.textContent = `Invalid: only ${Math.max(pairs, 0)} layer pairs`;
+    } else {
+        label.textContent = `${p.hdi.topLayers}+${core > 0 ? core : 0}+${p.hdi.bottomLayers}`;
+    }
+}
+
+export function toggleHdi(enabled) {
+    if (state.currentPadstackIndex === -1) return;
+    const p = state.padstacks[state.currentPadstackIndex];
+    if (!p.hdi) p.hdi = defaultHdi();
+    p.hdi.enabled = enabled;
+    renderHdiStructure();
+}
+
+export function updateHdiProperty(key, value) {
+    if (state.currentPadstackIndex === -1) return;
+    const p = state.padstacks[state.currentPadstackIndex];
+    if (!p.hdi) p.hdi = defaultHdi();
+    value = (key === 'topLayers' || key === 'bottomLayers') ? parseInt(value, 10) : parseFloat(value);
+    p.hdi[key] = value;
+    renderHdiStructure();
 }
 
 
@@ -193,6 +263,7 @@ export function updatePadstackProperty(key, value) {
     p[key] = value;
     if (key === 'name') renderPadstackList();
     if (key === 'stopLayer') validateStubInput();
+    if (key === 'startLayer' || key === 'stopLayer') renderHdiStructure();
 
     // Trigger canvas redraw if available
     if (window.drawPlacementCanvas) window.drawPlacementCanvas();
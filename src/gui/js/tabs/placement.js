@@ -2,6 +2,7 @@
 import { state } from '../state.js';
 import { PlacementCanvas } from '../components/canvas.js';
 import { addMessage, calculateFeedPaths } from '../utils.js';
+import { markInstancesDirty } from '../sync.js';
 
 let canvasInstance = null;
 let clipboardInstance = null;
@@ -238,6 +239,7 @@ export function selectInstance(id) {
 }
 
 export function renderPlacedList() {
+    markInstancesDirty();
     const list = document.getElementById('placed-list');
     if (!list) return;
     list.innerHTML = '';
@@ -1,32 +1,144 @@
-
-import { state } from '../state.js';
 import { api } from '../api.js';
-import { addMessage, calculateFeedPaths } from '../utils.js';
+import { addMessage } from '../utils.js';
+import { flushSync } from '../sync.js';
 
 export async function exportAEDB() {
     const versionInput = document.getElementById('aedb-version');
     const version = versionInput ? versionInput.value : '2024.1';
 
-    const wInput = document.getElementById('canvas-width');
-    const hInput = document.getElementById('canvas-height');
-    const boardW = wInput ? (parseFloat(wInput.value) || 400) : 400;
-    const boardH = hInput ? (parseFloat(hInput.value) || 200) : 200;
+    // Python exports its synced copy of the project; only pending edits cross the bridge.
+    await flushSync();
+
+    addMessage(`Exporting to AEDB version ${version}...`);
+    const jobId = await api.exportAEDB(version);
+    if (jobId) pollExportJobs();
+}
+
+function formatSeconds(seconds) {
+    if (seconds === null || seconds === undefined) return '--';
+    const s = Math.round(seconds);
+    return s >= 60 ? `${Math.floor(s / 60)}m ${s % 60}s` : `${s}s`;
+}
+
+export function updateExportProgress(progress) {
+    const container = document.getElementById('export-progress');
+    const bar = document.getElementById('export-progress-bar');
+    const text = document.getElementById('export-progress-text');
+    if (!container || !bar || !text) return;
+
+    container.classList.remove('hidden');
+    const percent = Math.max(0, Math.min(100, progress.percent || 0));
+    bar.style.width = `${percent}%`;
+    bar.style.backgroundColor = progress.status === 'error' || progress.status === 'cancelled' ? '#c74e39' : '#0e639c';
+
+    if (progress.status === 'running') {
+        text.textContent = `${progress.phase || 'starting'}: ${percent.toFixed(0)}% (ETA ${formatSeconds(progress.eta)})`;
+    } else if (progress.status === 'cancelled') {
+        text.textContent = `Export cancelled during ${progress.phase || 'startup'}`;
+    } else if (progress.status === 'error') {
+        text.textContent = `Export failed during ${progress.phase || 'startup'} after ${formatSeconds(progress.elapsed)}`;
+    } else {
+        text.textContent = `Export finished in ${formatSeconds(progress.elapsed)}`;
+    }
+}
+
+export async function exportAEDBTiled() {
+    const versionInput = document.getElementById('aedb-version');
+    const version = versionInput ? versionInput.value : '2024.1';
+    const sizeInput = document.getElementById('tile-size');
+    const overlapInput = document.getElementById('tile-overlap');
+    const workersInput = document.getElementById('tile-workers');
+    const tileSize = sizeInput ? parseFloat(sizeInput.value) : NaN;
+    const overlap = overlapInput ? (parseFloat(overlapInput.value) || 0) : 0;
+    const workers = workersInput && workersInput.value !== '' ? parseInt(workersInput.value) : null;
+
+    if (isNaN(tileSize) || tileSize <= 0) {
+        addMessage('WARNING: Tile size must be greater than 0.');
+        return;
+    }
+
+    await flushSync();
 
-    const instancesWithPaths = state.placedInstances.map(inst => {
-        const feedPaths = calculateFeedPaths(inst, boardW, boardH);
-        return { ...inst, feedPaths };
+    addMessage(`Exporting to AEDB version ${version} in tiles of ${tileSize} (overlap ${overlap})...`);
+    const jobId = await api.exportAEDBTiled(version, tileSize, overlap, workers);
+    if (jobId) pollExportJobs();
+}
+
+const JOB_POLL_INTERVAL_MS = 1000;
+let jobPollTimer = null;
+
+function renderExportJobs(jobs) {
+    const tbody = document.querySelector('#export-jobs-table tbody');
+    if (!tbody) return;
+    tbody.innerHTML = '';
+    [...jobs].reverse().forEach(job => {
+        const row = document.createElement('tr');
+        const percent = job.progress ? `${Math.round(job.progress.percent || 0)}%` : '';
+        const phase = job.progress && job.status === 'running' ? ` ${job.progress.phase || ''}` : '';
+        const time = job.status === 'queued' ? `waiting ${formatSeconds(job.queuedFor)}` : formatSeconds(job.elapsed);
+        [job.id, job.label, job.error ? `${job.status}: ${job.error}` : job.status, `${percent}${phase}`, time]
+            .forEach(text => {
+                const cell = document.createElement('td');
+                cell.textContent = text;
+                row.appendChild(cell);
+            });
+        const actionCell = document.createElement('td');
+        if (job.status === 'queued' || job.status === 'running') {
+            const button = document.createElement('button');
+            button.textContent = 'Cancel';
+            button.onclick = () => cancelExportJob(job.id);
+            actionCell.appendChild(button);
+        }
+        row.appendChild(actionCell);
+        tbody.appendChild(row);
     });
+}
 
-    const projectData = {
-        stackup: state.currentStackup,
-        units: state.currentUnits,
-        padstacks: state.padstacks,
-        placedInstances: instancesWithPaths,
-        canvasGridSpacing: state.canvasState.gridSpacing,
-        boardWidth: boardW,
-        boardHeight: boardH
-    };
+export async function pollExportJobs() {
+    if (jobPollTimer) {
+        clearTimeout(jobPollTimer);
+        jobPollTimer = null;
+    }
+    const jobs = await api.listExportJobs();
+    renderExportJobs(jobs || []);
+    // Keep polling only while something is queued or running.
+    if ((jobs || []).some(job => job.status === 'queued' || job.status === 'running')) {
+        jobPollTimer = setTimeout(pollExportJobs, JOB_POLL_INTERVAL_MS);
+    }
+}
 
-    addMessage(`Exporting to AEDB version ${version}...`);
-    await api.exportAEDB(projectData, version);
+export async function cancelExportJob(jobId) {
+    await api.cancelExportJob(jobId);
+    pollExportJobs();
+}
+
+export async function saveMaxConcurrentExports(value) {
+    const count = parseInt(value);
+    if (isNaN(count) || count < 1) {
+        addMessage('WARNING: Concurrent exports must be at least 1.');
+        return;
+    }
+    await api.setMaxConcurrentExports(count);
+}
+
+export async function exportCrosstalkProjects() {
+    const radiusInput = document.getElementById('xtalk-radius');
+    const countInput = document.getElementById('xtalk-count');
+    const radius = radiusInput && radiusInput.value !== '' ? parseFloat(radiusInput.value) : null;
+    const k = countInput && countInput.value !== '' ? parseInt(countInput.value) : null;
+
+    if ((radius === null || isNaN(radius)) && (k === null || isNaN(k))) {
+        addMessage('WARNING: Enter a neighbor radius and/or a neighbor count.');
+        return;
+    }
+
+    const dedupeInput = document.getElementById('xtalk-dedupe');
+    const symmetryInput = document.getElementById('xtalk-symmetry');
+    const dedupe = dedupeInput ? dedupeInput.checked : false;
+    const symmetry = symmetryInput ? symmetryInput.value : 'none';
+
+    await flushSync();
+
+    addMessage(`Generating crosstalk sub-projects (radius: ${radius ?? '-'}, k: ${k ?? '-'}${dedupe ? `, unique cells only, symmetry: ${symmetry}` : ''})...`);
+    await api.exportCrosstalkProjects(radius, k, dedupe, symmetry);
 }
@@ -1,29 +1,82 @@
 import { state } from './state.js';
 
-export function addMessage(msg) {
+// Message window: a bounded ring buffer of {t, level, text}, rendered above the selected level.
+const MAX_MESSAGES = 5000;
+const LEVELS = ['debug', 'info', 'warning', 'error'];
+const messages = [];
+let minLevel = 'info';
+
+function messageLevel(msg) {
+    const head = String(msg).trimStart().slice(0, 16).toLowerCase();
+    if (head.startsWith('warning')) return 'warning';
+    if (head.startsWith('error') || head.startsWith('export error') || head.startsWith('traceback')) return 'error';
+    if (head.startsWith('debug')) return 'debug';
+    return 'info';
+}
+
+function isVisible(entry) {
+    return LEVELS.indexOf(entry.level) >= LEVELS.indexOf(minLevel);
+}
+
+function createEntryNode(entry) {
+    const node = document.createElement('div');
+    node.className = entry.level === 'info' ? 'log-entry' : `log-entry log-entry--${entry.level}`;
+    node.textContent = `[${new Date(entry.t).toLocaleTimeString()}] ${entry.text}`;
+    return node;
+}
+
+export function addMessages(entries) {
+    if (!entries || entries.length === 0) return;
+    messages.push(...entries);
+    if (messages.length > MAX_MESSAGES) messages.splice(0, messages.length - MAX_MESSAGES);
+
     const msgBody = document.getElementById('message-body');
     if (!msgBody) return;
-    const entry = document.createElement('div');
-    const isWarning = typeof msg === 'string' && msg.startsWith('WARNING:');
-    entry.className = isWarning ? 'log-entry log-entry--warning' : 'log-entry';
-    entry.textContent = `[${new Date().toLocaleTimeString()}] ${msg}`;
-    msgBody.appendChild(entry);
-    msgBody.scrollTop = msgBody.scrollHeight;
+    const atBottom = msgBody.scrollHeight - msgBody.scrollTop - msgBody.clientHeight < 20;
+    const fragment = document.createDocumentFragment();
+    entries.slice(-MAX_MESSAGES).forEach(entry => {
+        if (isVisible(entry)) fragment.appendChild(createEntryNode(entry));
+    });
+    msgBody.appendChild(fragment);
+    while (msgBody.childElementCount > MAX_MESSAGES) {
+        msgBody.removeChild(msgBody.firstChild);
+    }
+    // Only follow new output when the user has not scrolled up to read.
+    if (atBottom) msgBody.scrollTop = msgBody.scrollHeight;
+}
+
+export function addMessage(msg, level) {
+    addMessages([{ t: Date.now(), level: level || messageLevel(msg), text: String(msg) }]);
 
     if (window.pywebview) {
         console.log(msg);
     }
 }
 
+export function setMessageLevel(level) {
+    if (!LEVELS.includes(level)) return;
+    minLevel = level;
+    const msgBody = document.getElementById('message-body');
+    if (!msgBody) return;
+    msgBody.innerHTML = '';
+    const fragment = document.createDocumentFragment();
+    messages.forEach(entry => {
+        if (isVisible(entry)) fragment.appendChild(createEntryNode(entry));
+    });
+    msgBody.appendChild(fragment);
+    msgBody.scrollTop = msgBody.scrollHeight;
+}
+
 export function clearMessages() {
+    messages.length = 0;
     const msgBody = document.getElementById('message-body');
     if (msgBody) msgBody.innerHTML = '';
 }
 
 export function copyMessages() {
-    const msgBody = document.getElementById('message-body');
-    if (!msgBody) return;
-    const text = msgBody.innerText;
+    const text = messages.filter(isVisible)
+        .map(entry => `[${new Date(entry.t).toLocaleTimeString()}] ${entry.text}`)
+        .join('\n');
     navigator.clipboard.writeText(text).then(() => {
         addMessage("Messages copied to clipboard.");
     }).catch(err => {
@@ -0,0 +1,109 @@
+import math
+
+
+def format_name_token(value):
+    return str(value).replace('.', 'p').replace('-', 'm')
+
+
+def equivalent_diameter(entry_diameter, target_diameter):
+    """Diameter of the straight hole with the same copper volume as a tapered (conical) laser via."""
+    d1 = float(entry_diameter)
+    d2 = float(target_diameter)
+    return round(math.sqrt((d1 * d1 + d1 * d2 + d2 * d2) / 3.0), 6)
+
+
+def modeled_conductors(stackup):
+    """Names of the conductor layers that exist in the EDB stackup, top to bottom."""
+    return [
+        layer['name'] for layer in stackup
+        if layer['type'] == 'Conductor' and float(layer.get('thickness', 0) or 0) > 0
+    ]
+
+
+def buildup_spans(padstack, stackup):
+    """Splits an HDI padstack into its layer spans: N laser vias + core PTH + M laser vias.
+
+    Laser vias connect adjacent conductors of the outer N (top) and M
+    (bottom) layer pairs; the core PTH spans the rest. With N + M equal to
+    the number of layer pairs the via is an any-layer stack with no core.
+    Returns a list of span dicts in the padstack JSON format, top to bottom.
+    """
+    hdi = padstack.get('hdi', {})
+    name = padstack['name']
+    conductors = modeled_conductors(stackup)
+    if padstack['startLayer'] not in conductors or padstack['stopLayer'] not in conductors:
+        raise ValueError(f"Padstack '{name}' HDI start/stop layers must be conductor layers with thickness.")
+
+    start = conductors.index(padstack['startLayer'])
+    stop = conductors.index(padstack['stopLayer'])
+    if stop <= start:
+        raise ValueError(f"Padstack '{name}' HDI stop layer must be below its start layer.")
+    if padstack.get('backdrill', {}).get('enabled'):
+        raise ValueError(f"Padstack '{name}' cannot combine an HDI build-up with backdrill.")
+
+    layers = conductors[start:stop + 1]
+    pairs = len(layers) - 1
+    top = int(hdi.get('topLayers', 1))
+    bottom = int(hdi.get('bottomLayers', 1))
+    if top < 0 or bottom < 0 or top + bottom > pairs:
+        raise ValueError(
+            f"Padstack '{name}' build-up {top}+N+{bottom} does not fit the {pairs} layer pairs "
+            f"between '{padstack['startLayer']}' and '{padstack['stopLayer']}'."
+        )
+
+    entry = hdi.get('laserEntryDiameter', hdi.get('laserTargetDiameter', 4))
+    target = hdi.get('laserTargetDiameter', entry)
+    laser = {
+        'holeDiameter': equivalent_diameter(entry, target),
+        'padSize': hdi.get('laserPadSize', 10),
+        'antipadSize': hdi.get('laserAntipadSize', padstack['antipadSize']),
+        'material': padstack.get('material', 'Copper'),
+        'plating': 100,
+    }
+    core = {
+        'holeDiameter': padstack['holeDiameter'],
+        'padSize': padstack['padSize'],
+        'antipadSize': padstack['antipadSize'],
+        'material': padstack.get('material', 'Copper'),
+        'plating': padstack.get('plating', 100),
+    }
+
+    spans = []
+    for i in range(top):
+        spans.append(dict(laser, startLayer=layers[i], stopLayer=layers[i + 1]))
+    if top + bottom < pairs:
+        spans.append(dict(core, startLayer=layers[top], stopLayer=layers[pairs - bottom]))
+    for i in range(pairs - bottom, pairs):
+        spans.append(dict(laser, startLayer=layers[i], stopLayer=layers[i + 1]))
+    return spans
+
+
+def span_definition_name(span):
+    """Deterministic definition name, so identical spans of different padstacks share one definition."""
+    def number(value):
+        return format_name_token(f"{float(value):g}")
+    return (f"HDI_{span['startLayer']}_{span['stopLayer']}"
+            f"_D{number(span['holeDiameter'])}_P{number(span['padSize'])}_A{number(span['antipadSize'])}"
+            f"_{span['material']}_{number(span['plating'])}")
+
+
+def compile_buildups(padstacks, stackup):
+    """Compiles every HDI padstack into shared span definitions.
+
+    Returns (definitions, spans_by_padstack): definitions maps a definition
+    name to its span dict (one per unique layer span and geometry), and
+    spans_by_padstack maps each HDI padstack name to its definition names,
+    top to bottom.
+    """
+    definitions = {}
+    spans_by_padstack = {}
+    for padstack in padstacks:
+        if not padstack.get('hdi', {}).get('enabled'):
+            continue
+        names = []
+        for span in buildup_spans(padstack, stackup):
+            def_name = span_definition_name(span)
+            definitions.setdefault(def_name, dict(span, name=def_name))
+            names.append(def_name)
+        spans_by_padstack[padstack['name']] = names
+    return definitions, spans_by_padstack
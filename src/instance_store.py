@@ -0,0 +1,99 @@
+import numpy as np
+
+from plan import VIA_TYPES, effective_name, group_id
+
+TYPE_CODES = {via_type: code for code, via_type in enumerate(VIA_TYPES)}
+
+
+class StringTable:
+    """Interned strings: every distinct value is stored once and referenced by its index."""
+    __slots__ = ('values', '_index')
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def intern(self, value):
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.values)
+            self._index[value] = index
+            self.values.append(value)
+        return index
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class InstanceStore:
+    """Columnar storage of the via placements (single, differential, GND) of a flattened project.
+
+    Coordinates, type codes and padstack indices are NumPy columns; names and
+    effective (net) names are interned in string tables. Properties and feed
+    paths are read from the source dicts on demand, and pins are only kept for
+    vias that belong to a component.
+    """
+    def __init__(self, instances, instance_map=None):
+        if instance_map is None:
+            instance_map = {inst['id']: inst for inst in instances}
+        rows = [index for index, inst in enumerate(instances) if inst['type'] in VIA_TYPES]
+        count = len(rows)
+
+        self.source = instances
+        self.source_index = np.asarray(rows, dtype=np.int64)
+        self.x = np.fromiter((instances[i]['x'] for i in rows), dtype=np.float64, count=count)
+        self.y = np.fromiter((instances[i]['y'] for i in rows), dtype=np.float64, count=count)
+        self.type_code = np.fromiter((TYPE_CODES[instances[i]['type']] for i in rows), dtype=np.int8, count=count)
+        self.padstack_index = np.fromiter((instances[i]['padstackIndex'] for i in rows), dtype=np.int32, count=count)
+
+        self.names = StringTable()
+        self.nets = StringTable()
+        self.name_id = np.fromiter((self.names.intern(instances[i]['name']) for i in rows),
+                                   dtype=np.int32, count=count)
+        self.net_id = np.fromiter((self.nets.intern(effective_name(instances[i], instance_map)) for i in rows),
+                                  dtype=np.int32, count=count)
+
+        # Component name ('U1' for 'U1.A1') per name id, None for plain vias.
+        self._component_of_name = [name.split('.')[0] if '.' in name else None for name in self.names.values]
+        self.pins_by_component = {}
+
+    def __len__(self):
+        return len(self.source_index)
+
+    def record(self, row):
+        return self.source[self.source_index[row]]
+
+    def rows(self, via_type=None, only_groups=None, padstack_indices=None):
+        """Row indices filtered by via type, plan group ids and/or padstack indices."""
+        mask = np.ones(len(self), dtype=bool)
+        if via_type is not None:
+            mask &= self.type_code == TYPE_CODES[via_type]
+        if padstack_indices is not None:
+            mask &= np.isin(self.padstack_index, np.asarray(list(padstack_indices), dtype=np.int32))
+        if only_groups is not None:
+            mask &= np.fromiter((group_id(self.record(row)) in only_groups for row in range(len(self))),
+                                dtype=bool, count=len(self))
+        return np.flatnonzero(mask)
+
+    def net_ids(self, via_type, rows=None):
+        """Unique effective-name ids used by vias of a type (optionally within rows)."""
+        selected = self.type_code == TYPE_CODES[via_type]
+        if rows is not None:
+            within = np.zeros(len(self), dtype=bool)
+            within[rows] = True
+            selected &= within
+        return np.unique(self.net_id[selected])
+
+    def add_pin(self, row, pin):
+        """Keeps a placed pin for create_components_from_pins if the via belongs to a component."""
+        component = self._component_of_name[self.name_id[row]]
+        if component is not None:
+            self.pins_by_component.setdefault(component, []).append(pin)
+
+    def nbytes(self):
+        """Bytes held by the NumPy columns."""
+        return sum(column.nbytes for column in (self.source_index, self.x, self.y, self.type_code,
+                                                self.padstack_index, self.name_id, self.net_id))
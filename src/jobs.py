@@ -0,0 +1,212 @@
+import os
+import time
+import signal
+import subprocess
+import itertools
+import threading
+import traceback
+from collections import deque
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Finished jobs kept for status polling.
+MAX_FINISHED_JOBS = 50
+
+
+# Seconds a cancelled process gets to exit before it is killed.
+TERMINATE_TIMEOUT = 5
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's run function once the job was cancelled."""
+
+
+def path_lock_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def process_group_kwargs():
+    """Popen options starting the process in its own group, so cancelling also stops its pool workers."""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def terminate_process_tree(process, timeout=TERMINATE_TIMEOUT):
+    """Asks a process started with process_group_kwargs (and its children) to exit, then kills it."""
+    if process.poll() is not None:
+        return
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)], capture_output=True)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class Job:
+    """One queued export: its run function, the output path it locks and its status for the GUI."""
+    def __init__(self, job_id, kind, label, output_path, run):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.output_path = output_path
+        self.lock_key = path_lock_key(output_path)
+        self._run = run
+        self.status = QUEUED
+        self.progress = None # latest ProgressTracker state
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel_event = threading.Event()
+        self._cancel_hooks = []
+        self._hook_lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def on_cancel(self, hook):
+        """Registers hook() to stop the running work (kill a process); runs at once if already cancelled."""
+        with self._hook_lock:
+            if not self.cancelled:
+                self._cancel_hooks.append(hook)
+                return
+        hook()
+
+    def _cancel(self):
+        with self._hook_lock:
+            self._cancel_event.set()
+            hooks, self._cancel_hooks = self._cancel_hooks, []
+        for hook in hooks:
+            try:
+                hook()
+            except Exception:
+                traceback.print_exc()
+
+    def to_dict(self):
+        now = time.time()
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'label': self.label,
+            'outputPath': self.output_path,
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'queuedFor': round((self.started or now) - self.created, 1),
+            'elapsed': round((self.finished or now) - self.started, 1) if self.started else None,
+        }
+
+
+class JobManager:
+    """Runs export jobs in submission order on at most max_concurrent threads.
+
+    Two jobs writing the same output path never run at the same time: a job
+    whose path is busy waits (later jobs for other paths may start ahead of
+    it). run(job) returns normally on success and raises on failure;
+    on_finish(job) is called after every job.
+    """
+    def __init__(self, max_concurrent=1, on_finish=None):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.on_finish = on_finish
+        self._ids = itertools.count(1)
+        self._queue = deque()
+        self._jobs = {}
+        self._running = set()
+        self._busy_paths = set()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, label, output_path, run):
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", kind, label, output_path, run)
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._schedule()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def set_max_concurrent(self, value):
+        with self._lock:
+            self.max_concurrent = max(1, int(value))
+            self._schedule()
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job; returns False for unknown or finished jobs."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return False
+            if job.status == QUEUED:
+                self._queue.remove(job)
+                job.status = CANCELLED
+                job.finished = time.time()
+                job._cancel_event.set()
+                self._prune()
+                return True
+        # Cancel hooks may wait for a process to exit; keep the caller (the GUI) responsive.
+        threading.Thread(target=job._cancel, daemon=True).start()
+        return True
+
+    def cancel_all(self):
+        for job in list(self._jobs.values()):
+            self.cancel(job.id)
+
+    def _schedule(self):
+        # Called with self._lock held.
+        for job in list(self._queue):
+            if len(self._running) >= self.max_concurrent:
+                break
+            if job.lock_key in self._busy_paths:
+                continue
+            self._queue.remove(job)
+            self._running.add(job.id)
+            self._busy_paths.add(job.lock_key)
+            job.status = RUNNING
+            job.started = time.time()
+            threading.Thread(target=self._execute, args=(job,), name=job.id, daemon=True).start()
+
+    def _execute(self, job):
+        try:
+            job.check_cancelled()
+            job._run(job)
+            status = CANCELLED if job.cancelled else SUCCEEDED
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            status = CANCELLED if job.cancelled else FAILED
+            job.error = f"{type(e).__name__}: {e}"
+        with self._lock:
+            job.status = status
+            job.finished = time.time()
+            self._running.discard(job.id)
+            self._busy_paths.discard(job.lock_key)
+            self._prune()
+            self._schedule()
+        if self.on_finish is not None:
+            self.on_finish(job)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATES]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
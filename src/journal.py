@@ -0,0 +1,251 @@
+import os
+import json
+import threading
+
+# Files next to the project (<name>.journal.jsonl / <name>.autosave.json), or in AUTOSAVE_DIR while untitled.
+JOURNAL_SUFFIX = '.journal.jsonl'
+SNAPSHOT_SUFFIX = '.autosave.json'
+AUTOSAVE_DIR = os.path.join(os.path.expanduser('~'), '.via_wizard', 'autosave')
+UNTITLED_NAME = 'untitled'
+SNAPSHOT_SCHEMA_VERSION = 1
+# The journal is folded into the snapshot in the background after this many operations.
+COMPACT_AFTER_OPS = 500
+
+
+def apply_ops(data, ops):
+    """Applies journal operations to a project dict in place.
+
+    Operations:
+        {'op': 'section', 'key', 'value'}       replaces a top-level section (stackup, units, ...)
+        {'op': 'add', 'instance'}               appends an instance (replaces one with the same id)
+        {'op': 'update', 'id', 'set', 'unset', 'props', 'unsetProps'}
+                                                changes instance fields and properties
+        {'op': 'delete', 'id'}                  removes an instance
+    """
+    instances = data.setdefault('placedInstances', [])
+    index = {inst.get('id'): i for i, inst in enumerate(instances)}
+    deleted = False
+    for op in ops:
+        kind = op.get('op')
+        if kind == 'section':
+            data[op['key']] = op['value']
+            if op['key'] == 'placedInstances':
+                instances = data['placedInstances']
+                index = {inst.get('id'): i for i, inst in enumerate(instances)}
+        elif kind == 'add':
+            inst = op['instance']
+            if inst.get('id') in index:
+                instances[index[inst['id']]] = inst
+            else:
+                index[inst.get('id')] = len(instances)
+                instances.append(inst)
+        elif kind == 'update':
+            i = index.get(op['id'])
+            if i is None:
+                continue
+            # Copied rather than changed in place, so snapshots handed out earlier stay as they were.
+            inst = dict(instances[i])
+            inst.update(op.get('set', {}))
+            for key in op.get('unset', []):
+                inst.pop(key, None)
+            if op.get('props') or op.get('unsetProps'):
+                properties = dict(inst.get('properties') or {})
+                properties.update(op.get('props', {}))
+                for key in op.get('unsetProps', []):
+                    properties.pop(key, None)
+                inst['properties'] = properties
+            instances[i] = inst
+        elif kind == 'delete':
+            i = index.pop(op['id'], None)
+            if i is not None:
+                instances[i] = None
+                deleted = True
+    if deleted:
+        data['placedInstances'] = [inst for inst in instances if inst is not None]
+    return data
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.urandom(16).hex()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ProjectJournal:
+    """Append-only edit journal of one project, with a snapshot it is periodically folded into.
+
+    The snapshot either holds a full project or names the saved project file
+    it starts from (base + its mtime). Every journal line is one operation
+    (see apply_ops) tagged with a sequence number; the snapshot records the
+    last sequence number it includes, so a crash during compaction never
+    loses or replays an edit twice. Autosave cost is one short line per
+    edit; compaction runs on a background thread and publishes the new
+    snapshot and the trimmed journal with atomic renames.
+    """
+    def __init__(self, project_path=None):
+        if project_path:
+            stem = os.path.splitext(project_path)[0]
+        else:
+            os.makedirs(AUTOSAVE_DIR, exist_ok=True)
+            stem = os.path.join(AUTOSAVE_DIR, UNTITLED_NAME)
+        self.project_path = project_path
+        self.journal_path = stem + JOURNAL_SUFFIX
+        self.snapshot_path = stem + SNAPSHOT_SUFFIX
+        self._lock = threading.Lock()
+        self._generation = 0 # bumped by begin/discard, so a running compaction does not resurrect old edits
+        self._pending = 0 # operations appended since the last compaction
+        self._compacting = None
+        ops = self._read_ops()
+        if ops and os.path.getsize(self.journal_path) != self._ops_size(ops):
+            # Drop the torn tail of an append interrupted by a crash before appending after it.
+            self._write_ops(ops)
+        self._seq = max((op['seq'] for op in ops), default=self._snapshot_seq())
+
+    def _snapshot_seq(self):
+        snapshot = _read_json(self.snapshot_path)
+        return snapshot.get('journalSeq', 0) if snapshot else 0
+
+    def _read_ops(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        ops = []
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    break # torn last line of an interrupted append
+        return ops
+
+    @staticmethod
+    def _ops_size(ops):
+        return sum(len((json.dumps(op) + '\n').encode('utf-8')) for op in ops)
+
+    def _write_ops(self, ops):
+        tmp_path = f"{self.journal_path}.{os.urandom(16).hex()}.tmp"
+        with open(tmp_path, 'w') as f:
+            for op in ops:
+                f.write(json.dumps(op) + '\n')
+        os.replace(tmp_path, self.journal_path)
+
+    def begin(self, data=None):
+        """Starts a new journal: from the saved project file (data=None) or from a full project dict."""
+        with self._lock:
+            snapshot = {'schema': SNAPSHOT_SCHEMA_VERSION, 'journalSeq': 0}
+            if data is None:
+                snapshot['base'] = os.path.abspath(self.project_path)
+                snapshot['baseMtime'] = os.path.getmtime(self.project_path)
+            else:
+                snapshot['project'] = data
+            _write_json_atomic(self.snapshot_path, snapshot)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._seq = 0
+            self._pending = 0
+            self._generation += 1
+
+    def append(self, ops):
+        """Appends operations (one JSON line each) and starts a compaction once enough piled up."""
+        if not ops:
+            return
+        with self._lock:
+            if not os.path.exists(self.snapshot_path):
+                _write_json_atomic(self.snapshot_path, {'schema': SNAPSHOT_SCHEMA_VERSION, 'journalSeq': 0,
+                                                        'project': {}})
+            with open(self.journal_path, 'a') as f:
+                for op in ops:
+                    self._seq += 1
+                    f.write(json.dumps(dict(op, seq=self._seq)) + '\n')
+            self._pending += len(ops)
+            start = self._pending >= COMPACT_AFTER_OPS and self._compacting is None
+            if start:
+                self._pending = 0
+                self._compacting = threading.Thread(target=self._compact, name='journal-compaction', daemon=True)
+        if start:
+            self._compacting.start()
+
+    def has_edits(self):
+        return bool(self._read_ops()) or 'project' in (_read_json(self.snapshot_path) or {})
+
+    def is_stale(self):
+        """True if the saved project changed after this journal started from it (e.g. saved elsewhere)."""
+        snapshot = _read_json(self.snapshot_path) or {}
+        base = snapshot.get('base')
+        if base is None:
+            return False
+        return not os.path.exists(base) or os.path.getmtime(base) != snapshot.get('baseMtime')
+
+    def recover(self):
+        """The project with every journaled edit applied, or None if there is nothing to recover."""
+        with self._lock:
+            snapshot = _read_json(self.snapshot_path)
+            ops = self._read_ops()
+        return self._replay(snapshot, ops)
+
+    def _replay(self, snapshot, ops):
+        if snapshot is None:
+            return None
+        if 'project' in snapshot:
+            data = snapshot['project']
+        else:
+            from project_file import load_project_file
+            data = load_project_file(snapshot['base'])
+        after = snapshot.get('journalSeq', 0)
+        return apply_ops(data, [op for op in ops if op['seq'] > after])
+
+    def compact(self):
+        """Folds the journal into a full snapshot (also run automatically in the background)."""
+        with self._lock:
+            generation = self._generation
+            snapshot = _read_json(self.snapshot_path)
+            ops = self._read_ops()
+        if snapshot is None or not ops:
+            return
+        last = ops[-1]['seq']
+        # The slow part (replay and writing the full project) runs without blocking appends.
+        tmp_path = f"{self.snapshot_path}.{os.urandom(16).hex()}.tmp"
+        compacted = {'schema': SNAPSHOT_SCHEMA_VERSION, 'journalSeq': last, 'project': self._replay(snapshot, ops)}
+        # Keep the saved file it started from, so is_stale still notices when that file changes.
+        for key in ('base', 'baseMtime'):
+            if key in snapshot:
+                compacted[key] = snapshot[key]
+        with open(tmp_path, 'w') as f:
+            json.dump(compacted, f)
+        with self._lock:
+            if generation != self._generation:
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self.snapshot_path)
+            # Operations appended while the snapshot was written stay in the journal.
+            self._write_ops([op for op in self._read_ops() if op['seq'] > last])
+
+    def _compact(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"WARNING: Autosave journal compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = None
+
+    def discard(self):
+        with self._lock:
+            for path in (self.journal_path, self.snapshot_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._seq = 0
+            self._pending = 0
+            self._generation += 1
@@ -0,0 +1,79 @@
+import time
+import threading
+from collections import deque
+
+LEVELS = ('debug', 'info', 'warning', 'error')
+# Pending lines are delivered to the GUI at most this often...
+FLUSH_INTERVAL = 0.1
+# ...in evaluate_js calls of at most this many lines.
+MAX_BATCH = 1000
+# Lines waiting for delivery beyond this are dropped (oldest first) and counted.
+MAX_PENDING = 20000
+
+
+def message_level(message):
+    """Log level of a message from its prefix ('WARNING:', 'Error ...', 'DEBUG:'), 'info' otherwise."""
+    head = message.lstrip()[:16].lower()
+    if head.startswith('warning'):
+        return 'warning'
+    if head.startswith('error') or head.startswith('export error') or head.startswith('traceback'):
+        return 'error'
+    if head.startswith('debug'):
+        return 'debug'
+    return 'info'
+
+
+class LogBatcher:
+    """Collects log lines from any thread and delivers them in batches from one background thread.
+
+    deliver(entries) receives lists of {'t': epoch ms, 'level', 'text'}
+    dicts. A burst of output (a verbose export) costs one GUI round-trip per
+    FLUSH_INTERVAL instead of one per line, and memory stays bounded by
+    MAX_PENDING while the GUI is slow to keep up.
+    """
+    def __init__(self, deliver, interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self._deliver = deliver
+        self.interval = interval
+        self._pending = deque()
+        self._max_pending = max_pending
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, text, level=None):
+        entry = {'t': int(time.time() * 1000), 'level': level or message_level(text), 'text': text}
+        with self._lock:
+            if len(self._pending) >= self._max_pending:
+                self._pending.popleft()
+                self._dropped += 1
+            self._pending.append(entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log-batcher', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+            # Lines arriving meanwhile are picked up by the next flush.
+            time.sleep(self.interval)
+
+    def flush(self):
+        """Delivers everything pending now (also called on shutdown)."""
+        with self._flush_lock:
+            with self._lock:
+                entries = list(self._pending)
+                self._pending.clear()
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                entries.insert(0, {'t': int(time.time() * 1000), 'level': 'warning',
+                                   'text': f"WARNING: {dropped} log lines were dropped while the GUI caught up."})
+            for start in range(0, len(entries), MAX_BATCH):
+                try:
+                    self._deliver(entries[start:start + MAX_BATCH])
+                except Exception as e:
+                    print(f"Error delivering log messages: {e}")
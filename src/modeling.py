@@ -1,70 +1,30 @@
 import os
 import sys
-import json
-from pyedb import Edb
 from functools import partial
+from contextlib import contextmanager
 import math
-
-
-def _format_name_token(value):
-    return str(value).replace('.', 'p').replace('-', 'm')
-
-def _compute_surround_centers_and_outward_angles(surround_data: dict, instance_map: dict):
-    """Compute GND via centers and outward angles for a surround_via_array instance.
-    Mirrors the logic in canvas.js getSurroundViaArrayGeometry."""
-    props = surround_data.get('properties', {})
-    r = props.get('gndRadius', 15)
-    n = props.get('gndCount', 3)
-    step = props.get('gndAngleStep', 30)
-
-    diff_pair_id = props.get('connectedDiffPairId')
-    diff_pair = instance_map.get(diff_pair_id) if diff_pair_id else None
-
-    center_x = surround_data['x']
-    center_y = surround_data['y']
-    is_vert = False
-    pitch = 40
-
-    if diff_pair:
-        diff_props = diff_pair.get('properties', {})
-        is_vert = diff_props.get('orientation') == 'vertical'
-        pitch = diff_props.get('pitch', 40)
-        center_x = diff_pair['x']
-        center_y = diff_pair['y']
-
-    dx = 0.0 if is_vert else pitch / 2.0
-    dy = pitch / 2.0 if is_vert else 0.0
-
-    # Build relative-angle list (same algorithm as canvas.js)
-    angles = []
-    if n % 2 != 0:
-        angles.append(0)
-        for i in range(1, (n - 1) // 2 + 1):
-            angles.append(i * step)
-            angles.append(-i * step)
-    else:
-        for i in range(1, n // 2 + 1):
-            a = (2 * i - 1) * step / 2.0
-            angles.append(a)
-            angles.append(-a)
-
-    base1 = 270 if is_vert else 180  # around P1 (negative-side signal via)
-    base2 = 90  if is_vert else 0   # around P2 (positive-side signal via)
-
-    centers = []
-    outward_angles = []
-    for a in angles:
-        rad1 = math.radians(base1 + a)
-        centers.append(((center_x - dx) + r * math.cos(rad1),
-                        (center_y - dy) + r * math.sin(rad1)))
-        outward_angles.append(base1 + a)
-
-        rad2 = math.radians(base2 + a)
-        centers.append(((center_x + dx) + r * math.cos(rad2),
-                        (center_y + dy) + r * math.sin(rad2)))
-        outward_angles.append(base2 + a)
-
-    return centers, outward_angles
+import time
+
+import numpy as np
+
+from artifact_store import ArtifactStore, content_key
+from backends import PyedbBackend, get_backend
+from edb_profiler import CallProfiler, format_summary
+from feed_paths import FeedPathEngine
+from project_stream import load_project_streaming
+from progress import (CACHED_PHASES, FULL_BUILD_PHASES, INCREMENTAL_PHASES, TEMPLATE_BUILD_PHASES, EventEmitter,
+                      PhaseProgress)
+from geometry import surround_centers_and_outward_angles
+from hdi import compile_buildups
+from instance_store import TYPE_CODES, InstanceStore
+from plan import (HFSS_SETUP_PROFILE, VIA_TYPES, ObjectRecorder, compile_plan, definitions_fingerprint, diff_plans,
+                  group_id, load_plan, plan_path_for, save_plan)
+from stackup import build_augmented_stackup
+
+# Bump when the template build (setup, stackup, padstacks) changes, to invalidate cached templates.
+TEMPLATE_SCHEMA_VERSION = 1
+# Bump when the modeled AEDB for the same input changes, to invalidate cached exports.
+EXPORT_SCHEMA_VERSION = 1
 
 
 class PadstackConfig:
@@ -102,6 +62,7 @@ class PadstackConfig:
         self.fill_start_layer = None
         self.fill_stop_layer = self.stop_layer
         self.dummy_layer_name = None
+        self.spans = [] # Shared HDI span definition names, top to bottom (empty for a plain via)
 
     def apply_modeling(self, modeling: dict | None):
         if not modeling:
@@ -138,34 +99,59 @@ class PadstackConfig:
         
 # --- 2. ViaInstance Class ---
 class ViaInstance:
-    """Represents a placed Via instance from the JSON data."""
-    def __init__(self, data_dict: dict, padstack_config: PadstackConfig, units: str, to_mil_func, instance_map: dict = None):
-        self._data = data_dict
-        self._instance_map = instance_map or {}
-        self.id = data_dict.get("id")
-        self.name = data_dict["name"]
-        self.type = data_dict['type']
-        self.x = data_dict["x"]
-        self.y = data_dict["y"]
-        self.properties = data_dict.get('properties', {})
-        self.feed_paths = data_dict.get('feedPaths', {})
-        self.padstack_name = padstack_config.name
-        self.antipad_value = padstack_config.antipad_value
+    """Lightweight view of one placed via (a row of an InstanceStore) with its EDB creation logic."""
+    __slots__ = ('_store', 'row', 'padstack', '_units', '_to_mil')
+
+    def __init__(self, store: InstanceStore, row: int, padstack_config: PadstackConfig, units: str, to_mil_func):
+        self._store = store
+        self.row = row
+        self.padstack = padstack_config
         self._units = units
         self._to_mil = to_mil_func
-        self.padstack = padstack_config
-        self.placed_pins = []
+
+    @property
+    def id(self):
+        return self._store.record(self.row).get("id")
+
+    @property
+    def name(self):
+        return self._store.names[self._store.name_id[self.row]]
+
+    @property
+    def type(self):
+        return VIA_TYPES[self._store.type_code[self.row]]
+
+    @property
+    def group_id(self):
+        return group_id(self._store.record(self.row))
+
+    @property
+    def x(self):
+        return float(self._store.x[self.row])
+
+    @property
+    def y(self):
+        return float(self._store.y[self.row])
+
+    @property
+    def properties(self):
+        return self._store.record(self.row).get('properties', {})
+
+    @property
+    def feed_paths(self):
+        return self._store.record(self.row).get('feedPaths', {})
+
+    @property
+    def padstack_name(self):
+        return self.padstack.name
+
+    @property
+    def antipad_value(self):
+        return self.padstack.antipad_value
 
     def get_effective_name(self):
-        """Recursively finds the root parent's name if connected, otherwise returns its own name."""
-        connected_id = self.properties.get('connectedDiffPairId')
-        if connected_id and self._instance_map and connected_id in self._instance_map:
-            parent_data = self._instance_map[connected_id]
-            # Create a temporary ViaInstance to recurse
-            # (In a real scenario we might want a more efficient lookup)
-            parent_via = ViaInstance(parent_data, self.padstack, self._units, self._to_mil, self._instance_map)
-            return parent_via.get_effective_name()
-        return self.name
+        """Name of the root diff pair this via is connected to, otherwise its own name (resolved once by the store)."""
+        return self._store.nets[self._store.net_id[self.row]]
 
     def _get_feed_points(self, path_data):
         """Converts path coordinates to unit strings."""
@@ -175,21 +161,30 @@ class ViaInstance:
         """Gets feed width as a string with units."""
         return f"{self.properties[key]}{self._units}"
 
+    def _place_padstack(self, edb_padstacks, location, net_name, start_layer, stop_layer):
+        """Places the padstack, or every span of an HDI build-up, and returns the pin instance."""
+        if self.padstack.spans:
+            # Only the top span is a pin; the stacked spans below share its net.
+            placed = [edb_padstacks.place(location, span_name, net_name, is_pin=(i == 0))
+                      for i, span_name in enumerate(self.padstack.spans)]
+            return placed[0]
+        via = edb_padstacks.place(location, self.padstack_name, net_name, is_pin=True)
+        via.start_layer = start_layer
+        via.stop_layer = stop_layer
+        return via
+
     def place_via(self, edb_padstacks):
         """Places the via instance(s) in the EDB project based on its type."""
         center = self._to_mil(self.x, self.y)
         eff_name = self.get_effective_name()
         
         if self.type == 'gnd':
-            via = edb_padstacks.place(center, self.padstack_name, 'GND', is_pin=True)
-            via.start_layer = self.padstack.start_layer
-            via.stop_layer = self.padstack.stop_layer
-            self.placed_pins.append(via)
+            via = self._place_padstack(edb_padstacks, center, 'GND', self.padstack.start_layer, self.padstack.stop_layer)
+            self._store.add_pin(self.row, via)
         elif self.type == 'single':
-            via = edb_padstacks.place(center, self.padstack_name, 'net_'+eff_name, is_pin=True)
-            via.start_layer = self.padstack.signal_start_layer
-            via.stop_layer = self.padstack.signal_stop_layer
-            self.placed_pins.append(via)
+            via = self._place_padstack(edb_padstacks, center, 'net_'+eff_name,
+                                       self.padstack.signal_start_layer, self.padstack.signal_stop_layer)
+            self._store.add_pin(self.row, via)
             if self.padstack.bd_enabled and self.padstack.signal_backdrill_to_layer:
                 via.set_backdrill_bottom(self.padstack.signal_backdrill_to_layer, self.padstack.bd_diameter, 0.0)
 
@@ -203,16 +198,13 @@ class ViaInstance:
             else: # horizontal
                 n_loc = self._to_mil(self.x + pitch / 2, self.y)
                 p_loc = self._to_mil(self.x - pitch / 2, self.y)
-            via_p = edb_padstacks.place(p_loc, self.padstack_name, 'netp_'+eff_name, is_pin=True)
-            via_n = edb_padstacks.place(n_loc, self.padstack_name, 'netn_'+eff_name, is_pin=True)
-
-            via_p.start_layer = self.padstack.signal_start_layer
-            via_p.stop_layer = self.padstack.signal_stop_layer
-            via_n.start_layer = self.padstack.signal_start_layer
-            via_n.stop_layer = self.padstack.signal_stop_layer
+            via_p = self._place_padstack(edb_padstacks, p_loc, 'netp_'+eff_name,
+                                         self.padstack.signal_start_layer, self.padstack.signal_stop_layer)
+            via_n = self._place_padstack(edb_padstacks, n_loc, 'netn_'+eff_name,
+                                         self.padstack.signal_start_layer, self.padstack.signal_stop_layer)
 
-            self.placed_pins.append(via_p)
-            self.placed_pins.append(via_n)
+            self._store.add_pin(self.row, via_p)
+            self._store.add_pin(self.row, via_n)
             if self.padstack.bd_enabled and self.padstack.signal_backdrill_to_layer:
                 via_p.set_backdrill_bottom(self.padstack.signal_backdrill_to_layer, self.padstack.bd_diameter, 0.0)
                 via_n.set_backdrill_bottom(self.padstack.signal_backdrill_to_layer, self.padstack.bd_diameter, 0.0)
@@ -413,8 +405,8 @@ class DogBoneFeed:
         pad_name = f"dogbone_{diam_val}{self.units}"
         
         # Create Padstack Definition if needed
-        if pad_name not in edb_project.edb.padstacks.definitions:
-            edb_project.edb.padstacks.create(
+        if pad_name not in edb_project.padstacks.definitions:
+            edb_project.padstacks.create(
                 padstackname=pad_name,
                 holediam="0",
                 paddiam=f"{diam_val}{self.units}",
@@ -460,19 +452,19 @@ class DogBoneFeed:
             
             # Create Traces
             pts_p = [self._to_mil(pos_x_start, pos_y_start), self._to_mil(pos_x_end, pos_y_end)]
-            edb_project.edb.modeler.create_trace(pts_p, top_signal_layer, width, net_name=f"netn_{self.parent['name']}", end_cap_style="Round")
+            edb_project.modeler.create_trace(pts_p, top_signal_layer, width, net_name=f"netn_{self.parent['name']}", end_cap_style="Round")
             
             pts_n = [self._to_mil(neg_x_start, neg_y_start), self._to_mil(neg_x_end, neg_y_end)]
-            edb_project.edb.modeler.create_trace(pts_n, top_signal_layer, width, net_name=f"netp_{self.parent['name']}", end_cap_style="Round")
+            edb_project.modeler.create_trace(pts_n, top_signal_layer, width, net_name=f"netp_{self.parent['name']}", end_cap_style="Round")
             
             # Place Pads
-            pos_pad = edb_project.edb.padstacks.place(
+            pos_pad = edb_project.padstacks.place(
                 self._to_mil(pos_x_end, pos_y_end), pad_name, f"netn_{self.parent['name']}", is_pin=True
             )
             pos_pad.start_layer = top_signal_layer
             pos_pad.stop_layer = top_signal_layer
 
-            neg_pad = edb_project.edb.padstacks.place(
+            neg_pad = edb_project.padstacks.place(
                 self._to_mil(neg_x_end, neg_y_end), pad_name, f"netp_{self.parent['name']}", is_pin=True
             )
             neg_pad.start_layer = top_signal_layer
@@ -480,20 +472,20 @@ class DogBoneFeed:
             
             # Create Voids
             if void_val > 0 and ref_rect:
-                void_p = edb_project.edb.modeler.create_circle(
+                void_p = edb_project.modeler.create_circle(
                     top_ref_layer, self._to_mil(pos_x_end, pos_y_end)[0], self._to_mil(pos_x_end, pos_y_end)[1], radius, net_name="GND"
                 )
-                edb_project.edb.modeler.add_void(ref_rect, void_p)
+                edb_project.modeler.add_void(ref_rect, void_p)
                 
-                void_n = edb_project.edb.modeler.create_circle(
+                void_n = edb_project.modeler.create_circle(
                     top_ref_layer, self._to_mil(neg_x_end, neg_y_end)[0], self._to_mil(neg_x_end, neg_y_end)[1], radius, net_name="GND"
                 )
-                edb_project.edb.modeler.add_void(ref_rect, void_n)
+                edb_project.modeler.add_void(ref_rect, void_n)
 
         elif parent_type == 'surround_via_array':
             # --- Surround GND Array Logic ---
             # Compute GND via center positions and default outward angles
-            centers, outward_angles = _compute_surround_centers_and_outward_angles(
+            centers, outward_angles = surround_centers_and_outward_angles(
                 self.parent, edb_project.instance_map
             )
             gnd_angles = self.properties.get('gndAngles', [])
@@ -515,12 +507,12 @@ class DogBoneFeed:
 
                 # Trace from GND via center to end point
                 pts = [self._to_mil(cx, cy), self._to_mil(end_x, end_y)]
-                edb_project.edb.modeler.create_trace(
+                edb_project.modeler.create_trace(
                     pts, top_signal_layer, width, net_name='GND', end_cap_style='Round'
                 )
 
                 # End-pad
-                end_pad = edb_project.edb.padstacks.place(
+                end_pad = edb_project.padstacks.place(
                     self._to_mil(end_x, end_y), pad_name, 'GND', is_pin=True
                 )
                 end_pad.start_layer = top_signal_layer
@@ -528,13 +520,13 @@ class DogBoneFeed:
 
                 # Void on reference plane
                 if void_val > 0 and ref_rect:
-                    void_c = edb_project.edb.modeler.create_circle(
+                    void_c = edb_project.modeler.create_circle(
                         top_ref_layer,
                         self._to_mil(end_x, end_y)[0],
                         self._to_mil(end_x, end_y)[1],
                         radius, net_name='GND'
                     )
-                    edb_project.edb.modeler.add_void(ref_rect, void_c)
+                    edb_project.modeler.add_void(ref_rect, void_c)
 
         else:
             # --- Single / GND Logic ---
@@ -557,37 +549,86 @@ class DogBoneFeed:
             
             # Create Trace
             pts = [self._to_mil(start_x, start_y), self._to_mil(end_x, end_y)]
-            edb_project.edb.modeler.create_trace(pts, top_signal_layer, width, net_name=net_name, end_cap_style="Round")
+            edb_project.modeler.create_trace(pts, top_signal_layer, width, net_name=net_name, end_cap_style="Round")
             
             # Place Pad
-            end_pad = edb_project.edb.padstacks.place(self._to_mil(end_x, end_y), pad_name, net_name, is_pin=True)
+            end_pad = edb_project.padstacks.place(self._to_mil(end_x, end_y), pad_name, net_name, is_pin=True)
             end_pad.start_layer = top_signal_layer
             end_pad.stop_layer = top_signal_layer
             
             # Create Void
             if void_val > 0 and ref_rect:
-                void = edb_project.edb.modeler.create_circle(
+                void = edb_project.modeler.create_circle(
                     top_ref_layer, self._to_mil(end_x, end_y)[0], self._to_mil(end_x, end_y)[1], radius, net_name="GND"
                 )
-                edb_project.edb.modeler.add_void(ref_rect, void)
+                edb_project.modeler.add_void(ref_rect, void)
 
 # --- 3. EdbProject Class (Facade/Controller) ---
 class EdbProject:
     """Manages the creation and configuration of the EDB project."""
-    def __init__(self, json_path, aedb_version):
+    def __init__(self, json_path, aedb_version, template_store: ArtifactStore = None, backend=None,
+                 profiler: CallProfiler = None, events: EventEmitter = None,
+                 export_store: ArtifactStore = None, link_cached=False, data=None):
         self.aedb_path = os.path.splitext(json_path)[0] + '.aedb'
-        self.edb = Edb(version=aedb_version)
-        self.data = self._load_json(json_path)
+        self.aedb_version = aedb_version
+        self.template_store = template_store
+        self.export_store = export_store # Finished AEDBs by export_key, reused for identical input
+        self.link_cached = link_cached # Hard-link cached exports instead of copying them
+        self.backend = backend or PyedbBackend() # Creates/opens EDB sessions (pyedb or the offline recorder)
+        self.profiler = profiler # Optional CallProfiler timing every EDB API call
+        self.events = events # Optional EventEmitter writing JSON phase events to stdout
+        # The EDB session is opened in run_modeling: new, on a cached template or on the previous export.
+        self.edb = None
+        self.modeler = None
+        self.padstacks = None
+        # data is the already-parsed project when the caller has it (e.g. from shared memory).
+        self.data = data if data is not None else self._load_json(json_path)
+        # Projects written without the GUI (scripts, batch runs) get their feed paths computed here.
+        self.data = FeedPathEngine().fill(self.data, missing_only=True)
         self.units = self.data['units']
         self.stackup_layers, self.padstack_modeling = self._build_augmented_stackup()
         self.layer_rects = {} # Stores EDB object references for reference planes (for voids)
         self.padstack_configs = {} # Stores PadstackConfig objects by name
-        self.via_instances = [] # Stores ViaInstance objects
+        self.span_configs = {} # Shared HDI span definitions by name
+        self.instance_store = None # Columnar via placements, built in process_via_instances
+        self.plan = compile_plan(self.data, aedb_version)
+        self.plan_path = plan_path_for(self.aedb_path)
+        self.recorder = ObjectRecorder() # EDB object ids created per plan group
+
+    def _open_edb(self, edbpath=None):
+        """Opens a new (or existing) EDB and binds the recording modeler/padstack proxies."""
+        if edbpath is None:
+            self.edb = self.backend.new(self.aedb_version)
+        else:
+            self.edb = self.backend.open(edbpath, self.aedb_version)
+        if self.profiler is not None:
+            self.edb = self.profiler.wrap_edb(self.edb)
+        self.modeler = self.recorder.wrap(self.edb.modeler, {
+            'create_trace': 'primitives',
+            'create_rectangle': 'primitives',
+            'create_circle': 'primitives',
+        })
+        self.padstacks = self.recorder.wrap(self.edb.padstacks, {'place': 'padstackInstances'})
+
+    @contextmanager
+    def stage(self, name, total=1):
+        """Runs a modeling phase: emits start/progress/end events and attributes EDB calls to it."""
+        phase = PhaseProgress(self.events, name, total)
+        if self.events is not None:
+            self.events.phase_start(phase)
+        start = time.perf_counter()
+        if self.profiler is None:
+            yield phase
+        else:
+            with self.profiler.stage(name):
+                yield phase
+        phase.done = phase.total
+        if self.events is not None:
+            self.events.phase_end(phase, time.perf_counter() - start)
 
     def _load_json(self, json_path):
-        """Loads and returns the project JSON data."""
-        with open(json_path, 'r') as f:
-            return json.load(f)
+        """Loads and returns the project JSON data, without holding the whole file text in memory."""
+        return load_project_streaming(json_path)
 
     def _to_mil(self, x, y):
         """Helper to format coordinates with units."""
@@ -595,176 +636,28 @@ class EdbProject:
 
     def _create_trace_partial(self, points, layer, width, name):
         """Wrapper for EDB trace creation with fixed end_cap_style."""
-        return self.edb.modeler.create_trace(points, layer, width, end_cap_style="Flat", net_name=name)
+        return self.modeler.create_trace(points, layer, width, end_cap_style="Flat", net_name=name)
 
     def _build_augmented_stackup(self):
-        base_stackup = self.data['stackup']
-        layer_index = {layer['name']: idx for idx, layer in enumerate(base_stackup)}
-        padstack_modeling = {
-            padstack['name']: {
-                'signal_stop_layer': padstack['stopLayer'],
-                'signal_backdrill_to_layer': None,
-                'fill_start_layer': None,
-                'fill_stop_layer': padstack['stopLayer'],
-                'dummy_layer_name': None,
-            }
-            for padstack in self.data['padstacks']
-        }
-        split_points = {}
-        dummy_name_by_key = {}
-
-        for padstack in self.data['padstacks']:
-            backdrill = padstack.get('backdrill', {})
-            if not backdrill.get('enabled'):
-                continue
-
-            if backdrill.get('mode', 'layer') != 'layer':
-                raise ValueError(f"Padstack '{padstack['name']}' uses unsupported backdrill mode '{backdrill.get('mode')}'.")
-
-            stop_layer_name = backdrill.get('toLayer')
-            if not stop_layer_name:
-                raise ValueError(f"Padstack '{padstack['name']}' has backdrill enabled without a stop layer.")
-
-            stop_index = layer_index.get(stop_layer_name)
-            if stop_index is None:
-                raise ValueError(f"Padstack '{padstack['name']}' references unknown backdrill stop layer '{stop_layer_name}'.")
-
-            via_stop_index = layer_index.get(padstack['stopLayer'])
-            if via_stop_index is None:
-                raise ValueError(f"Padstack '{padstack['name']}' references unknown stop layer '{padstack['stopLayer']}'.")
-            if via_stop_index <= stop_index:
-                raise ValueError(
-                    f"Padstack '{padstack['name']}' stop layer '{padstack['stopLayer']}' must be below backdrill stop layer '{stop_layer_name}'."
-                )
-
-            stop_layer = base_stackup[stop_index]
-            if stop_layer['type'] != 'Conductor':
-                raise ValueError(f"Backdrill stop layer '{stop_layer_name}' for padstack '{padstack['name']}' must be a conductor layer.")
-
-            stub_length = float(backdrill.get('stub', 0) or 0)
-            dielectric_layer, offset_in_dielectric, available_stub = self._resolve_dummy_layer_position(
-                base_stackup,
-                stop_index,
-                via_stop_index,
-                stub_length,
-                padstack['name'],
-            )
-
-            dummy_key = (dielectric_layer['name'], round(offset_in_dielectric, 9))
-            dummy_layer_name = dummy_name_by_key.get(dummy_key)
-            if not dummy_layer_name:
-                dummy_layer_name = f"{stop_layer_name}_stub_{_format_name_token(stub_length)}"
-                dummy_name_by_key[dummy_key] = dummy_layer_name
-                split_points.setdefault(dielectric_layer['name'], []).append(
-                    {
-                        'offset': offset_in_dielectric,
-                        'dummy_layer_name': dummy_layer_name,
-                    }
-                )
-
-            padstack_modeling[padstack['name']] = {
-                'signal_stop_layer': padstack['stopLayer'],
-                'signal_backdrill_to_layer': dummy_layer_name,
-                'fill_start_layer': dummy_layer_name,
-                'fill_stop_layer': padstack['stopLayer'],
-                'dummy_layer_name': dummy_layer_name,
-            }
-
-        augmented_stackup = []
-        for layer in base_stackup:
-            entries = sorted(split_points.get(layer['name'], []), key=lambda item: item['offset'])
-            if not entries:
-                augmented_stackup.append(dict(layer))
-                continue
-
-            previous_offset = 0.0
-            segment_index = 1
-            layer_thickness = float(layer.get('thickness', 0) or 0)
-            for entry in entries:
-                segment_thickness = entry['offset'] - previous_offset
-                if segment_thickness > 0:
-                    augmented_stackup.append(self._make_split_dielectric_layer(layer, segment_index, segment_thickness))
-                    segment_index += 1
-
-                augmented_stackup.append(self._make_dummy_layer(layer, entry['dummy_layer_name']))
-                previous_offset = entry['offset']
-
-            remaining_thickness = layer_thickness - previous_offset
-            if remaining_thickness > 0:
-                augmented_stackup.append(self._make_split_dielectric_layer(layer, segment_index, remaining_thickness))
-
-        return augmented_stackup, padstack_modeling
-
-    def _resolve_dummy_layer_position(self, stackup, backdrill_stop_index, via_stop_index, stub_length, padstack_name):
-        if stub_length < 0:
-            raise ValueError(f"Padstack '{padstack_name}' stub length {stub_length}{self.units} is invalid.")
-
-        remaining_stub = stub_length
-        total_thickness = 0.0
-
-        for candidate_index in range(backdrill_stop_index + 1, via_stop_index):
-            candidate = stackup[candidate_index]
-            candidate_thickness = float(candidate.get('thickness', 0) or 0)
-            if candidate_thickness == 0:
-                continue
-
-            total_thickness += candidate_thickness
-
-            if remaining_stub <= candidate_thickness:
-                if candidate['type'] == 'Conductor':
-                    print(
-                        f"WARNING: Padstack '{padstack_name}' stub end ({stub_length}{self.units}) falls inside "
-                        f"conductor layer '{candidate['name']}'. Snapping dummy layer to bottom of '{candidate['name']}'."
-                    )
-                    for next_index in range(candidate_index + 1, via_stop_index):
-                        next_layer = stackup[next_index]
-                        next_thickness = float(next_layer.get('thickness', 0) or 0)
-                        if next_thickness == 0:
-                            continue
-                        if next_layer['type'] == 'Dielectric':
-                            return next_layer, 0.0, total_thickness
-                    raise ValueError(
-                        f"Padstack '{padstack_name}' stub length {stub_length}{self.units} lands in conductor layer "
-                        f"'{candidate['name']}' with no dielectric layer below it before the via stop layer."
-                    )
-                return candidate, remaining_stub, total_thickness
-
-            remaining_stub -= candidate_thickness
-
-        raise ValueError(
-            f"Padstack '{padstack_name}' stub length {stub_length}{self.units} exceeds total layer thickness "
-            f"{round(total_thickness, 6)}{self.units} between '{stackup[backdrill_stop_index]['name']}' and '{stackup[via_stop_index]['name']}'."
-        )
-
-    def _make_split_dielectric_layer(self, base_layer, segment_index, thickness):
-        layer = dict(base_layer)
-        layer['name'] = f"{base_layer['name']}__seg{segment_index}"
-        layer['thickness'] = thickness
-        return layer
-
-    def _make_dummy_layer(self, dielectric_layer, dummy_layer_name):
-        layer = dict(dielectric_layer)
-        layer['name'] = dummy_layer_name
-        layer['thickness'] = 0
-        layer['generatedDummy'] = True
-        layer['isDummySignalLayer'] = True
-        return layer
+        return build_augmented_stackup(self.data['stackup'], self.data['padstacks'], self.units)
 
     def setup_analysis(self):
         """Sets up the HFSS extent and solution setup."""
+        profile = HFSS_SETUP_PROFILE
+
         # Extent Info
-        self.edb.core_hfss.hfss_extent_info.air_box_positive_vertical_extent = 0.5
-        self.edb.core_hfss.hfss_extent_info.air_box_negative_vertical_extent = 0.5
+        self.edb.core_hfss.hfss_extent_info.air_box_positive_vertical_extent = profile['air_box_positive_vertical_extent']
+        self.edb.core_hfss.hfss_extent_info.air_box_negative_vertical_extent = profile['air_box_negative_vertical_extent']
         
         # Setup and Sweep
         setup = self.edb.create_hfss_setup("hfss_setup")
-        setup.via_settings.via_num_sides = 12
-        setup.set_solution_single_frequency(frequency='2GHz', max_num_passes=20, max_delta_s=0.01)
-
-        frequency_range = [["linear count", "0Hz", "0Hz", 1],
-                           ["log scale", "1Hz", "50MHz", 50],
-                           ["linear scale", "50MHz", "10GHz", '50MHz']]
-        setup.add_sweep('sweep', frequency_set=frequency_range)
+        setup.via_settings.via_num_sides = profile['via_num_sides']
+        setup.set_solution_single_frequency(
+            frequency=profile['solution_frequency'],
+            max_num_passes=profile['max_num_passes'],
+            max_delta_s=profile['max_delta_s'],
+        )
+        setup.add_sweep('sweep', frequency_set=profile['frequency_range'])
 
     def create_stackup(self):
         """Creates layers, materials, and reference ground planes."""
@@ -807,15 +700,100 @@ class EdbProject:
                 )
                 self.layer_rects[layer['name']] = rect
 
-    def create_padstacks(self):
-        """Creates padstack definitions and stores them in a dictionary."""
+    def _build_padstack_configs(self):
+        """Builds PadstackConfig objects (without touching EDB) and stores them by name."""
+        span_definitions, spans_by_padstack = compile_buildups(self.data['padstacks'], self.data['stackup'])
+        self.span_configs = {name: PadstackConfig(span, self.units) for name, span in span_definitions.items()}
         for padstack_data in self.data['padstacks']:
             config = PadstackConfig(padstack_data, self.units)
             config.apply_modeling(self.padstack_modeling.get(config.name))
-            config.create_in_edb(self.edb.padstacks)
-
+            config.spans = spans_by_padstack.get(config.name, [])
             self.padstack_configs[config.name] = config
 
+    def create_padstacks(self):
+        """Creates padstack definitions and stores them in a dictionary.
+
+        HDI padstacks get no definition of their own: their spans are created
+        once each and shared by every HDI padstack and placement using them.
+        """
+        self._build_padstack_configs()
+        for config in self.padstack_configs.values():
+            if not config.spans:
+                config.create_in_edb(self.edb.padstacks)
+        for config in self.span_configs.values():
+            config.create_in_edb(self.edb.padstacks)
+        if self.span_configs:
+            print(f"Created {len(self.span_configs)} shared HDI span definitions.")
+
+    def template_key(self):
+        """Hash of everything the template AEDB (setup, stackup, reference planes, padstacks) depends on."""
+        return content_key(TEMPLATE_SCHEMA_VERSION, self.backend.name, definitions_fingerprint(self.data, self.aedb_version))
+
+    def prepare_from_template(self):
+        """Opens aedb_path on a cached template, building and caching the template on a miss."""
+        key = self.template_key()
+        if self.template_store.fetch(key, self.aedb_path):
+            print(f"Template cache hit ({key[:12]}): reusing setup, stackup and padstack definitions.")
+            metadata = self.template_store.metadata(key)
+        else:
+            print(f"Template cache miss ({key[:12]}): building setup, stackup and padstack definitions.")
+            self._open_edb()
+            self.setup_analysis()
+            self.create_stackup()
+            self.create_padstacks()
+            metadata = {'layer_rects': {layer: rect.id for layer, rect in self.layer_rects.items()}}
+            self.edb.save_edb_as(self.aedb_path)
+            self.edb.close_edb()
+            try:
+                self.template_store.store(key, self.aedb_path, metadata)
+            except OSError as e:
+                # The AEDB is built already; only the cache entry is lost.
+                print(f"WARNING: Could not add the template to the cache: {e}")
+
+        self._open_edb(self.aedb_path)
+        self._restore_template_state(metadata)
+
+    def export_key(self):
+        """Hash of everything the finished AEDB depends on: the flattened project, backend and AEDB version."""
+        return content_key(EXPORT_SCHEMA_VERSION, self.backend.name, self.aedb_version, self.data)
+
+    def restore_from_cache(self):
+        """Replaces aedb_path (and its plan) with a cached export of identical input. Returns False on a miss."""
+        key = self.export_key()
+        metadata = self.export_store.metadata(key)
+        if metadata is None or 'plan' not in metadata:
+            print(f"Export cache miss ({key[:12]}).")
+            return False
+        self._run_start('cached', CACHED_PHASES)
+        with self.stage('cache'):
+            if not self.export_store.fetch(key, self.aedb_path, verify=True, link=self.link_cached):
+                return False
+            save_plan(self.plan_path, metadata['plan'])
+        print(f"Export cache hit ({key[:12]}): reused the AEDB of an identical earlier export.")
+        return True
+
+    def store_in_cache(self):
+        """Adds the finished aedb_path to the export cache; a failure only costs the cache entry."""
+        key = self.export_key()
+        if self.export_store.has(key):
+            return
+        try:
+            self.export_store.store(key, self.aedb_path, {'plan': load_plan(self.plan_path)})
+        except OSError as e:
+            print(f"WARNING: Could not add the export to the cache: {e}")
+
+    def _restore_template_state(self, metadata):
+        """Re-binds reference plane primitives and padstack configs after opening a template."""
+        self.layer_rects = {}
+        self.padstack_configs = {}
+        primitives_by_layer = self.edb.modeler.primitives_by_layer
+        for layer, rect_id in metadata.get('layer_rects', {}).items():
+            rect = next((prim for prim in primitives_by_layer.get(layer, []) if prim.id == rect_id), None)
+            if rect is None:
+                raise RuntimeError(f"Template is missing the reference plane on layer '{layer}'.")
+            self.layer_rects[layer] = rect
+        self._build_padstack_configs()
+
     def create_fill_padstacks(self):
         """Creates deferred fill padstack definitions after signal instances are placed."""
         for config in self.padstack_configs.values():
@@ -837,71 +815,87 @@ class EdbProject:
             self.edb.padstacks.definitions[fill_padstack_name].material = fill_mat_name
             self.edb.padstacks.definitions[fill_padstack_name].hole_plating_ratio = 100
 
-    def process_via_instances(self):
-        """Creates via objects, processes voids, places vias, and creates ports/traces."""
+    def process_via_instances(self, only_groups=None):
+        """Creates via objects, processes voids, places vias, and creates ports/traces.
+
+        All via stages run over the columnar InstanceStore; ViaInstance views
+        are created per row and not kept. only_groups limits the work to the
+        given plan group ids (incremental update); fill padstack definitions
+        and components are then left as is.
+        """
         padstack_list = self.data['padstacks']
         
         # Build instance map for DogBones
         self.instance_map = {inst['id']: inst for inst in self.data['placedInstances']}
 
-        # 1. Instantiate ViaInstance objects
-        for via_data in self.data['placedInstances']:
-            if via_data['type'] in ('dog_bone', 'surround_via_array'):
-                continue
+        # 1. Build the columnar store of via placements
+        store = self.instance_store = InstanceStore(self.data['placedInstances'], self.instance_map)
+        configs_by_index = [self.padstack_configs[padstack['name']] for padstack in padstack_list]
+        rows = store.rows(only_groups=only_groups)
 
-            padstack_index = via_data['padstackIndex']
-            # Find the corresponding PadstackConfig object using the index
-            padstack_name = padstack_list[padstack_index]['name']
-            padstack_config = self.padstack_configs[padstack_name]
-            
-            via = ViaInstance(via_data, padstack_config, self.units, self._to_mil, self.instance_map)
-            self.via_instances.append(via)
+        def views(selected_rows):
+            for row in selected_rows:
+                yield ViaInstance(store, row, configs_by_index[store.padstack_index[row]], self.units, self._to_mil)
 
         # 2. Create Voids (Must be done before placing vias or traces are placed)
         layer_dogbone_map = {l['name']: l.get('dogBone', -1) for l in self.data['stackup']}
-        for via in self.via_instances:
-            via.create_void(self.edb.modeler, self.layer_rects, layer_dogbone_map)
-
-        # 3. Place Vias (Padstack placements)
-        for via in self.via_instances:
-            via.place_via(self.edb.padstacks)
-            eff_name = via.get_effective_name()
-            if via.type == 'single':
-                self.edb.nets.find_or_create_net('net_'+eff_name)
-            if via.type == 'differential':
-                self.edb.nets.find_or_create_net('netp_'+eff_name)
-                self.edb.nets.find_or_create_net('netn_'+eff_name)                
+        diff_rows = np.intersect1d(rows, store.rows(via_type='differential'), assume_unique=True)
+        with self.stage('voids', len(diff_rows)) as progress:
+            for via in views(diff_rows):
+                with self.recorder.scope(via.group_id):
+                    via.create_void(self.modeler, self.layer_rects, layer_dogbone_map)
+                progress.advance()
+
+        # 3. Place Vias (Padstack placements), creating each signal net once
+        with self.stage('placement', len(rows)) as progress:
+            for net_id in store.net_ids('single', rows):
+                self.edb.nets.find_or_create_net('net_'+store.nets[net_id])
+            for net_id in store.net_ids('differential', rows):
+                self.edb.nets.find_or_create_net('netp_'+store.nets[net_id])
+                self.edb.nets.find_or_create_net('netn_'+store.nets[net_id])
+            for via in views(rows):
+                with self.recorder.scope(via.group_id):
+                    via.place_via(self.padstacks)
+                progress.advance()
 
         # 4. Create Traces and Ports
-        for via in self.via_instances:
-            via.create_ports_and_traces(self._create_trace_partial, self.edb.hfss, self.edb.modeler, self.layer_rects)
+        signal_rows = rows[store.type_code[rows] != TYPE_CODES['gnd']]
+        with self.stage('traces_ports', len(signal_rows)) as progress:
+            for via in views(signal_rows):
+                with self.recorder.scope(via.group_id):
+                    via.create_ports_and_traces(self._create_trace_partial, self.edb.hfss, self.modeler, self.layer_rects)
+                progress.advance()
 
         # 5. Process DogBones
-        for via_data in self.data['placedInstances']:
-             if via_data['type'] == 'dog_bone':
-                 db = DogBoneFeed(via_data, self.instance_map, self.units, self._to_mil)
-                 db.process(self)
+        dog_bones = [via_data for via_data in self.data['placedInstances']
+                     if via_data['type'] == 'dog_bone' and (only_groups is None or group_id(via_data) in only_groups)]
+        with self.stage('dogbones', len(dog_bones)) as progress:
+            for via_data in dog_bones:
+                db = DogBoneFeed(via_data, self.instance_map, self.units, self._to_mil)
+                with self.recorder.scope(group_id(via_data)):
+                    db.process(self)
+                progress.advance()
 
         # 6. Create fill padstacks and fill instances after all other padstack instances exist
-        self.create_fill_padstacks()
-        for via in self.via_instances:
-            via.place_fill_via(self.edb.padstacks)
+        fill_indices = [index for index, config in enumerate(configs_by_index)
+                        if config.bd_enabled and config.fill_enabled and config.fill_start_layer]
+        fill_rows = np.intersect1d(rows, store.rows(padstack_indices=fill_indices), assume_unique=True)
+        with self.stage('fill', len(fill_rows)) as progress:
+            if only_groups is None:
+                self.create_fill_padstacks()
+            for via in views(fill_rows):
+                with self.recorder.scope(via.group_id):
+                    via.place_fill_via(self.padstacks)
+                progress.advance()
 
         # 7. Create Components from Pins
-        self.create_components_from_pins()
+        if only_groups is None:
+            with self.stage('components', len(store.pins_by_component)):
+                self.create_components_from_pins()
 
     def create_components_from_pins(self):
-        """Groups pins by component name and creates components."""
-        component_groups = {}
-        for via in self.via_instances:
-            # Check if via name implies a component (contains '.')
-            if '.' in via.name:
-                component_name = via.name.split('.')[0]
-                if component_name not in component_groups:
-                    component_groups[component_name] = []
-                component_groups[component_name].extend(via.placed_pins)
-        
-        for comp_name, pins in component_groups.items():
+        """Creates one component per name prefix ('U1' for 'U1.A1') from the pins kept by the store."""
+        for comp_name, pins in self.instance_store.pins_by_component.items():
             if pins:
                 try:
                     # Ensure pins are unique before creating component
@@ -911,37 +905,199 @@ class EdbProject:
                 except Exception as e:
                     print(f"Error creating component '{comp_name}': {e}")
 
-    def run_modeling(self):
-        """Executes the full modeling workflow."""
-        print("Starting EDB project setup...")
-        self.setup_analysis()
-        print("Creating stackup, materials, and reference planes...")
-        self.create_stackup()
-        print("Creating padstack definitions...")
-        self.create_padstacks()
+    def _save_plan(self, objects):
+        plan = dict(self.plan)
+        plan['objects'] = objects
+        plan['layerRects'] = {layer: rect.id for layer, rect in self.layer_rects.items()}
+        save_plan(self.plan_path, plan)
+
+    def _delete_edb_object(self, obj):
+        if hasattr(obj, 'delete'):
+            obj.delete()
+        else:
+            obj._edb_object.Delete()
+
+    def delete_groups(self, previous_plan, gids):
+        """Deletes the ports, primitives and padstack instances recorded for the given plan groups."""
+        old_groups = previous_plan.get('groups', {})
+        old_objects = previous_plan.get('objects', {})
+
+        port_names = {name for gid in gids for name in old_groups.get(gid, {}).get('ports', [])}
+        for name, port in list(self.edb.ports.items()):
+            if name in port_names or name.split(':')[0] in port_names:
+                self._delete_edb_object(port)
+
+        primitive_ids = {pid for gid in gids for pid in old_objects.get(gid, {}).get('primitives', [])}
+        for primitive in list(self.edb.modeler.primitives):
+            if primitive.id in primitive_ids:
+                self._delete_edb_object(primitive)
+
+        padstack_instances = self.edb.padstacks.instances
+        for gid in gids:
+            for instance_id in old_objects.get(gid, {}).get('padstackInstances', []):
+                instance = padstack_instances.get(instance_id)
+                if instance is not None:
+                    self._delete_edb_object(instance)
+
+    def update_incremental(self, previous_plan, diff):
+        """Applies a plan diff to the existing AEDB: deletes changed groups and rebuilds them."""
+        self._open_edb(self.aedb_path)
+        try:
+            self._restore_template_state({'layer_rects': previous_plan.get('layerRects', {})})
+            with self.stage('delete'):
+                self.delete_groups(previous_plan, diff.to_delete)
+            self.process_via_instances(only_groups=diff.to_create)
+            with self.stage('save'):
+                self.edb.save_edb()
+        finally:
+            self.edb.close_edb()
+
+        objects = {gid: entry for gid, entry in previous_plan.get('objects', {}).items()
+                   if gid in diff.unchanged}
+        objects.update(self.recorder.objects)
+        self._save_plan(objects)
+
+    def run_modeling(self, incremental=False):
+        """Executes the full modeling workflow, or an in-place update of the previous export."""
+        try:
+            if self._run_modeling(incremental) and self.export_store is not None:
+                self.store_in_cache()
+        except Exception as e:
+            self._run_end('error', error=str(e))
+            raise
+        else:
+            self._run_end('ok', aedb=self.aedb_path)
+        finally:
+            if self.profiler is not None:
+                self.write_profile()
+
+    def _run_start(self, mode, phases):
+        if self.events is not None:
+            self.events.run_start(mode, phases)
+
+    def _run_end(self, status, **fields):
+        if self.events is not None:
+            self.events.run_end(status, **fields)
+
+    def _run_modeling(self, incremental):
+        """Runs the cheapest way to an up-to-date aedb_path; returns True if a new AEDB was modeled."""
+        previous_plan, diff = None, None
+        if incremental:
+            previous_plan = load_plan(self.plan_path) if os.path.isdir(self.aedb_path) else None
+            if previous_plan is None:
+                print("No previous export plan found: running a full build.")
+            else:
+                diff = diff_plans(previous_plan, self.plan)
+                if diff.full_rebuild_reason:
+                    print(f"Full rebuild required: {diff.full_rebuild_reason}.")
+                    diff = None
+                elif diff.is_empty:
+                    print(f"EDB project is up to date: {self.aedb_path}")
+                    self._run_start('up_to_date', [])
+                    return False
+
+        if self.export_store is not None and self.restore_from_cache():
+            return False
+
+        if diff is not None:
+            print(f"Updating EDB project in place ({diff.summary()})...")
+            self._run_start('incremental', INCREMENTAL_PHASES)
+            try:
+                self.update_incremental(previous_plan, diff)
+                print("Modeling complete.")
+                return True
+            except Exception as e:
+                print(f"WARNING: Incremental update failed ({e}); running a full build.")
+                self.recorder = ObjectRecorder()
+
+        self._run_start('full', TEMPLATE_BUILD_PHASES if self.template_store is not None else FULL_BUILD_PHASES)
+        if self.template_store is not None:
+            print("Preparing EDB project from template cache...")
+            with self.stage('template'):
+                self.prepare_from_template()
+        else:
+            print("Starting EDB project setup...")
+            with self.stage('setup'):
+                self._open_edb()
+                self.setup_analysis()
+            print("Creating stackup, materials, and reference planes...")
+            with self.stage('stackup', len(self.stackup_layers)):
+                self.create_stackup()
+            print("Creating padstack definitions...")
+            with self.stage('padstacks', len(self.data['padstacks'])):
+                self.create_padstacks()
         print("Processing via instances (instantiation, voids, placement, traces, ports)...")
         self.process_via_instances()
         
         print(f"\nSaving EDB project to: {self.aedb_path}")
-        self.edb.save_edb_as(self.aedb_path)
-        self.edb.close_edb()
+        with self.stage('save'):
+            if self.template_store is not None:
+                # The session is already opened on aedb_path.
+                self.edb.save_edb()
+            else:
+                self.edb.save_edb_as(self.aedb_path)
+            self.edb.close_edb()
+        self._save_plan(self.recorder.objects)
         print("Modeling complete.")
+        return True
+
+    def write_profile(self):
+        """Writes the EDB call profile to <name>.profile.json next to the .aedb and prints a summary."""
+        profile_path = os.path.splitext(self.aedb_path)[0] + '.profile.json'
+        report = self.profiler.write_report(profile_path)
+        print(f"EDB call profile written to: {profile_path}")
+        print(format_summary(report))
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build an AEDB project from a flattened Via Wizard project.")
+    parser.add_argument('json_path', nargs='?', default=None, help="Flattened project JSON.")
+    parser.add_argument('aedb_version', nargs='?', default=None, help="AEDB version, e.g. 2024.1.")
+    parser.add_argument('--template-cache', default=None,
+                        help="Directory of cached template AEDBs (stackup, padstacks, setup).")
+    parser.add_argument('--template-cache-size', type=float, default=2048,
+                        help="Template cache size limit in MB (default: 2048).")
+    parser.add_argument('--export-cache', default=None,
+                        help="Directory of cached finished AEDBs, reused when the same project is exported again.")
+    parser.add_argument('--export-cache-size', type=float, default=10240,
+                        help="Export cache size limit in MB (default: 10240).")
+    parser.add_argument('--link-cached', action='store_true',
+                        help="Hard-link export cache hits into place instead of copying them.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Update the previous export in place when only placements changed.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Time every EDB API call per stage and write <project>.profile.json next to the .aedb.")
+    parser.add_argument('--events', action='store_true',
+                        help="Write machine-readable JSON phase/progress events to stdout (for the GUI).")
+    parser.add_argument('--backend', default='pyedb', choices=['pyedb', 'recording'],
+                        help="Modeling backend: pyedb (default) or recording, which writes <project>.aedb/recording.json without Ansys.")
+    args = parser.parse_args()
+
     # Handle command-line arguments and fallback for testing
-    if len(sys.argv) < 3:
+    if args.json_path is None or args.aedb_version is None:
         # Fallback for testing if run directly without args
         json_path = 'd:/demo/project.json'
         aedb_version = '2024.1'
         print(f"Using fallback parameters for testing: JSON='{json_path}', AEDB='{aedb_version}'")
     else:
-        json_path = sys.argv[1]
-        aedb_version = sys.argv[2]
+        json_path = args.json_path
+        aedb_version = args.aedb_version
+
+    template_store = None
+    if args.template_cache:
+        template_store = ArtifactStore(args.template_cache, args.template_cache_size * 1024 * 1024)
+    export_store = None
+    if args.export_cache:
+        export_store = ArtifactStore(args.export_cache, args.export_cache_size * 1024 * 1024)
     
     try:
-        project = EdbProject(json_path, aedb_version)
-        project.run_modeling()
+        profiler = CallProfiler() if args.profile else None
+        events = EventEmitter() if args.events else None
+        project = EdbProject(json_path, aedb_version, template_store, get_backend(args.backend), profiler, events,
+                             export_store, args.link_cached)
+        project.run_modeling(incremental=args.incremental)
     except FileNotFoundError:
         print(f"Error: The JSON file '{json_path}' was not found.")
         sys.exit(1)
@@ -952,4 +1108,4 @@ if __name__ == "__main__":
             project.edb.close_edb()
         except:
             pass
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
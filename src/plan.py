@@ -0,0 +1,241 @@
+import os
+import json
+
+from artifact_store import content_key
+from geometry import connected_parent_id
+
+# Bump when the meaning of a plan (group ids, hashed content) changes.
+PLAN_SCHEMA_VERSION = 1
+
+HFSS_SETUP_PROFILE = {
+    'air_box_positive_vertical_extent': 0.5,
+    'air_box_negative_vertical_extent': 0.5,
+    'via_num_sides': 12,
+    'solution_frequency': '2GHz',
+    'max_num_passes': 20,
+    'max_delta_s': 0.01,
+    'frequency_range': [["linear count", "0Hz", "0Hz", 1],
+                        ["log scale", "1Hz", "50MHz", 50],
+                        ["linear scale", "50MHz", "10GHz", '50MHz']],
+}
+
+VIA_TYPES = ('single', 'differential', 'gnd')
+
+
+def definitions_fingerprint(data, aedb_version):
+    """Hash of everything shared by all placements: setup, stackup, reference planes and padstacks."""
+    return content_key(
+        aedb_version,
+        data['units'],
+        data['stackup'],
+        data['padstacks'],
+        data.get('boardWidth'),
+        data.get('boardHeight'),
+        HFSS_SETUP_PROFILE,
+    )
+
+
+def group_id(inst):
+    """Stable id of the EDB objects built for one placed instance."""
+    return f"{inst['type']}:{inst['id']}"
+
+
+def effective_name(inst, instance_map):
+    """Name of the root diff pair a via is attached to (its own name otherwise); used for net names."""
+    seen = set()
+    while True:
+        parent_id = inst.get('properties', {}).get('connectedDiffPairId')
+        if not parent_id or parent_id not in instance_map or parent_id in seen:
+            return inst['name']
+        seen.add(parent_id)
+        inst = instance_map[parent_id]
+
+
+def _parent_chain(inst, instance_map):
+    chain = []
+    parent = instance_map.get(connected_parent_id(inst))
+    while parent is not None and parent['id'] not in {p['id'] for p in chain}:
+        chain.append(parent)
+        parent = instance_map.get(connected_parent_id(parent))
+    return chain
+
+
+def _port_names(inst):
+    if inst['type'] not in ('single', 'differential'):
+        return []
+    props = inst.get('properties', {})
+    return [inst['name'] + suffix for key, suffix in (('feedIn', '_IN'), ('feedOut', '_OUT')) if props.get(key)]
+
+
+def compile_plan(data, aedb_version):
+    """Compiles a flattened project into a plan: one hashed group per modeled instance.
+
+    A via group covers its voids, padstack instances, nets, traces, ports and
+    fill vias; a dog bone group covers its traces, pads and voids. Each hash
+    includes everything the group's geometry and net names depend on, so a
+    group whose hash is unchanged can be left alone in an existing AEDB.
+    """
+    instance_map = {inst['id']: inst for inst in data['placedInstances']}
+    groups = {}
+    components = {}
+
+    for inst in data['placedInstances']:
+        if inst['type'] in VIA_TYPES:
+            content = {'instance': inst, 'effectiveName': effective_name(inst, instance_map)}
+            component = inst['name'].split('.')[0] if '.' in inst['name'] else None
+        elif inst['type'] == 'dog_bone':
+            content = {'instance': inst, 'parents': _parent_chain(inst, instance_map)}
+            component = None
+        else:
+            # surround_via_array entries only carry geometry for their dog bones.
+            continue
+
+        gid = group_id(inst)
+        groups[gid] = {
+            'hash': content_key(content),
+            'name': inst['name'],
+            'ports': _port_names(inst),
+            'component': component,
+        }
+        if component:
+            components.setdefault(component, []).append(gid)
+
+    return {
+        'schema': PLAN_SCHEMA_VERSION,
+        'aedbVersion': aedb_version,
+        'fingerprint': definitions_fingerprint(data, aedb_version),
+        'groups': groups,
+        'components': {name: sorted(members) for name, members in components.items()},
+    }
+
+
+class PlanDiff:
+    """Group-level difference between the plan of the last export and a new plan."""
+    def __init__(self, removed, added, modified, unchanged, full_rebuild_reason=None):
+        self.removed = removed
+        self.added = added
+        self.modified = modified
+        self.unchanged = unchanged
+        self.full_rebuild_reason = full_rebuild_reason
+
+    @property
+    def is_empty(self):
+        return not (self.removed or self.added or self.modified)
+
+    @property
+    def to_delete(self):
+        return self.removed | self.modified
+
+    @property
+    def to_create(self):
+        return self.added | self.modified
+
+    def summary(self):
+        return (f"{len(self.added)} added, {len(self.modified)} modified, "
+                f"{len(self.removed)} removed, {len(self.unchanged)} unchanged")
+
+
+def diff_plans(previous, current):
+    """Diffs two plans by stable group id and decides whether an in-place update is possible."""
+    old_groups = previous.get('groups', {})
+    new_groups = current['groups']
+
+    removed = set(old_groups) - set(new_groups)
+    added = set(new_groups) - set(old_groups)
+    common = set(old_groups) & set(new_groups)
+    modified = {gid for gid in common if old_groups[gid]['hash'] != new_groups[gid]['hash']}
+    unchanged = common - modified
+
+    reason = None
+    if previous.get('schema') != current['schema']:
+        reason = "plan format changed"
+    elif previous.get('aedbVersion') != current['aedbVersion']:
+        reason = "AEDB version changed"
+    elif previous.get('fingerprint') != current['fingerprint']:
+        reason = "stackup, padstack definitions, board size or setup changed"
+    elif previous.get('components', {}) != current['components']:
+        reason = "component membership changed"
+    else:
+        # Components are built from the pins of all their members at once.
+        touched = {old_groups[gid].get('component') for gid in removed | modified}
+        touched |= {new_groups[gid].get('component') for gid in added | modified}
+        touched.discard(None)
+        if touched:
+            reason = f"component pins changed ({', '.join(sorted(touched))})"
+
+    return PlanDiff(removed, added, modified, unchanged, reason)
+
+
+def plan_path_for(aedb_path):
+    """Plan file kept next to an AEDB: <name>.aedb -> <name>.plan.json."""
+    return os.path.splitext(aedb_path)[0] + '.plan.json'
+
+
+def load_plan(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_plan(path, plan):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(plan, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+class ObjectRecorder:
+    """Collects the ids of EDB primitives and padstack instances created for each plan group."""
+    def __init__(self, objects=None):
+        self.objects = objects if objects is not None else {}
+        self._group = None
+
+    def scope(self, gid):
+        return _RecorderScope(self, gid)
+
+    def record(self, kind, obj):
+        if self._group is None or obj is None:
+            return
+        entry = self.objects.setdefault(self._group, {'primitives': [], 'padstackInstances': []})
+        entry[kind].append(obj.id)
+
+    def wrap(self, target, recorded_methods):
+        """Returns a proxy of target whose listed methods record their return value."""
+        return _RecordingProxy(self, target, recorded_methods)
+
+
+class _RecorderScope:
+    def __init__(self, recorder, gid):
+        self._recorder = recorder
+        self._gid = gid
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = self._recorder._group
+        self._recorder._group = self._gid
+        return self._recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        self._recorder._group = self._previous
+        return False
+
+
+class _RecordingProxy:
+    def __init__(self, recorder, target, recorded_methods):
+        self._recorder = recorder
+        self._target = target
+        self._recorded_methods = recorded_methods
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        kind = self._recorded_methods.get(name)
+        if kind is None or not callable(attr):
+            return attr
+
+        def recorded(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            self._recorder.record(kind, result)
+            return result
+        return recorded
@@ -0,0 +1,149 @@
+import sys
+import json
+import time
+
+# Lines starting with this prefix on the modeling stdout carry one JSON event.
+EVENT_PREFIX = '@@event '
+
+# Relative cost of each modeling phase, used to turn per-phase progress into an overall percentage.
+PHASE_WEIGHTS = {
+    'setup': 2,
+    'stackup': 3,
+    'padstacks': 2,
+    'template': 4,
+    'cache': 1,
+    'delete': 5,
+    'voids': 15,
+    'placement': 25,
+    'traces_ports': 25,
+    'dogbones': 8,
+    'fill': 5,
+    'components': 5,
+    'save': 10,
+}
+
+FULL_BUILD_PHASES = ('setup', 'stackup', 'padstacks', 'voids', 'placement', 'traces_ports',
+                     'dogbones', 'fill', 'components', 'save')
+TEMPLATE_BUILD_PHASES = ('template',) + FULL_BUILD_PHASES[3:]
+CACHED_PHASES = ('cache',)
+INCREMENTAL_PHASES = ('delete', 'voids', 'placement', 'traces_ports', 'dogbones', 'fill', 'save')
+
+# At most one progress event per phase in this interval (start/end events are always sent).
+PROGRESS_INTERVAL = 0.25
+
+
+class PhaseProgress:
+    """Item counter of one running phase; emits throttled progress events."""
+    def __init__(self, emitter, name, total):
+        self._emitter = emitter
+        self.name = name
+        self.total = total
+        self.done = 0
+        self._last_emit = 0.0
+
+    def advance(self, count=1):
+        self.done += count
+        if self._emitter is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_emit >= PROGRESS_INTERVAL:
+            self._last_emit = now
+            self._emitter.progress(self)
+
+    @property
+    def fraction(self):
+        if not self.total:
+            return 0.0
+        return min(self.done / self.total, 1.0)
+
+
+class EventEmitter:
+    """Writes machine-readable phase events (start, progress, end) as prefixed JSON lines."""
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.phases = FULL_BUILD_PHASES
+        self.completed_weight = 0.0
+        self.started = time.perf_counter()
+
+    def emit(self, event, **fields):
+        payload = {'event': event, 't': round(time.perf_counter() - self.started, 3)}
+        payload.update(fields)
+        self.stream.write(EVENT_PREFIX + json.dumps(payload) + '\n')
+        self.stream.flush()
+
+    def run_start(self, mode, phases):
+        self.phases = tuple(phases)
+        self.completed_weight = 0.0
+        self.emit('run_start', mode=mode, phases=list(self.phases))
+
+    def run_end(self, status, **fields):
+        self.emit('run_end', status=status, percent=100.0 if status == 'ok' else self.percent(), **fields)
+
+    def percent(self, running=None):
+        total_weight = sum(PHASE_WEIGHTS.get(name, 1) for name in self.phases) or 1
+        weight = self.completed_weight
+        if running is not None:
+            weight += PHASE_WEIGHTS.get(running.name, 1) * running.fraction
+        return round(min(100.0 * weight / total_weight, 100.0), 1)
+
+    def phase_start(self, phase):
+        self.emit('phase_start', phase=phase.name, total=phase.total, percent=self.percent())
+
+    def progress(self, phase):
+        self.emit('progress', phase=phase.name, done=phase.done, total=phase.total, percent=self.percent(phase))
+
+    def phase_end(self, phase, duration):
+        if phase.name in self.phases:
+            self.completed_weight += PHASE_WEIGHTS.get(phase.name, 1)
+        self.emit('phase_end', phase=phase.name, done=phase.done, total=phase.total,
+                  duration=round(duration, 3), percent=self.percent())
+
+
+def parse_event(line):
+    """Returns the event dict of a modeling output line, or None for a plain log line."""
+    if not line.startswith(EVENT_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(EVENT_PREFIX):])
+    except ValueError:
+        return None
+
+
+class ProgressTracker:
+    """Turns a stream of events into GUI progress state: phase, percent and ETA.
+
+    estimate optionally maps the run mode to an expected duration from past
+    exports; it carries the ETA early on and is blended out as the
+    percentage-based extrapolation gets reliable.
+    """
+    def __init__(self, estimate=None):
+        self.state = {'phase': None, 'percent': 0.0, 'eta': None, 'elapsed': 0.0, 'status': 'running'}
+        self._estimate = estimate
+        self.expected = None
+
+    def update(self, event):
+        state = self.state
+        if 'percent' in event:
+            state['percent'] = event['percent']
+        if 't' in event:
+            state['elapsed'] = event['t']
+        if event.get('phase'):
+            state['phase'] = event['phase']
+        if event['event'] == 'run_start' and self._estimate is not None:
+            self.expected = self._estimate(event.get('mode'))
+        if event['event'] == 'run_end':
+            state['status'] = event.get('status', 'ok')
+            state['eta'] = 0.0
+        elif state['percent'] < 100:
+            state['eta'] = self._eta(state['elapsed'], state['percent'])
+        return dict(state)
+
+    def _eta(self, elapsed, percent):
+        from_history = max(self.expected - elapsed, 0.0) if self.expected is not None else None
+        if percent <= 0:
+            return None if from_history is None else round(from_history, 1)
+        from_percent = elapsed * (100.0 - percent) / percent
+        if from_history is None:
+            return round(from_percent, 1)
+        weight = percent / 100.0
+        return round(weight * from_percent + (1 - weight) * from_history, 1)
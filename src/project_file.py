@@ -0,0 +1,164 @@
+"""Project files: pretty-printed JSON or the compact .vwz container.
+
+A .vwz file is a zip holding header.json (stackup, padstacks, units and the
+other small sections, plus the column layout) and one .npy member per
+placedInstances column (see columnar.py). It round-trips losslessly with the
+JSON schema. CompactProject reads the header sections without touching the
+instance columns, which are only loaded when first needed. zipfile and numpy
+(through columnar.py) are only imported for .vwz files, so JSON projects load
+without them.
+
+Convert between the formats from src/:
+    python project_file.py convert project.json project.vwz
+"""
+import os
+import json
+import argparse
+
+COMPACT_EXTENSION = '.vwz'
+COMPACT_FORMAT = 'via-wizard-compact'
+COMPACT_FORMAT_VERSION = 1
+HEADER_MEMBER = 'header.json'
+ARRAY_DIR = 'columns/'
+
+
+def is_compact_path(path):
+    return os.path.splitext(path)[1].lower() == COMPACT_EXTENSION
+
+
+def _atomic_write(path, write):
+    tmp_path = os.path.join(os.path.dirname(os.path.abspath(path)), f".{os.path.basename(path)}.{os.urandom(16).hex()}")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_compact(data, path):
+    import zipfile
+    import numpy as np
+    from columnar import encode_project
+
+    header, arrays = encode_project(data)
+    header['#format'] = {'name': COMPACT_FORMAT, 'version': COMPACT_FORMAT_VERSION, 'arrays': list(arrays)}
+
+    def write(tmp_path):
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            zf.writestr(HEADER_MEMBER, json.dumps(header))
+            for name, array in arrays.items():
+                with zf.open(ARRAY_DIR + name + '.npy', 'w') as f:
+                    np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+    _atomic_write(path, write)
+
+
+class _LazyArrays:
+    """Mapping of column name -> array, each read from the zip on first access."""
+    def __init__(self, zf, names):
+        self._zf = zf
+        self._names = set(names)
+        self._loaded = {}
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        if name not in self._loaded:
+            import numpy as np
+            with self._zf.open(ARRAY_DIR + name + '.npy') as f:
+                self._loaded[name] = np.lib.format.read_array(f, allow_pickle=False)
+        return self._loaded[name]
+
+    def get(self, name, default=None):
+        return self[name] if name in self._names else default
+
+
+class CompactProject:
+    """An open .vwz file: header sections are available at once, placedInstances on demand."""
+    def __init__(self, path):
+        import zipfile
+        self.path = path
+        self._zf = zipfile.ZipFile(path, 'r')
+        try:
+            self.header = json.loads(self._zf.read(HEADER_MEMBER))
+        except KeyError:
+            self._zf.close()
+            raise ValueError(f"{path} is not a Via Wizard compact project (no {HEADER_MEMBER}).") from None
+        info = self.header.get('#format', {})
+        if info.get('name') != COMPACT_FORMAT or info.get('version', 0) > COMPACT_FORMAT_VERSION:
+            self._zf.close()
+            raise ValueError(f"{path} has an unsupported format {info.get('name')} v{info.get('version')}.")
+        self.arrays = _LazyArrays(self._zf, info.get('arrays', []))
+        self._instances = None
+
+    @property
+    def keys(self):
+        return self.header['#columnar']['keys']
+
+    def section(self, key):
+        """A top-level project section; placedInstances is decoded on first access."""
+        if key == 'placedInstances':
+            return self.instances()
+        if key not in self.keys:
+            raise KeyError(key)
+        return self.header[key]
+
+    def instances(self):
+        if self._instances is None:
+            from columnar import decode_instances
+            spec = self.header['#columnar'].get('instances')
+            self._instances = decode_instances(spec, self.arrays) if spec else []
+        return self._instances
+
+    def load(self):
+        """The whole project dict, equal to the JSON it was saved from."""
+        return {key: self.section(key) for key in self.keys}
+
+    def close(self):
+        self._zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_project_file(data, path):
+    """Saves a project as .vwz or, for any other extension, pretty-printed JSON.
+
+    In JSON, placedInstances is written last so project_stream can return
+    every other section before reading any instance.
+    """
+    if is_compact_path(path):
+        save_compact(data, path)
+    else:
+        ordered = {key: value for key, value in data.items() if key != 'placedInstances'}
+        if 'placedInstances' in data:
+            ordered['placedInstances'] = data['placedInstances']
+        with open(path, 'w') as f:
+            json.dump(ordered, f, indent=4)
+
+
+def load_project_file(path):
+    if is_compact_path(path):
+        with CompactProject(path) as project:
+            return project.load()
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert Via Wizard projects between JSON and the compact .vwz format.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert_parser = commands.add_parser('convert', help="Convert a project; the format follows each file's extension.")
+    convert_parser.add_argument('source')
+    convert_parser.add_argument('target')
+    args = parser.parse_args()
+
+    data = load_project_file(args.source)
+    save_project_file(data, args.target)
+    if load_project_file(args.target) != data:
+        raise SystemExit(f"Round trip check failed: {args.target} does not load back equal to {args.source}.")
+    print(f"Converted {args.source} ({os.path.getsize(args.source) / 2**20:.2f} MB) to "
+          f"{args.target} ({os.path.getsize(args.target) / 2**20:.2f} MB).")
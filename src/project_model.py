@@ -0,0 +1,105 @@
+import re
+import threading
+
+from journal import apply_ops
+
+
+class ProjectModel:
+    """The project as Python holds it, kept in step with the GUI through patches.
+
+    The GUI sends journal operations (see journal.apply_ops) for its edits,
+    so saving and exporting read this model instead of receiving the whole
+    project over the bridge. Operations originating in Python (e.g. imports)
+    are applied here and sent back to the GUI as the same kind of patch.
+    Instances are replaced rather than changed in place, so a snapshot stays
+    valid while later patches arrive.
+    """
+    def __init__(self, data=None):
+        self._lock = threading.Lock()
+        self._data = {}
+        self.revision = 0
+        self.reset(data or {})
+
+    def reset(self, data):
+        with self._lock:
+            self._data = dict(data)
+            self._data['placedInstances'] = list(self._data.get('placedInstances', []))
+            self.revision += 1
+
+    def apply(self, ops):
+        if not ops:
+            return self.revision
+        with self._lock:
+            apply_ops(self._data, ops)
+            self.revision += 1
+            return self.revision
+
+    def extend_instances(self, instances):
+        """Appends instances that are already shown in the GUI (a project being streamed in)."""
+        with self._lock:
+            self._data['placedInstances'].extend(instances)
+            self.revision += 1
+
+    def snapshot(self):
+        """The current project dict; callers must not change the instances in it."""
+        with self._lock:
+            return dict(self._data, placedInstances=list(self._data['placedInstances']))
+
+    def import_ops(self, data):
+        """Operations placing the instances of another project into this one.
+
+        Like pasting in the GUI, imported instances get fresh ids and unique
+        names, and connections between them are kept while connections to
+        instances that were not imported are dropped. Padstacks are matched
+        by name; missing ones are appended to the padstack list.
+        """
+        with self._lock:
+            instances = self._data['placedInstances']
+            next_id = max((inst.get('id') for inst in instances if isinstance(inst.get('id'), int)), default=0) + 1
+            names = {inst.get('name') for inst in instances}
+            padstacks = list(self._data.get('padstacks') or [])
+        existing = len(padstacks)
+
+        ops = []
+        padstack_map = {}
+        by_name = {padstack.get('name'): i for i, padstack in enumerate(padstacks)}
+        for i, padstack in enumerate(data.get('padstacks') or []):
+            if padstack.get('name') not in by_name:
+                by_name[padstack.get('name')] = len(padstacks)
+                padstacks.append(padstack)
+            padstack_map[i] = by_name[padstack.get('name')]
+        if len(padstacks) != existing:
+            ops.append({'op': 'section', 'key': 'padstacks', 'value': padstacks})
+
+        id_map = {}
+        imported = []
+        for inst in data.get('placedInstances', []):
+            new_inst = dict(inst, properties=dict(inst.get('properties') or {}))
+            if 'padstackIndex' in inst:
+                new_inst['padstackIndex'] = padstack_map.get(int(inst['padstackIndex']), inst['padstackIndex'])
+            if 'gndPadstackIndex' in new_inst['properties']:
+                index = new_inst['properties']['gndPadstackIndex']
+                new_inst['properties']['gndPadstackIndex'] = padstack_map.get(int(index), index)
+            id_map[inst.get('id')] = next_id
+            new_inst['id'] = next_id
+            next_id += 1
+            new_inst['name'] = _unique_name(inst.get('name') or 'via', names)
+            names.add(new_inst['name'])
+            imported.append(new_inst)
+        for inst in imported:
+            parent = inst['properties'].get('connectedDiffPairId')
+            if parent is not None:
+                inst['properties']['connectedDiffPairId'] = id_map.get(parent)
+        return ops + [{'op': 'add', 'instance': inst} for inst in imported]
+
+
+def _unique_name(name, taken):
+    if name not in taken:
+        return name
+    match = re.match(r'^(.*?)_?(\d+)$', name)
+    prefix, number = (match.group(1), int(match.group(2))) if match else (name, 0)
+    while True:
+        number += 1
+        candidate = f"{prefix}_{number}"
+        if candidate not in taken:
+            return candidate
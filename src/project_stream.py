@@ -0,0 +1,183 @@
+"""Incremental reader for large JSON project files.
+
+iter_project yields the top-level sections of a project file in file order,
+with placedInstances split into chunks, while holding only a small window of
+the raw text: the stackup of a 200 MB project is available as soon as the
+bytes before placedInstances are read. Projects saved by save_project_file
+put placedInstances last, so every other section comes first.
+
+Check that streaming matches json.load at every window size from src/:
+    python project_stream.py check [project.json ...] --max-read-size 64
+"""
+import io
+import re
+import json
+import argparse
+
+STREAMED_KEY = 'placedInstances'
+# Characters read from the file per refill (doubled while a single value does not fit).
+READ_SIZE = 1 << 20
+CHUNK_INSTANCES = 2000
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+_NUMBER_CONTINUATION = '.eE+-'
+# Always checked: top-level numbers (board size after placedInstances in older files) that a window edge can split.
+_CHECK_SAMPLES = (
+    '{"boardWidth": 400.5, "boardHeight": 2e2, "units": "mil", "placedInstances": []}',
+    '{"placedInstances": [{"id": 1, "x": -12.75, "y": 3e1}], "boardWidth": 400.5, "boardHeight": 2e2}',
+    '{"units": "mil", "canvasGridSpacing": -1.5E-3, "placedInstances": [], "boardWidth": 1e+2, "boardHeight": 0.25}',
+    '{"stackup": [{"dk": 4, "df": 0.02, "isReference": false, "fillMaterial": null}], "boardWidth": 12345678.9}',
+)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _Reader:
+    """A sliding window over a text file for parsing one JSON value at a time."""
+    def __init__(self, f, read_size=READ_SIZE):
+        self._f = f
+        self._read_size = read_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # Drop what was consumed; read at least as much as is still pending so large values parse in O(n).
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        text = self._f.read(max(self._read_size, len(self.buf)))
+        if not text:
+            self.eof = True
+        self.buf += text
+        return bool(text)
+
+    def peek(self):
+        """The next non-whitespace character ('' at the end of the file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def take(self, expected):
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(f"Invalid project file: expected {' or '.join(map(repr, expected))}, found {char!r}.")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A value ending at the window edge may continue in the file, and so may a number
+                # cut off inside its fraction or exponent ('400.' decodes as 400, '2e' as 2).
+                if self.eof or (end < len(self.buf) and not (_is_number(value) and self.buf[end] in _NUMBER_CONTINUATION)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_project(path, chunk_instances=CHUNK_INSTANCES, read_size=READ_SIZE):
+    """Yields ('section', key, value) per top-level key and ('instances', [...]) per chunk of placedInstances.
+
+    The instance chunks of one placedInstances array are followed by
+    ('instances_end', count).
+    """
+    with open(path, 'r') as f:
+        yield from _iter_sections(_Reader(f, read_size), chunk_instances)
+
+
+def _iter_sections(reader, chunk_instances):
+    reader.take('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.take(':')
+        if key == STREAMED_KEY and reader.peek() == '[':
+            reader.take('[')
+            chunk = []
+            count = 0
+            if reader.peek() == ']':
+                reader.take(']')
+            else:
+                while True:
+                    chunk.append(reader.value())
+                    if len(chunk) >= chunk_instances:
+                        count += len(chunk)
+                        yield 'instances', chunk
+                        chunk = []
+                    if reader.take(',]') == ']':
+                        break
+            if chunk:
+                count += len(chunk)
+                yield 'instances', chunk
+            yield 'instances_end', count
+        else:
+            yield 'section', key, reader.value()
+        if reader.take(',}') == '}':
+            return
+
+
+def load_project_streaming(path, read_size=READ_SIZE):
+    """Same result as json.load for a project file, without holding the whole text in memory."""
+    return _collect(iter_project(path, read_size=read_size))
+
+
+def _collect(events):
+    data = {}
+    for event in events:
+        if event[0] == 'section':
+            data[event[1]] = event[2]
+        elif event[0] == 'instances':
+            data.setdefault(STREAMED_KEY, []).extend(event[1])
+        else:
+            data.setdefault(STREAMED_KEY, [])
+    return data
+
+
+def check_read_sizes(text, max_read_size):
+    """Read sizes (1..max_read_size) at which streaming text does not give json.loads(text)."""
+    expected = json.loads(text)
+    failures = []
+    for read_size in range(1, max_read_size + 1):
+        try:
+            ok = _collect(_iter_sections(_Reader(io.StringIO(text), read_size), 1)) == expected
+        except ValueError:
+            ok = False
+        if not ok:
+            failures.append(read_size)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental JSON project reader.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    check_parser = commands.add_parser('check', help="Compare streaming with json.load at small read sizes.")
+    check_parser.add_argument('projects', nargs='*', help="Project JSON files checked besides the built-in samples.")
+    check_parser.add_argument('--max-read-size', type=int, default=64, help="Largest read size tried (default: 64).")
+    args = parser.parse_args()
+
+    samples = [(f"sample {i + 1}", text) for i, text in enumerate(_CHECK_SAMPLES)]
+    for path in args.projects:
+        with open(path, 'r') as f:
+            samples.append((path, f.read()))
+    failed = False
+    for name, text in samples:
+        failures = check_read_sizes(text, args.max_read_size)
+        if failures:
+            failed = True
+            print(f"MISMATCH {name}: read sizes {', '.join(map(str, failures))}")
+        else:
+            print(f"ok {name}")
+    if failed:
+        raise SystemExit(1)
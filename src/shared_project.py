@@ -0,0 +1,65 @@
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from columnar import decode_project, encode_project
+
+# Arrays start on this boundary inside the shared block.
+ALIGNMENT = 8
+
+
+def _layout(arrays):
+    """(name -> [dtype, shape, offset], total bytes) placing the arrays back to back in one block."""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes
+    return layout, max(offset, 1)
+
+
+class SharedProject:
+    """A flattened project published in shared memory for a modeling worker.
+
+    The instance columns (see columnar.py) are copied once into a shared
+    block; the small header (stackup, padstacks, string tables) travels with
+    the job. The creator owns the block and must close() it once the job has
+    finished.
+    """
+    def __init__(self, data):
+        header, arrays = encode_project(data)
+        layout, size = _layout(arrays)
+        self._shm = shared_memory.SharedMemory(name=f"via_wizard_{uuid.uuid4().hex[:16]}", create=True, size=size)
+        for name, array in arrays.items():
+            dtype, shape, offset = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)[...] = array
+        self.handle = {'name': self._shm.name, 'size': size, 'header': header, 'layout': layout}
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+
+def load_shared_project(handle):
+    """Rebuilds the project dict from a SharedProject handle (in the worker process)."""
+    shm = shared_memory.SharedMemory(name=handle['name'])
+    arrays = None
+    try:
+        arrays = {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                  for name, (dtype, shape, offset) in handle['layout'].items()}
+        return decode_project(handle['header'], arrays)
+    finally:
+        # The views must be released before the block can be closed.
+        arrays = None
+        try:
+            shm.close()
+        except BufferError:
+            pass # still referenced by a traceback; unmapped once that is collected
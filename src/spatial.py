@@ -0,0 +1,146 @@
+import math
+
+
+def instance_via_points(inst: dict):
+    """Returns the via centers occupied by a flattened instance.
+
+    Single and GND vias occupy their own center; a differential pair occupies
+    its P and N via (P at the negative side, N at the positive side, same as
+    ViaInstance.place_via). Non-via entries (dog bones, surround arrays) return
+    an empty list.
+    """
+    inst_type = inst.get('type')
+    x = float(inst['x'])
+    y = float(inst['y'])
+
+    if inst_type in ('single', 'gnd'):
+        return [(x, y)]
+
+    if inst_type in ('differential', 'diff_gnd'):
+        props = inst.get('properties', {})
+        pitch = float(props.get('pitch', 40))
+        if props.get('orientation') == 'vertical':
+            return [(x, y - pitch / 2), (x, y + pitch / 2)]
+        return [(x - pitch / 2, y), (x + pitch / 2, y)]
+
+    return []
+
+
+class GridIndex:
+    """Uniform-grid spatial hash over via points.
+
+    Each inserted point carries an owner key (usually an instance id), so a
+    differential pair contributes two points that resolve to the same owner.
+    """
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError(f"Grid cell size must be positive, got {cell_size}.")
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._count = 0
+        self._bounds = None # (min cx, min cy, max cx, max cy) of the occupied cells
+
+    def __len__(self):
+        return self._count
+
+    def _cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, key, x, y):
+        cx, cy = self._cell_of(x, y)
+        self._cells.setdefault((cx, cy), []).append((key, x, y))
+        self._count += 1
+        if self._bounds is None:
+            self._bounds = (cx, cy, cx, cy)
+        else:
+            min_cx, min_cy, max_cx, max_cy = self._bounds
+            self._bounds = (min(min_cx, cx), min(min_cy, cy), max(max_cx, cx), max(max_cy, cy))
+
+    def query_radius(self, x, y, radius):
+        """Returns {key: distance} for every owner with a point within radius of (x, y)."""
+        hits = {}
+        cx0, cy0 = self._cell_of(x - radius, y - radius)
+        cx1, cy1 = self._cell_of(x + radius, y + radius)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for key, px, py in self._cells.get((cx, cy), ()):
+                    dist = math.hypot(px - x, py - y)
+                    if dist <= radius and dist < hits.get(key, math.inf):
+                        hits[key] = dist
+        return hits
+
+    def nearest(self, x, y, k, exclude=()):
+        """Returns up to k (key, distance) pairs ordered by distance from (x, y).
+
+        The search grows ring by ring around the query cell and stops once the
+        k-th best distance is closer than anything an outer ring could hold.
+        """
+        if k <= 0 or not self._cells:
+            return []
+
+        best = {}
+        cx0, cy0 = self._cell_of(x, y)
+        max_ring = self._max_ring(cx0, cy0)
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(cx0, cy0, ring):
+                for key, px, py in self._cells.get(cell, ()):
+                    if key in exclude:
+                        continue
+                    dist = math.hypot(px - x, py - y)
+                    if dist < best.get(key, math.inf):
+                        best[key] = dist
+
+            if len(best) >= k:
+                kth = sorted(best.values())[k - 1]
+                # Points outside the searched square are at least ring * cell_size away.
+                if kth <= ring * self.cell_size:
+                    break
+
+        return sorted(best.items(), key=lambda item: item[1])[:k]
+
+    def _max_ring(self, cx0, cy0):
+        # The farthest occupied cell lies within the bounding box of all of them.
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        return max(cx0 - min_cx, max_cx - cx0, cy0 - min_cy, max_cy - cy0, 0)
+
+    @staticmethod
+    def _ring_cells(cx0, cy0, ring):
+        if ring == 0:
+            yield (cx0, cy0)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx0 + dx, cy0 - ring)
+            yield (cx0 + dx, cy0 + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx0 - ring, cy0 + dy)
+            yield (cx0 + ring, cy0 + dy)
+
+
+def build_instance_index(instances, cell_size=None):
+    """Builds a GridIndex over every via point of the given flattened instances.
+
+    When cell_size is omitted it is derived from the point density so that a
+    cell holds a handful of vias on average.
+    """
+    points = []
+    for inst in instances:
+        for x, y in instance_via_points(inst):
+            points.append((inst['id'], x, y))
+
+    if cell_size is None:
+        cell_size = _auto_cell_size(points)
+
+    index = GridIndex(cell_size)
+    for key, x, y in points:
+        index.insert(key, x, y)
+    return index
+
+
+def _auto_cell_size(points):
+    if len(points) < 2:
+        return 1.0
+    xs = [p[1] for p in points]
+    ys = [p[2] for p in points]
+    span = max(max(xs) - min(xs), max(ys) - min(ys))
+    # Target roughly four points per cell on a square-ish field.
+    return max(span / math.sqrt(len(points) / 4), 1e-6)
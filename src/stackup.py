@@ -0,0 +1,326 @@
+"""Stackup handling that needs neither pyedb nor the GUI: XML import/export and backdrill stub layers.
+
+api.py and modeling.py call into this module, so validators, benchmarks and
+batch tools can use it without paying for their imports. xml.etree is only
+imported by the XML functions; modeling only needs build_augmented_stackup.
+"""
+from hdi import format_name_token
+
+
+def _find_stackup_node(root):
+    stackup_node = root.find(".//Stackup")
+    if stackup_node is None:
+        # Try with namespace
+        if '}' in root.tag:
+            ns = root.tag.split('}')[0] + '}'
+            stackup_node = root.find(f".//{ns}Stackup")
+
+    if stackup_node is None:
+        # Fallback: iterate and check tag name
+        for elem in root.iter():
+            if 'Stackup' in elem.tag:
+                stackup_node = elem
+                break
+    return stackup_node
+
+
+def _material_value(parent, tag_name):
+    for child in parent:
+        if tag_name in child.tag:
+            for sub in child:
+                if 'Double' in sub.tag:
+                    return float(sub.text)
+    return 0
+
+
+def parse_stackup_xml(path):
+    """Reads a stackup XML file into {"layers": [...], "unit": ...}; returns None if it has no Stackup node."""
+    import xml.etree.ElementTree as ET
+    stackup_node = _find_stackup_node(ET.parse(path).getroot())
+    if stackup_node is None:
+        return None
+
+    # 1. Parse Materials
+    materials_map = {}
+    materials_node = None
+
+    # Find Materials node (handling namespace)
+    for child in stackup_node:
+        if 'Materials' in child.tag:
+            materials_node = child
+            break
+
+    if materials_node is not None:
+        for mat in materials_node:
+            materials_map[mat.get("Name")] = {
+                "dk": _material_value(mat, "Permittivity"),
+                "df": _material_value(mat, "DielectricLossTangent"),
+                "conductivity": _material_value(mat, "Conductivity"),
+            }
+
+    # 2. Parse Layers
+    layers = []
+    layers_node = None
+    length_unit = "mm" # Default
+
+    for child in stackup_node:
+        if 'Layers' in child.tag:
+            layers_node = child
+            break
+
+    if layers_node is not None:
+        length_unit = layers_node.get("LengthUnit", "mm")
+        for layer_node in layers_node:
+            mat_name = layer_node.get("Material", "")
+            mat_props = materials_map.get(mat_name, {"dk": 0, "df": 0, "conductivity": 0})
+
+            raw_type = layer_node.get("Type", "Dielectric").lower()
+            if "conductor" in raw_type:
+                final_type = "Conductor"
+            else:
+                final_type = "Dielectric"
+
+            # Enforce property visibility rules
+            dk = mat_props["dk"]
+            df = mat_props["df"]
+            cond = mat_props["conductivity"]
+
+            if final_type == "Conductor":
+                dk = ""
+                df = ""
+            else: # Dielectric
+                cond = ""
+
+            layers.append({
+                "name": layer_node.get("Name", "Layer"),
+                "type": final_type,
+                "thickness": float(layer_node.get("Thickness", "0")),
+                "dk": dk,
+                "df": df,
+                "conductivity": cond,
+                "fillMaterial": layer_node.get("FillMaterial", ""),
+                "isReference": layer_node.get("IsReference", "false").lower() == "true"
+            })
+
+    return {"layers": layers, "unit": length_unit}
+
+
+def save_stackup_xml(path, layers):
+    """Writes stackup layers as a Control -> Stackup XML file, one material per layer with properties."""
+    import xml.etree.ElementTree as ET
+    root = ET.Element("c:Control", {"xmlns:c": "http://www.ansys.com/control", "schemaVersion": "1.0"})
+    stackup = ET.SubElement(root, "Stackup", {"schemaVersion": "1.0"})
+
+    materials_node = ET.SubElement(stackup, "Materials")
+    layers_node = ET.SubElement(stackup, "Layers", {"LengthUnit": "mil"}) # Defaulting to mil as per example, or should check current units?
+
+    created_materials = set()
+
+    for layer in layers:
+        dk = float(layer.get("dk", 0) or 0)
+        df = float(layer.get("df", 0) or 0)
+        cond = float(layer.get("conductivity", 0) or 0)
+
+        mat_name = "AIR" # Default
+
+        # If it has specific properties, create a material
+        if dk > 0 or df > 0 or cond > 0:
+            mat_name = f"Mat_{layer.get('name')}"
+
+            if mat_name not in created_materials:
+                mat_elem = ET.SubElement(materials_node, "Material", {"Name": mat_name})
+
+                if dk > 0:
+                    perm = ET.SubElement(mat_elem, "Permittivity")
+                    ET.SubElement(perm, "Double").text = str(dk)
+
+                if df > 0:
+                    loss = ET.SubElement(mat_elem, "DielectricLossTangent")
+                    ET.SubElement(loss, "Double").text = str(df)
+
+                if cond > 0:
+                    c = ET.SubElement(mat_elem, "Conductivity")
+                    ET.SubElement(c, "Double").text = str(cond)
+
+                created_materials.add(mat_name)
+
+        # Create Layer node
+        layer_elem = ET.SubElement(layers_node, "Layer")
+        layer_elem.set("Name", str(layer.get("name")))
+        layer_elem.set("Type", str(layer.get("type")))
+        layer_elem.set("Thickness", str(layer.get("thickness")))
+        layer_elem.set("Material", mat_name)
+
+        fill = layer.get("fillMaterial")
+        if fill:
+            layer_elem.set("FillMaterial", fill)
+
+        if layer.get("isReference"):
+            layer_elem.set("IsReference", "true")
+
+    tree = ET.ElementTree(root)
+    ET.indent(tree, space="  ", level=0)
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+
+
+def build_augmented_stackup(base_stackup, padstacks, units):
+    """Splits dielectrics at backdrill stub ends with zero-thickness dummy layers.
+
+    Returns (augmented stackup layers, {padstack name: modeling layers}) where
+    the modeling layers tell where each padstack's signal via, backdrill and
+    fill via start and stop.
+    """
+    layer_index = {layer['name']: idx for idx, layer in enumerate(base_stackup)}
+    padstack_modeling = {
+        padstack['name']: {
+            'signal_stop_layer': padstack['stopLayer'],
+            'signal_backdrill_to_layer': None,
+            'fill_start_layer': None,
+            'fill_stop_layer': padstack['stopLayer'],
+            'dummy_layer_name': None,
+        }
+        for padstack in padstacks
+    }
+    split_points = {}
+    dummy_name_by_key = {}
+
+    for padstack in padstacks:
+        backdrill = padstack.get('backdrill', {})
+        if not backdrill.get('enabled'):
+            continue
+
+        if backdrill.get('mode', 'layer') != 'layer':
+            raise ValueError(f"Padstack '{padstack['name']}' uses unsupported backdrill mode '{backdrill.get('mode')}'.")
+
+        stop_layer_name = backdrill.get('toLayer')
+        if not stop_layer_name:
+            raise ValueError(f"Padstack '{padstack['name']}' has backdrill enabled without a stop layer.")
+
+        stop_index = layer_index.get(stop_layer_name)
+        if stop_index is None:
+            raise ValueError(f"Padstack '{padstack['name']}' references unknown backdrill stop layer '{stop_layer_name}'.")
+
+        via_stop_index = layer_index.get(padstack['stopLayer'])
+        if via_stop_index is None:
+            raise ValueError(f"Padstack '{padstack['name']}' references unknown stop layer '{padstack['stopLayer']}'.")
+        if via_stop_index <= stop_index:
+            raise ValueError(
+                f"Padstack '{padstack['name']}' stop layer '{padstack['stopLayer']}' must be below backdrill stop layer '{stop_layer_name}'."
+            )
+
+        stop_layer = base_stackup[stop_index]
+        if stop_layer['type'] != 'Conductor':
+            raise ValueError(f"Backdrill stop layer '{stop_layer_name}' for padstack '{padstack['name']}' must be a conductor layer.")
+
+        stub_length = float(backdrill.get('stub', 0) or 0)
+        dielectric_layer, offset_in_dielectric, available_stub = _resolve_dummy_layer_position(
+            base_stackup,
+            stop_index,
+            via_stop_index,
+            stub_length,
+            padstack['name'],
+            units,
+        )
+
+        dummy_key = (dielectric_layer['name'], round(offset_in_dielectric, 9))
+        dummy_layer_name = dummy_name_by_key.get(dummy_key)
+        if not dummy_layer_name:
+            dummy_layer_name = f"{stop_layer_name}_stub_{format_name_token(stub_length)}"
+            dummy_name_by_key[dummy_key] = dummy_layer_name
+            split_points.setdefault(dielectric_layer['name'], []).append(
+                {
+                    'offset': offset_in_dielectric,
+                    'dummy_layer_name': dummy_layer_name,
+                }
+            )
+
+        padstack_modeling[padstack['name']] = {
+            'signal_stop_layer': padstack['stopLayer'],
+            'signal_backdrill_to_layer': dummy_layer_name,
+            'fill_start_layer': dummy_layer_name,
+            'fill_stop_layer': padstack['stopLayer'],
+            'dummy_layer_name': dummy_layer_name,
+        }
+
+    augmented_stackup = []
+    for layer in base_stackup:
+        entries = sorted(split_points.get(layer['name'], []), key=lambda item: item['offset'])
+        if not entries:
+            augmented_stackup.append(dict(layer))
+            continue
+
+        previous_offset = 0.0
+        segment_index = 1
+        layer_thickness = float(layer.get('thickness', 0) or 0)
+        for entry in entries:
+            segment_thickness = entry['offset'] - previous_offset
+            if segment_thickness > 0:
+                augmented_stackup.append(_make_split_dielectric_layer(layer, segment_index, segment_thickness))
+                segment_index += 1
+
+            augmented_stackup.append(_make_dummy_layer(layer, entry['dummy_layer_name']))
+            previous_offset = entry['offset']
+
+        remaining_thickness = layer_thickness - previous_offset
+        if remaining_thickness > 0:
+            augmented_stackup.append(_make_split_dielectric_layer(layer, segment_index, remaining_thickness))
+
+    return augmented_stackup, padstack_modeling
+
+
+def _resolve_dummy_layer_position(stackup, backdrill_stop_index, via_stop_index, stub_length, padstack_name, units):
+    if stub_length < 0:
+        raise ValueError(f"Padstack '{padstack_name}' stub length {stub_length}{units} is invalid.")
+
+    remaining_stub = stub_length
+    total_thickness = 0.0
+
+    for candidate_index in range(backdrill_stop_index + 1, via_stop_index):
+        candidate = stackup[candidate_index]
+        candidate_thickness = float(candidate.get('thickness', 0) or 0)
+        if candidate_thickness == 0:
+            continue
+
+        total_thickness += candidate_thickness
+
+        if remaining_stub <= candidate_thickness:
+            if candidate['type'] == 'Conductor':
+                print(
+                    f"WARNING: Padstack '{padstack_name}' stub end ({stub_length}{units}) falls inside "
+                    f"conductor layer '{candidate['name']}'. Snapping dummy layer to bottom of '{candidate['name']}'."
+                )
+                for next_index in range(candidate_index + 1, via_stop_index):
+                    next_layer = stackup[next_index]
+                    next_thickness = float(next_layer.get('thickness', 0) or 0)
+                    if next_thickness == 0:
+                        continue
+                    if next_layer['type'] == 'Dielectric':
+                        return next_layer, 0.0, total_thickness
+                raise ValueError(
+                    f"Padstack '{padstack_name}' stub length {stub_length}{units} lands in conductor layer "
+                    f"'{candidate['name']}' with no dielectric layer below it before the via stop layer."
+                )
+            return candidate, remaining_stub, total_thickness
+
+        remaining_stub -= candidate_thickness
+
+    raise ValueError(
+        f"Padstack '{padstack_name}' stub length {stub_length}{units} exceeds total layer thickness "
+        f"{round(total_thickness, 6)}{units} between '{stackup[backdrill_stop_index]['name']}' and '{stackup[via_stop_index]['name']}'."
+    )
+
+
+def _make_split_dielectric_layer(base_layer, segment_index, thickness):
+    layer = dict(base_layer)
+    layer['name'] = f"{base_layer['name']}__seg{segment_index}"
+    layer['thickness'] = thickness
+    return layer
+
+
+def _make_dummy_layer(dielectric_layer, dummy_layer_name):
+    layer = dict(dielectric_layer)
+    layer['name'] = dummy_layer_name
+    layer['thickness'] = 0
+    layer['generatedDummy'] = True
+    layer['isDummySignalLayer'] = True
+    return layer
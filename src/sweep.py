@@ -0,0 +1,273 @@
+"""Parametric sweeps: export one AEDB per combination of parameter values.
+
+A sweep definition is a JSON file naming a base project and the parameters
+to vary:
+
+    {
+        "project": "diff_pair.json",
+        "name": "dp",
+        "parameters": [
+            {"name": "pitch", "path": "placedInstances[type=diff_gnd].properties.pitch", "values": [36, 40, 44]},
+            {"name": "antipad", "path": "padstacks[name=Padstack_1].antipadSize",
+             "range": {"start": 24, "stop": 32, "step": 4}},
+            {"name": "stub", "path": "padstacks[*].backdrill.stub", "values": [5, 10]},
+            {"name": "fillDk", "path": ["padstacks[0].fill.dk", "stackup[name=UNNAMED_004].dk"], "values": [3.5, 4]}
+        ]
+    }
+
+A path is a dotted chain of keys; a [selector] after a key picks list items
+by index, all of them (*) or by field (name=..., type=...). A list of paths
+sets the same value at each. Ranges include their stop value. The project
+path is relative to the definition file; "name" defaults to its file name.
+
+Every combination becomes a variant project; variants whose flattened
+project compiles to the same plan (see plan.py) are exported once. The
+unique variants go through batch.py's process pool, and sweep_manifest.json
+maps each variant's parameter values to its outputs.
+
+Run from src/:
+    python sweep.py dp_sweep.json --version 2024.1 --jobs 4
+    python sweep.py dp_sweep.json --backend recording --dry-run
+"""
+import os
+import re
+import sys
+import json
+import copy
+import time
+import argparse
+import itertools
+
+from artifact_store import content_key
+from batch import add_export_arguments, output_paths, run_batch
+from crosstalk import safe_file_token
+from feed_paths import FeedPathEngine
+from flatten import flatten_project_data
+from plan import compile_plan
+from project_file import load_project_file
+
+MANIFEST_NAME = 'sweep_manifest.json'
+MANIFEST_SCHEMA_VERSION = 1
+# Project keys a parameter may point into.
+SWEEPABLE_ROOTS = ('placedInstances', 'padstacks', 'stackup', 'units', 'boardWidth', 'boardHeight')
+
+_SEGMENT = re.compile(r'^([^.\[\]]+)((?:\[[^\[\]]+\])*)$')
+
+
+def _parse_path(path):
+    """Splits 'padstacks[name=P1].fill.dk' into [('padstacks', ['name=P1']), ('fill', []), ('dk', [])]."""
+    segments = []
+    for part in path.split('.'):
+        match = _SEGMENT.match(part.strip())
+        if not match:
+            raise ValueError(f"Invalid parameter path '{path}' at '{part}'.")
+        segments.append((match.group(1), re.findall(r'\[([^\[\]]+)\]', match.group(2))))
+    if segments[0][0] not in SWEEPABLE_ROOTS:
+        raise ValueError(f"Parameter path '{path}' must start with one of: {', '.join(SWEEPABLE_ROOTS)}.")
+    return segments
+
+
+def _select(items, selector, path):
+    if not isinstance(items, list):
+        raise ValueError(f"'{path}': [{selector}] used on something that is not a list.")
+    if selector == '*':
+        return list(items)
+    if '=' in selector:
+        field, value = (s.strip() for s in selector.split('=', 1))
+        return [item for item in items if isinstance(item, dict) and str(item.get(field)) == value]
+    try:
+        index = int(selector)
+    except ValueError:
+        raise ValueError(f"'{path}': [{selector}] is not an index, '*' or field=value.")
+    return [items[index]] if -len(items) <= index < len(items) else []
+
+
+def resolve_targets(data, path):
+    """(container, key) pairs a parameter path points at; the last key may be missing and is then added."""
+    segments = _parse_path(path)
+    nodes = [data]
+    for position, (key, selectors) in enumerate(segments):
+        last = position == len(segments) - 1
+        if last and not selectors:
+            return [(node, key) for node in nodes]
+        next_nodes = []
+        for node in nodes:
+            if isinstance(node, dict) and key in node:
+                selected = [node[key]]
+                for selector in selectors:
+                    selected = [item for items in selected for item in _select(items, selector, path)]
+                next_nodes.extend(selected)
+        nodes = next_nodes
+    # Only reached when the last segment has selectors.
+    raise ValueError(f"Parameter path '{path}' must end with a key, not a [selector].")
+
+
+def parameter_values(parameter):
+    """The values a parameter takes, from 'values' or an inclusive 'range'."""
+    if 'values' in parameter:
+        values = list(parameter['values'])
+    elif 'range' in parameter:
+        spec = parameter['range']
+        start, stop, step = float(spec['start']), float(spec['stop']), float(spec.get('step', 1))
+        if step <= 0 or stop < start:
+            raise ValueError(f"Parameter '{parameter.get('name')}': a range needs start <= stop and step > 0.")
+        count = int((stop - start) / step + 1e-9) + 1
+        values = [round(start + i * step, 9) for i in range(count)]
+        # 40.0 would reach the EDB as "40.0mil" rather than "40mil".
+        values = [int(v) if v == int(v) else v for v in values]
+    else:
+        raise ValueError(f"Parameter '{parameter.get('name')}' needs 'values' or 'range'.")
+    if not values:
+        raise ValueError(f"Parameter '{parameter.get('name')}' has no values.")
+    return values
+
+
+def load_sweep(path):
+    """Reads a sweep definition; returns (definition, base project, [(name, paths, values), ...])."""
+    with open(path, 'r') as f:
+        definition = json.load(f)
+    if 'project' not in definition:
+        raise ValueError(f"{path}: the sweep definition names no 'project'.")
+    project_path = os.path.join(os.path.dirname(os.path.abspath(path)), definition['project'])
+    data = load_project_file(project_path)
+    definition = dict(definition, project=project_path,
+                      name=definition.get('name') or os.path.splitext(os.path.basename(path))[0])
+
+    parameters = []
+    for i, parameter in enumerate(definition.get('parameters') or []):
+        name = parameter.get('name') or f"p{i + 1}"
+        if any(name == existing for existing, _paths, _values in parameters):
+            raise ValueError(f"Parameter name '{name}' is used twice.")
+        paths = parameter.get('path')
+        paths = [paths] if isinstance(paths, str) else list(paths or [])
+        if not paths:
+            raise ValueError(f"Parameter '{name}' has no 'path'.")
+        for param_path in paths:
+            if not resolve_targets(data, param_path):
+                raise ValueError(f"Parameter '{name}': '{param_path}' matches nothing in {definition['project']}.")
+        parameters.append((name, paths, parameter_values(dict(parameter, name=name))))
+    if not parameters:
+        raise ValueError(f"{path}: the sweep definition has no parameters.")
+    return definition, data, parameters
+
+
+def expand_variants(data, parameters):
+    """Yields ({parameter name: value}, variant project) for every combination, in definition order."""
+    names = [name for name, _paths, _values in parameters]
+    for combination in itertools.product(*(values for _name, _paths, values in parameters)):
+        variant = copy.deepcopy(data)
+        for (_name, paths, _values), value in zip(parameters, combination):
+            for path in paths:
+                for container, key in resolve_targets(variant, path):
+                    container[key] = value
+        yield dict(zip(names, combination)), variant
+
+
+def write_variant_projects(definition, data, parameters, out_dir, aedb_version):
+    """Writes one <name>_<n>.json per unique variant plus the manifest entries for all variants.
+
+    Feed paths are recomputed for each variant (a pitch changes them), and a
+    variant whose plan matches an earlier one is recorded as its duplicate
+    instead of being written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    engine = FeedPathEngine() # unchanged instances hit its cache
+    count = 1
+    for _name, _paths, values in parameters:
+        count *= len(values)
+    width = len(str(count))
+
+    variants = []
+    representatives = {} # plan key -> variant name
+    for index, (values, variant) in enumerate(expand_variants(data, parameters), start=1):
+        name = safe_file_token(f"{definition['name']}_{index:0{width}d}")
+        variant = engine.fill(variant)
+        plan_key = content_key(compile_plan(flatten_project_data(variant), aedb_version))
+        entry = {'name': name, 'parameters': values, 'planKey': plan_key}
+        if plan_key in representatives:
+            entry['duplicateOf'] = representatives[plan_key]
+        else:
+            representatives[plan_key] = name
+            project_path = os.path.join(out_dir, name + '.json')
+            with open(project_path, 'w') as f:
+                json.dump(variant, f, indent=4)
+            entry['project'] = project_path
+        variants.append(entry)
+    return variants
+
+
+def build_manifest(definition, parameters, variants, report, args):
+    by_project = {entry['project']: entry for entry in (report or {}).get('projects', [])}
+    by_name = {}
+    for variant in variants:
+        if 'duplicateOf' in variant:
+            source = by_name[variant['duplicateOf']]
+            variant.update({key: source[key] for key in ('json', 'aedb', 'status', 'error') if key in source})
+            continue
+        flatten_path, aedb_path = output_paths(variant['project'], args.output_dir)
+        result = by_project.get(variant['project'])
+        variant.update(project=os.path.basename(variant['project']), json=os.path.basename(flatten_path),
+                       aedb=os.path.basename(aedb_path))
+        if result is None:
+            variant['status'] = 'not exported'
+        else:
+            variant.update({key: result[key] for key in ('status', 'seconds', 'mode', 'error') if key in result})
+        by_name[variant['name']] = variant
+
+    counts = {}
+    for variant in variants:
+        status = 'duplicate' if 'duplicateOf' in variant else variant['status']
+        counts[status] = counts.get(status, 0) + 1
+    return {
+        'schema': MANIFEST_SCHEMA_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'name': definition['name'],
+        'project': definition['project'],
+        'aedbVersion': args.version,
+        'backend': args.backend,
+        'parameters': [{'name': name, 'paths': paths, 'values': values} for name, paths, values in parameters],
+        'seconds': report['seconds'] if report else 0.0,
+        'counts': counts,
+        'variants': variants,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export one AEDB per combination of swept project parameters.")
+    parser.add_argument('definition', help="Sweep definition JSON (see the sweep.py docstring).")
+    parser.add_argument('--output-dir', default=None,
+                        help="Directory receiving the variants, their AEDBs and the manifest "
+                             "(default: <definition>_sweep next to the definition).")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Write the variant projects and the manifest without modeling them.")
+    add_export_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        definition, data, parameters = load_sweep(args.definition)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        parser.error(str(e))
+    args.output_dir = os.path.abspath(args.output_dir or os.path.splitext(args.definition)[0] + '_sweep')
+    args.jobs = max(1, args.jobs)
+
+    variants = write_variant_projects(definition, data, parameters, args.output_dir, args.version)
+    projects = [variant['project'] for variant in variants if 'duplicateOf' not in variant]
+    print(f"{len(variants)} variants, {len(variants) - len(projects)} duplicates; "
+          f"{len(projects)} unique variants written to {args.output_dir}.")
+    report = None
+    if not args.dry_run:
+        print(f"Exporting {len(projects)} variants to AEDB {args.version} with {args.jobs} jobs...")
+        report = run_batch(projects, args)
+
+    manifest = build_manifest(definition, parameters, variants, report, args)
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(manifest['counts'].items()))
+    print(f"Done in {manifest['seconds']:.1f}s: {summary}. Manifest: {manifest_path}")
+    if report and any(entry['status'] != 'succeeded' for entry in report['projects']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
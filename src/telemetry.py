@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import argparse
+import statistics
+
+from plan import VIA_TYPES
+
+# One JSON line per export, next to config.json.
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), 'export_history.jsonl')
+HISTORY_SCHEMA_VERSION = 1
+MAX_HISTORY_ROWS = 5000
+
+# Runs count as similar when their via counts are within this factor of each other.
+SIMILAR_SIZE_RATIO = 1.5
+# Similar successful runs needed before estimates and slow flags are trusted.
+MIN_SIMILAR_RUNS = 3
+# A run is flagged slow above this multiple of the expected duration.
+SLOW_FACTOR = 1.5
+
+
+def project_metrics(data):
+    """Size metrics of a flattened project: instance, via and layer counts."""
+    instances = data.get('placedInstances', [])
+    by_type = {}
+    for inst in instances:
+        by_type[inst['type']] = by_type.get(inst['type'], 0) + 1
+    stackup = data.get('stackup', [])
+    return {
+        'instances': len(instances),
+        'vias': sum(by_type.get(via_type, 0) for via_type in VIA_TYPES),
+        'byType': by_type,
+        'layers': len(stackup),
+        'conductors': sum(1 for layer in stackup if layer.get('type') == 'Conductor'),
+        'padstacks': len(data.get('padstacks', [])),
+    }
+
+
+class RunCollector:
+    """Collects the mode, phase durations and outcome of one export from its events."""
+    def __init__(self, project, aedb_version, metrics):
+        self.record = {
+            'schema': HISTORY_SCHEMA_VERSION,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'project': project,
+            'aedbVersion': aedb_version,
+            'mode': None,
+            'status': 'unknown',
+            'duration': None,
+            'phases': {},
+            'metrics': metrics,
+        }
+        self._start = time.perf_counter()
+
+    def update(self, event):
+        kind = event['event']
+        if kind == 'run_start':
+            self.record['mode'] = event.get('mode')
+        elif kind == 'phase_end':
+            phases = self.record['phases']
+            phases[event['phase']] = round(phases.get(event['phase'], 0.0) + event.get('duration', 0.0), 3)
+        elif kind == 'run_end':
+            self.record['status'] = event.get('status', 'ok')
+
+    def finish(self, returncode):
+        """Completes the record once the modeling process exited."""
+        if self.record['status'] == 'unknown':
+            self.record['status'] = 'error' if returncode else 'ok'
+        self.record['duration'] = round(time.perf_counter() - self._start, 3)
+        return self.record
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue # torn last line of an interrupted write
+    return records
+
+
+def append_record(record, path=HISTORY_PATH):
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+    # Trim in bulk once the file is well past its cap.
+    records = load_history(path)
+    if len(records) > MAX_HISTORY_ROWS * 1.2:
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for kept in records[-MAX_HISTORY_ROWS:]:
+                f.write(json.dumps(kept) + '\n')
+        os.replace(tmp_path, path)
+
+
+def similar_runs(history, metrics, mode=None):
+    """Successful past runs of the same mode whose via count is within SIMILAR_SIZE_RATIO."""
+    vias = max(metrics.get('vias', 0), 1)
+    similar = []
+    for record in history:
+        if record.get('status') != 'ok' or not record.get('duration'):
+            continue
+        if mode is not None and record.get('mode') != mode:
+            continue
+        other = max(record.get('metrics', {}).get('vias', 0), 1)
+        if max(vias, other) / min(vias, other) <= SIMILAR_SIZE_RATIO:
+            similar.append(record)
+    return similar
+
+
+def expected_duration(history, metrics, mode=None):
+    """Expected seconds for a project of this size, scaled from the median per-via rate of similar runs."""
+    similar = similar_runs(history, metrics, mode)
+    if len(similar) < MIN_SIMILAR_RUNS:
+        return None
+    rates = [record['duration'] / max(record['metrics'].get('vias', 0), 1) for record in similar]
+    return statistics.median(rates) * max(metrics.get('vias', 0), 1)
+
+
+def slow_run_warning(history, record):
+    """Warning text when record took much longer than similar past runs, else None."""
+    if record.get('status') != 'ok':
+        return None
+    expected = expected_duration(history, record['metrics'], record.get('mode'))
+    if expected is None or record['duration'] <= SLOW_FACTOR * expected:
+        return None
+    return (f"WARNING: Export took {record['duration']:.1f}s, {record['duration'] / expected:.1f}x the "
+            f"{expected:.1f}s expected from similar {record.get('mode') or ''} runs.")
+
+
+def estimator(history, metrics):
+    """Returns mode -> expected seconds (or None) for the ProgressTracker ETA."""
+    return lambda mode: expected_duration(history, metrics, mode)
+
+
+def report(history, last=30):
+    """Text report: recent runs with a duration bar chart and slow flags against earlier similar runs."""
+    rows = history[-last:]
+    offset = len(history) - len(rows)
+    longest = max((record.get('duration') or 0.0 for record in rows), default=0.0) or 1.0
+    lines = [f"{'started':<20} {'mode':<11} {'status':<6} {'vias':>7} {'layers':>6} {'seconds':>8} "
+             f"{'ms/via':>7}  trend"]
+    for i, record in enumerate(rows):
+        duration = record.get('duration') or 0.0
+        metrics = record.get('metrics', {})
+        vias = metrics.get('vias', 0)
+        bar = '#' * max(1, round(30 * duration / longest)) if duration else ''
+        warning = slow_run_warning(history[:offset + i], record)
+        lines.append(f"{record.get('started', ''):<20} {record.get('mode') or '-':<11} {record.get('status', ''):<6} "
+                     f"{vias:>7} {metrics.get('layers', 0):>6} {duration:>8.2f} "
+                     f"{1000 * duration / max(vias, 1):>7.2f}  {bar}{'  SLOW' if warning else ''}")
+
+    slowest = {}
+    for record in rows:
+        for phase, seconds in record.get('phases', {}).items():
+            slowest[phase] = slowest.get(phase, 0.0) + seconds
+    if slowest:
+        total = sum(slowest.values()) or 1.0
+        lines.append('')
+        lines.append("Time per phase over these runs:")
+        for phase, seconds in sorted(slowest.items(), key=lambda item: -item[1]):
+            lines.append(f"  {phase:<14} {seconds:>9.2f}s  {100 * seconds / total:>5.1f}%")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the local export history.")
+    parser.add_argument('command', choices=['report'])
+    parser.add_argument('--history', default=HISTORY_PATH, help="Export history file (JSON lines).")
+    parser.add_argument('--last', type=int, default=30, help="Number of most recent runs to show.")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    if not history:
+        print(f"No exports recorded in {args.history} yet.")
+    else:
+        print(report(history, args.last))
@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+
+from crosstalk import PROJECT_HEADER_KEYS, SIGNAL_TYPES
+from geometry import attachments_by_parent
+from spatial import instance_via_points
+
+
+def _instance_bbox(inst):
+    points = instance_via_points(inst)
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _port_names(inst):
+    if inst['type'] not in SIGNAL_TYPES:
+        return []
+    props = inst.get('properties', {})
+    names = []
+    if props.get('feedIn'):
+        names.append(inst['name'] + '_IN')
+    if props.get('feedOut'):
+        names.append(inst['name'] + '_OUT')
+    return names
+
+
+def _as_context(inst):
+    """Copy of a neighboring instance that keeps its vias and voids but creates no feeds or ports."""
+    context = json.loads(json.dumps(inst))
+    if context['type'] in SIGNAL_TYPES:
+        props = context.setdefault('properties', {})
+        props['feedIn'] = ""
+        props['feedOut'] = ""
+        context['feedPaths'] = {'feedIn': [], 'feedOut': []}
+    return context
+
+
+def partition_tiles(flattened_data, tile_size, overlap=0.0):
+    """Splits a flattened project into square tiles with an overlap margin.
+
+    Every via instance is owned by exactly one tile (the one containing its
+    center), which creates its feeds and ports. Instances of neighboring tiles
+    that reach into the overlap margin are copied in as feed-less context so
+    the coupling at tile borders is still modeled. Dog bones and surround
+    arrays follow their parent. Tiles keep the full board outline so feed
+    paths still end on the board edge.
+
+    Returns a list of tile dicts (bounds, owned/context names, ports, project).
+    """
+    if tile_size <= 0:
+        raise ValueError(f"Tile size must be positive, got {tile_size}.")
+    if overlap < 0:
+        raise ValueError(f"Tile overlap must not be negative, got {overlap}.")
+
+    instances = flattened_data['placedInstances']
+    vias = [inst for inst in instances if instance_via_points(inst)]
+    if not vias:
+        return []
+
+    attachments = attachments_by_parent(instances)
+
+    bboxes = {inst['id']: _instance_bbox(inst) for inst in vias}
+    x0 = min(b[0] for b in bboxes.values())
+    y0 = min(b[1] for b in bboxes.values())
+
+    owned = {}
+    for inst in vias:
+        col = math.floor((float(inst['x']) - x0) / tile_size)
+        row = math.floor((float(inst['y']) - y0) / tile_size)
+        owned.setdefault((col, row), []).append(inst)
+
+    # A via is context for every other tile whose overlap margin its outline reaches.
+    context_by_tile = {}
+    for inst in vias:
+        bx0, by0, bx1, by1 = bboxes[inst['id']]
+        home = (math.floor((float(inst['x']) - x0) / tile_size), math.floor((float(inst['y']) - y0) / tile_size))
+        for col in range(math.floor((bx0 - overlap - x0) / tile_size), math.floor((bx1 + overlap - x0) / tile_size) + 1):
+            for row in range(math.floor((by0 - overlap - y0) / tile_size), math.floor((by1 + overlap - y0) / tile_size) + 1):
+                if (col, row) != home and (col, row) in owned:
+                    context_by_tile.setdefault((col, row), []).append(inst)
+
+    header = {key: flattened_data[key] for key in PROJECT_HEADER_KEYS if key in flattened_data}
+
+    tiles = []
+    for (col, row), members in sorted(owned.items()):
+        core = (x0 + col * tile_size, y0 + row * tile_size,
+                x0 + (col + 1) * tile_size, y0 + (row + 1) * tile_size)
+        bounds = (core[0] - overlap, core[1] - overlap, core[2] + overlap, core[3] + overlap)
+        context = context_by_tile.get((col, row), [])
+
+        placed = [json.loads(json.dumps(inst)) for inst in members] + [_as_context(inst) for inst in context]
+        included = {inst['id'] for inst in placed}
+        pending = list(included)
+        while pending:
+            for child in attachments.get(pending.pop(), ()):
+                if child['id'] not in included:
+                    included.add(child['id'])
+                    placed.append(json.loads(json.dumps(child)))
+                    pending.append(child['id'])
+
+        project = dict(header)
+        project['placedInstances'] = placed
+        tiles.append({
+            'index': len(tiles),
+            'grid': [col, row],
+            'coreBounds': [round(v, 9) for v in core],
+            'bounds': [round(v, 9) for v in bounds],
+            'instances': [inst['name'] for inst in members],
+            'contextInstances': [inst['name'] for inst in context],
+            'ports': [name for inst in members for name in _port_names(inst)],
+            'project': project,
+        })
+
+    return tiles
+
+
+def _export_tile(json_path, aedb_version, template_cache=None, template_cache_mb=2048):
+    """Pool worker: runs the full modeling workflow for one tile JSON."""
+    start = time.perf_counter()
+    try:
+        from modeling import EdbProject
+
+        template_store = None
+        if template_cache:
+            from artifact_store import ArtifactStore
+            template_store = ArtifactStore(template_cache, template_cache_mb * 1024 * 1024)
+
+        project = EdbProject(json_path, aedb_version, template_store)
+        loaded = time.perf_counter()
+        try:
+            project.run_modeling()
+        except Exception:
+            try:
+                project.edb.close_edb()
+            except Exception:
+                pass
+            raise
+        return {
+            'status': 'ok',
+            'aedb': project.aedb_path,
+            'timings': {'open': round(loaded - start, 3), 'modeling': round(time.perf_counter() - loaded, 3)},
+        }
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': f"{type(e).__name__}: {e}",
+            'timings': {'total': round(time.perf_counter() - start, 3)},
+        }
+
+
+def export_tiles(flatten_path, aedb_version, tile_size, overlap=0.0, workers=None, out_dir=None,
+                 template_cache=None, template_cache_mb=2048):
+    """Partitions a flattened project, exports every tile in a process pool and writes a manifest.
+
+    Tile projects are written to <out_dir>/tile_<col>_<row>_flatten.json and
+    modeled into the matching .aedb; the manifest goes to
+    <out_dir>/tiles_manifest.json. All tiles share the same stackup, so a
+    template cache lets every tile after the first skip the stackup build.
+    Returns (manifest_path, manifest).
+    """
+    run_start = time.perf_counter()
+    with open(flatten_path, 'r') as f:
+        data = json.load(f)
+
+    if out_dir is None:
+        out_dir = os.path.splitext(flatten_path)[0] + '_tiles'
+    os.makedirs(out_dir, exist_ok=True)
+
+    partition_start = time.perf_counter()
+    tiles = partition_tiles(data, tile_size, overlap)
+    for tile in tiles:
+        col, row = tile['grid']
+        json_path = os.path.join(out_dir, f"tile_{col}_{row}_flatten.json")
+        with open(json_path, 'w') as f:
+            json.dump(tile.pop('project'), f, indent=4)
+        tile['json'] = os.path.basename(json_path)
+        tile['aedb'] = os.path.splitext(tile['json'])[0] + '.aedb'
+    partition_time = time.perf_counter() - partition_start
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Exporting {len(tiles)} tiles with {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_export_tile, os.path.join(out_dir, tile['json']), aedb_version,
+                        template_cache, template_cache_mb): tile
+            for tile in tiles
+        }
+        for future in as_completed(futures):
+            tile = futures[future]
+            result = future.result()
+            tile['status'] = result['status']
+            tile['timings'] = result['timings']
+            if result['status'] != 'ok':
+                tile['error'] = result['error']
+                print(f"Tile {tile['index']} {tile['grid']} failed: {result['error']}")
+            else:
+                print(f"Tile {tile['index']} {tile['grid']} done: {len(tile['instances'])} instances, "
+                      f"{len(tile['ports'])} ports in {result['timings']['modeling']}s")
+
+    manifest = {
+        'source': os.path.abspath(flatten_path),
+        'aedbVersion': aedb_version,
+        'tileSize': tile_size,
+        'overlap': overlap,
+        'workers': workers,
+        'timings': {
+            'partition': round(partition_time, 3),
+            'wall': round(time.perf_counter() - run_start, 3),
+        },
+        'tiles': tiles,
+    }
+    manifest_path = os.path.join(out_dir, 'tiles_manifest.json')
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest_path, manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a flattened project as parallel spatial tiles.")
+    parser.add_argument('flatten_json', help="Flattened project JSON (*_flatten.json).")
+    parser.add_argument('aedb_version', help="AEDB version, e.g. 2024.1.")
+    parser.add_argument('--tile-size', type=float, required=True, help="Tile edge length in project units.")
+    parser.add_argument('--overlap', type=float, default=0.0, help="Context margin around each tile in project units.")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: CPU count).")
+    parser.add_argument('--out', default=None, help="Output directory (default: <project>_tiles).")
+    parser.add_argument('--template-cache', default=None, help="Directory of cached template AEDBs.")
+    parser.add_argument('--template-cache-size', type=float, default=2048, help="Template cache size limit in MB.")
+    args = parser.parse_args()
+
+    try:
+        manifest_path, manifest = export_tiles(
+            args.flatten_json, args.aedb_version, args.tile_size, args.overlap, args.workers, args.out,
+            args.template_cache, args.template_cache_size,
+        )
+    except FileNotFoundError:
+        print(f"Error: The JSON file '{args.flatten_json}' was not found.")
+        sys.exit(1)
+
+    failed = [tile for tile in manifest['tiles'] if tile['status'] != 'ok']
+    print(f"Tiled export finished in {manifest['timings']['wall']}s. Manifest: {manifest_path}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,233 @@
+import io
+import sys
+import time
+import itertools
+import threading
+import traceback
+import multiprocessing
+
+# Jobs a worker runs before it is replaced by a fresh process (bounds leaks in pyedb/AEDT).
+DEFAULT_MAX_JOBS = 20
+# How often the parent checks that a busy worker is still alive.
+POLL_INTERVAL = 0.5
+
+
+class _PipeWriter(io.TextIOBase):
+    """Worker stdout: forwards every complete line (log text and @@event lines) to the parent."""
+    def __init__(self, conn, job_id):
+        self._conn = conn
+        self._job_id = job_id
+        self._buffer = ''
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer += text
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            self._conn.send(('line', self._job_id, line))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close_job(self):
+        if self._buffer:
+            self._conn.send(('line', self._job_id, self._buffer))
+            self._buffer = ''
+
+
+def run_job(job, backend):
+    """Runs one modeling job in this process; the same steps as modeling.py's command line.
+
+    With a 'shared_project' handle the project is read from shared memory and
+    json_path only names the output (<name>.aedb next to it).
+    """
+    from modeling import EdbProject
+    from edb_profiler import CallProfiler
+    from progress import EventEmitter
+
+    from artifact_store import ArtifactStore
+
+    template_store = None
+    if job.get('template_cache'):
+        template_store = ArtifactStore(job['template_cache'], job.get('template_cache_mb', 2048) * 1024 * 1024)
+    export_store = None
+    if job.get('export_cache'):
+        export_store = ArtifactStore(job['export_cache'], job.get('export_cache_mb', 10240) * 1024 * 1024)
+
+    data = None
+    if job.get('shared_project'):
+        # Instance columns handed over in shared memory instead of re-parsing json_path.
+        from shared_project import load_shared_project
+        data = load_shared_project(job['shared_project'])
+
+    profiler = CallProfiler() if job.get('profile') else None
+    events = EventEmitter(sys.stdout) if job.get('events') else None
+    project = EdbProject(job['json_path'], job['aedb_version'], template_store, backend, profiler, events,
+                         export_store, job.get('link_cached', False), data)
+    try:
+        project.run_modeling(incremental=job.get('incremental', False))
+    except Exception:
+        try:
+            project.edb.close_edb()
+        except Exception:
+            pass
+        raise
+    return project.aedb_path
+
+
+def worker_main(conn, backend_name, warm_versions=()):
+    """Worker loop: imports the backend once, then runs jobs received on conn until None or EOF."""
+    from backends import get_backend
+
+    backend = get_backend(backend_name)
+    warmed = set()
+    for version in warm_versions:
+        try:
+            backend.warm(version)
+            warmed.add(version)
+        except Exception as e:
+            conn.send(('line', None, f"WARNING: Could not warm up AEDB {version} in the modeling worker: {e}"))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        writer = _PipeWriter(conn, job['id'])
+        stdout = sys.stdout
+        sys.stdout = writer
+        start = time.perf_counter()
+        try:
+            if job['aedb_version'] not in warmed:
+                backend.warm(job['aedb_version'])
+                warmed.add(job['aedb_version'])
+            aedb_path = run_job(job, backend)
+            result = {'status': 'ok', 'aedb': aedb_path}
+        except Exception as e:
+            result = {'status': 'error', 'error': f"{type(e).__name__}: {e}", 'traceback': traceback.format_exc()}
+        finally:
+            writer.close_job()
+            sys.stdout = stdout
+        result['duration'] = round(time.perf_counter() - start, 3)
+        conn.send(('done', job['id'], result))
+
+
+class WarmWorker:
+    """Long-lived modeling process owned by the GUI, keeping pyedb imported between exports.
+
+    Jobs run one at a time. A job that raises only fails that job; a worker
+    that dies mid-job is reported as a failed job and replaced on the next
+    run, and a worker is recycled after max_jobs jobs.
+    """
+    def __init__(self, backend='pyedb', max_jobs=DEFAULT_MAX_JOBS, warm_versions=()):
+        self.backend = backend
+        self.max_jobs = max_jobs
+        self.warm_versions = tuple(warm_versions)
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._conn = None
+        self._jobs_done = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._killed = False # set by shutdown() while a job holds the lock
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Starts the worker process in the background (a no-op while one is running)."""
+        if self.alive:
+            return
+        self._discard()
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=worker_main, args=(child_conn, self.backend, self.warm_versions), daemon=True,
+            name='via-wizard-modeling-worker')
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._jobs_done = 0
+        self._killed = False
+
+    def run(self, job, on_line=None):
+        """Runs job (modeling options as in run_job) and returns its result dict.
+
+        on_line receives every stdout line of the job, including @@event lines.
+        """
+        with self._lock:
+            self.start()
+            job = dict(job, id=next(self._ids))
+            try:
+                self._conn.send(job)
+                while True:
+                    if not self._conn.poll(POLL_INTERVAL):
+                        if not self._process.is_alive():
+                            return self._crashed()
+                        continue
+                    kind, job_id, payload = self._conn.recv()
+                    if kind == 'line':
+                        if on_line is not None:
+                            on_line(payload)
+                    elif kind == 'done' and job_id == job['id']:
+                        self._jobs_done += 1
+                        if self._jobs_done >= self.max_jobs:
+                            self._stop()
+                        return payload
+            except (EOFError, OSError, BrokenPipeError):
+                return self._crashed()
+
+    def _crashed(self):
+        exitcode = None
+        if self._process is not None:
+            self._process.join(1)
+            exitcode = self._process.exitcode
+        self._discard()
+        if self._killed:
+            return {'status': 'error', 'error': "Modeling worker was stopped while the job was running.",
+                    'crashed': True}
+        return {'status': 'error', 'error': f"Modeling worker exited unexpectedly (exit code {exitcode}); "
+                                            f"it will be restarted for the next export.", 'crashed': True}
+
+    def _stop(self, timeout=5):
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self._process.join(timeout)
+        self._discard()
+
+    def _discard(self):
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(1)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def shutdown(self):
+        """Stops the worker; a job still running is killed.
+
+        While run() holds the lock only the process is terminated: run() then
+        sees the dead worker and discards it itself, so its pipe and process
+        are never pulled from under it.
+        """
+        if self._lock.acquire(blocking=False):
+            try:
+                self._stop()
+            finally:
+                self._lock.release()
+            return
+        self._killed = True
+        process = self._process
+        if process is not None and process.is_alive():
+            process.terminate()